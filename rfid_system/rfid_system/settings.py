@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tracking.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware', 
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -51,6 +52,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'tracking.middleware.AdmissionControlMiddleware',
+    'tracking.middleware.ReplicaRoutingMiddleware',
+    'tracking.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'rfid_system.urls'
@@ -72,6 +76,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'rfid_system.wsgi.application'
 
+# Creates the tables of the unmanaged models in the test database.
+TEST_RUNNER = 'tracking.test_runner.ManagedModelTestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -88,6 +95,17 @@ DATABASES = {
     }
 }
 
+# Optional read replica for dashboard/history queries (see tracking/routers.py).
+if os.environ.get("RFID_DB_REPLICA_HOST"):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        HOST=os.environ["RFID_DB_REPLICA_HOST"],
+        PORT=os.environ.get("RFID_DB_REPLICA_PORT", DATABASES['default']['PORT']),
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['tracking.routers.ReplicaRouter']
+
 ALLOWED_HOSTS = ['10.80.26.210', 'localhost','127.0.0.1']
 
 
@@ -147,3 +165,80 @@ SESSION_COOKIE_SECURE = False
 
 CSRF_COOKIE_SAMESITE = "Lax"
 CSRF_COOKIE_SECURE = False
+
+
+# Sampling profiler (see tracking/profiling.py). A request carrying the
+# header below with the matching token is always profiled, even when
+# sampling is disabled.
+RFID_PROFILING = {
+    "ENABLED": os.environ.get("RFID_PROFILING_ENABLED", "") == "1",
+    "VIEWS": ["rfid-read", "rfid-connect", "api_activity_logs"],
+    "SAMPLE_RATE": float(os.environ.get("RFID_PROFILING_SAMPLE_RATE", "0.01")),
+    "HEADER": "X-Rfid-Profile",
+    "TOKEN": os.environ.get("RFID_PROFILING_TOKEN"),
+    "DIR": BASE_DIR / "profiles",
+    "KEEP": 100,
+    "TOP": 40,
+}
+
+# Local spool for tag reads (see tracking/spool.py). In "fallback" mode reads
+# are spooled only while the database is unavailable; in "always" mode every
+# batch is spooled and `manage.py replay_spool --follow` loads it.
+RFID_SPOOL = {
+    "MODE": os.environ.get("RFID_SPOOL_MODE", "fallback"),
+    "DIR": BASE_DIR / "spool",
+    "FSYNC_EVERY": 100,
+    "FSYNC_INTERVAL": 0.2,
+}
+
+# RSSI location engine (see tracking/location.py).
+RFID_LOCATION = {
+    "WINDOW_SECONDS": 30,
+    "HALF_LIFE_SECONDS": 5,
+    "CACHE_SECONDS": 1,
+}
+
+# Tokens accepted from edge aggregators on /api/ingest/batch/ and
+# /api/ingest/registry/ (comma-separated). Empty disables both endpoints.
+RFID_INGEST_TOKENS = [t for t in os.environ.get("RFID_INGEST_TOKENS", "").split(",") if t]
+
+# When one EPC is heard by several readers/antennas in the same dedup window,
+# keep the "strongest" (highest RSSI), "first" or "latest" read.
+RFID_FANIN_POLICY = "strongest"
+
+# Which views read from the replica, per-view overrides ({url_name: alias})
+# and how long a client stays pinned to the primary after writing.
+RFID_DB_ROUTING = {
+    "REPLICA": "replica",
+    "VIEWS": {},
+    "STICKY_SECONDS": 10,
+}
+
+# Concurrency budgets per endpoint class and worker process (see
+# tracking/admission.py). Requests over budget wait up to QUEUE_SECONDS and
+# are then answered with 503 + Retry-After.
+RFID_ADMISSION = {
+    "ENABLED": os.environ.get("RFID_ADMISSION_ENABLED", "1") == "1",
+    "BUDGETS": {"ingest": 16, "live": 4, "history": 2, "admin": 2},
+    "QUEUE_SECONDS": {"ingest": 10.0, "live": 1.0, "history": 0.0, "admin": 2.0},
+}
+
+# Stamp reads with the reader's firstSeenTimestamp (corrected for its clock
+# skew, see tracking/clock.py) instead of the time the batch arrived.
+RFID_USE_READER_TIMESTAMPS = os.environ.get("RFID_USE_READER_TIMESTAMPS", "1") == "1"
+
+# Streaming antenna health (see tracking/health.py for all thresholds):
+# statistics per WINDOW_SECONDS window, flags once an antenna drops below
+# RATE_DROP_RATIO of its baseline read rate.
+RFID_ANTENNA_HEALTH = {
+    "WINDOW_SECONDS": 60,
+    "RATE_DROP_RATIO": 0.2,
+}
+
+# Registered-EPC filter published on /api/registry/filter/ (see
+# tracking/registry.py): Bloom filter false-positive rate, and the largest
+# set that is also sent as a plain EPC list.
+RFID_REGISTRY_FILTER = {
+    "FALSE_POSITIVE_RATE": 0.01,
+    "EXACT_MAX": 5000,
+}
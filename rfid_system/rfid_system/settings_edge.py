@@ -0,0 +1,35 @@
+"""
+Settings for an edge aggregator.
+
+Runs this project on a local SQLite database next to the readers and
+forwards deduplicated detections to the central server:
+
+    export DJANGO_SETTINGS_MODULE=rfid_system.settings_edge
+    python manage.py edge_init_db
+    python manage.py runserver 0.0.0.0:8000       # readers post here
+    python manage.py edge_forward --follow         # ships batches to central
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('RFID_EDGE_DB', str(BASE_DIR / 'edge.sqlite3')),
+        'OPTIONS': {'timeout': 20},
+        # A file (not the in-memory default) so threaded tests can share it.
+        'TEST': {'NAME': str(BASE_DIR / 'test_edge.sqlite3')},
+    }
+}
+
+ALLOWED_HOSTS = os.environ.get('RFID_EDGE_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+RFID_EDGE = {
+    "CENTRAL_URL": os.environ.get("RFID_CENTRAL_URL", "http://10.80.26.210:8000"),
+    "TOKEN": os.environ.get("RFID_EDGE_TOKEN"),
+    "BATCH_SIZE": 5000,
+    "TIMEOUT": 30,
+    "MAX_BACKOFF": 300,
+}
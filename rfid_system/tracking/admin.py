@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from . import models
 
 # ---- General Admin Site Settings ----
@@ -36,8 +39,114 @@ class DefaultAdmin(admin.ModelAdmin):
             if field.name.endswith('_id') or field.name in ['status']
         ]
 
+    def get_list_select_related(self, request):
+        # Join every FK shown in the list instead of one query per row
+        return [
+            field.name for field in self.model._meta.fields
+            if field.is_relation and field.name in self.get_list_display(request)
+        ]
+
+
+# ---- Large tables (detections, logs) ----
+def _estimated_rows(model, using='default'):
+    """Planner row estimate for a whole table, or None if unsupported."""
+    connection = connections[using]
+    table = model._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Avoid COUNT(*) over millions of rows: unfiltered lists use the table
+    estimate, filtered lists count at most COUNT_CAP rows.
+    """
+    COUNT_CAP = 10000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not qs.query.where:
+            estimate = _estimated_rows(qs.model, qs.db)
+            if estimate is not None and estimate > self.COUNT_CAP:
+                return estimate
+        return qs.order_by()[:self.COUNT_CAP].count()
+
+
+class CursorFilter(admin.SimpleListFilter):
+    """Keyset paging: ``?before=<pk>`` lists rows older than that pk."""
+    title = 'cursor'
+    parameter_name = 'before'
+    template = 'admin/tracking/hidden_filter.html'  # driven by the "Older rows" link
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        # ChangeList only applies filters that have output
+        return True
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(pk__lt=int(value))
+        return queryset
+
+
+class LargeTableAdmin(DefaultAdmin):
+    """
+    Admin profile for tables with millions of rows: joined FK loading,
+    estimated counts, exact (indexed) search only, no FK sidebar filters,
+    a date hierarchy and an "Older rows" keyset link instead of deep pages.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/tracking/large_change_list.html'
+    list_per_page = 50
+    indexed_search_fields = ()
+
+    def get_search_fields(self, request):
+        return list(self.indexed_search_fields)
+
+    def get_list_filter(self, request):
+        return [CursorFilter]
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        context = getattr(response, 'context_data', None)
+        cl = context.get('cl') if context else None
+        if cl is not None and cl.result_list:
+            last_pk = cl.result_list[len(cl.result_list) - 1].pk
+            context['older_rows_url'] = cl.get_query_string({'before': last_pk}, ['p'])
+        return response
+
+
+class DetectionsAdmin(LargeTableAdmin):
+    date_hierarchy = 'detected_at'
+    indexed_search_fields = ('=epc',)
+    search_help_text = "Exact EPC"
+
+
+class LogsAdmin(LargeTableAdmin):
+    date_hierarchy = 'created_at'
+
 
 # ---- Register all models dynamically ----
+admin.site.register(models.Detections, DetectionsAdmin)
+admin.site.register(models.Logs, LogsAdmin)
+
 for model in [
     models.Users,
     models.Roles,
@@ -45,14 +154,14 @@ for model in [
     models.Organizations,
     models.Labels,
     models.Items,
-    models.Logs,
     models.Readers,
     models.Antennas,
-    models.Detections,
     models.StorageLocations,
     models.ItemGroups,
     models.ItemProjects,
     models.RfidItemsTemp,
+    models.Zone,
+    models.ZoneAntenna,
 ]:
     try:
         admin.site.register(model, DefaultAdmin)
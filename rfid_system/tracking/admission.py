@@ -0,0 +1,123 @@
+"""
+Per-class admission control.
+
+Every request is classified by URL name into ingest, live, history or
+admin, and each class has its own concurrency budget in this worker
+process. A request that finds its class full waits up to the class's
+queue timeout for a slot and is otherwise shed with 503 + Retry-After, so
+dashboard and history traffic can never take the slots reader POSTs need.
+Unclassified views are not limited.
+"""
+import threading
+
+from django.conf import settings
+
+from . import metrics
+
+
+INGEST, LIVE, HISTORY, ADMIN = "ingest", "live", "history", "admin"
+
+DEFAULTS = {
+    "ENABLED": True,
+    # Concurrent requests per class, per worker process.
+    "BUDGETS": {INGEST: 16, LIVE: 4, HISTORY: 2, ADMIN: 2},
+    # Seconds a request may wait for a slot before it is shed.
+    "QUEUE_SECONDS": {INGEST: 10.0, LIVE: 1.0, HISTORY: 0.0, ADMIN: 2.0},
+    "RETRY_AFTER": 2,
+    # URL name -> class; admin:* views are always ADMIN.
+    "VIEWS": {
+        "rfid-connect": INGEST,
+        "rfid-read": INGEST,
+        "api_ingest_batch": INGEST,
+        "api_dashboard_live_tags": LIVE,
+        "rfid_live_summary": LIVE,
+        "api_item_search": LIVE,
+        "api_item_lookup": LIVE,
+        "api_reader_status": LIVE,
+        "api_zones": LIVE,
+        "api_zone_items": LIVE,
+        "api_registry_filter": LIVE,
+        "api_activity_logs": HISTORY,
+        "api_presence_transitions": HISTORY,
+        "api_inventory_exceptions": HISTORY,
+        "api_project_inventory": HISTORY,
+        "api_group_inventory": HISTORY,
+        "api_visits": HISTORY,
+        "api_dwell_stats": HISTORY,
+        "api_label_batch": ADMIN,
+        "api_activity_heatmap": HISTORY,
+    },
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "RFID_ADMISSION", {}))
+    return config
+
+
+def classify(view, config):
+    if view.startswith("admin:"):
+        return ADMIN
+    return config["VIEWS"].get(view)
+
+
+class Budget:
+    """Counting semaphore that also reports how many are in and waiting."""
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout):
+        with self._cond:
+            if self.in_flight >= self.limit and timeout > 0:
+                self.waiting += 1
+                metrics.admission_waiting.set(self.waiting, cls=self.name)
+                try:
+                    self._cond.wait_for(lambda: self.in_flight < self.limit, timeout)
+                finally:
+                    self.waiting -= 1
+                    metrics.admission_waiting.set(self.waiting, cls=self.name)
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            metrics.admission_in_flight.set(self.in_flight, cls=self.name)
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            metrics.admission_in_flight.set(self.in_flight, cls=self.name)
+            self._cond.notify()
+
+
+_budgets = {}
+_budgets_lock = threading.Lock()
+
+
+def budget_for(cls, config):
+    """The process-wide Budget of ``cls`` (resized if the setting changed)."""
+    limit = config["BUDGETS"][cls]
+    with _budgets_lock:
+        budget = _budgets.get(cls)
+        if budget is None:
+            budget = _budgets[cls] = Budget(cls, limit)
+        budget.limit = limit
+        return budget
+
+
+def occupancy():
+    """``{class: {"inFlight", "waiting", "limit"}}`` for this worker."""
+    config = get_config()
+    return {
+        cls: {
+            "inFlight": budget_for(cls, config).in_flight,
+            "waiting": budget_for(cls, config).waiting,
+            "limit": limit,
+        }
+        for cls, limit in config["BUDGETS"].items()
+    }
@@ -1,6 +1,16 @@
+import os
+
 from django.apps import AppConfig
 
 
 class TrackingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracking'
+
+    def ready(self):
+        # Web workers set RFID_WARMUP_ON_BOOT=1 so hot state is loaded before
+        # /ready/ lets the load balancer route traffic here. Management
+        # commands leave it unset and never touch the database from here.
+        if os.environ.get("RFID_WARMUP_ON_BOOT") == "1":
+            from . import warmup
+            warmup.warm_up_in_background()
@@ -0,0 +1,130 @@
+"""
+Reader-supplied read times and per-reader clock-skew correction.
+
+Speedway Connect sends ``firstSeenTimestamp`` (microseconds since the
+epoch, reader clock) with every tag. Ingest stamps each read with that
+time plus the reader's estimated skew, so a batch buffered during an
+outage keeps its original timing instead of collapsing onto the moment it
+was received.
+
+Skew is estimated from live batches: the lag between receiving a batch
+and its newest read is skew plus network/buffering delay, so we follow
+the minimum (delays only ever add) and let it drift up slowly. Batches
+whose lag is far above the estimate are backlog and leave it alone; a
+first batch lagging by more than any plausible backlog (a reader whose
+clock was never set) is taken as skew straight away.
+
+Corrected times are bounded: a read that would land more than
+``max_backlog_seconds()`` before the batch arrived, or after it, is
+stamped with the arrival time instead, so a badly wrong clock can never
+put detections years into the past or future.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+
+from .models import ReaderClock
+
+
+TIMESTAMP_FIELDS = ("firstSeenTimestamp", "lastSeenTimestamp")
+
+
+def use_reader_timestamps():
+    return getattr(settings, "RFID_USE_READER_TIMESTAMPS", True)
+
+
+def live_lag_seconds():
+    """Batches lagging the skew estimate by more than this count as buffered."""
+    return getattr(settings, "RFID_CLOCK_LIVE_LAG_SECONDS", 60)
+
+
+def smoothing():
+    return getattr(settings, "RFID_CLOCK_SMOOTHING", 0.1)
+
+
+def max_backlog_seconds():
+    """The oldest a corrected read may be relative to its batch's arrival."""
+    return getattr(settings, "RFID_CLOCK_MAX_BACKLOG_SECONDS", 24 * 3600)
+
+
+def reader_time(tag):
+    """The read's own (reader clock) time as an aware UTC datetime, or None."""
+    for field in TIMESTAMP_FIELDS:
+        value = tag.get(field)
+        if value in (None, ""):
+            continue
+        try:
+            return datetime.fromtimestamp(int(value) / 1_000_000, tz=dt_timezone.utc)
+        except (TypeError, ValueError, OverflowError, OSError):
+            return None
+    return None
+
+
+def load(reader_ids):
+    """``{reader_id: ReaderClock}``; readers without an estimate get an unsaved row."""
+    clocks = ReaderClock.objects.in_bulk(list(reader_ids))
+    return {rid: clocks.get(rid) or ReaderClock(reader_id=rid) for rid in reader_ids}
+
+
+def observe(clock, newest, received_at):
+    """Fold one batch (newest reader time, time we received it) into ``clock``."""
+    if clock.sampled_at is not None and received_at <= clock.sampled_at:
+        return False  # replaying an older batch; it says nothing new
+
+    lag = (received_at - newest).total_seconds()
+    live = live_lag_seconds()
+
+    if clock.samples == 0:
+        if live < abs(lag) <= max_backlog_seconds():
+            return False  # first batch is a backlog flush; wait for a live one
+        clock.skew_seconds = lag
+    elif lag < clock.skew_seconds:
+        clock.skew_seconds = lag
+    elif lag - clock.skew_seconds <= live:
+        clock.skew_seconds += smoothing() * (lag - clock.skew_seconds)
+    else:
+        return False
+
+    clock.samples += 1
+    clock.sampled_at = received_at
+    return True
+
+
+def correct(clock, tag_reads, received_at):
+    """
+    Update ``clock`` from one reader batch and return a ``timestamp_of(tag)``
+    function for ``collect_reads``: the read's corrected time, or None for
+    reads without a timestamp or whose corrected time falls outside the
+    ``max_backlog_seconds()`` before ``received_at`` (so ingest uses
+    ``received_at``).
+    """
+    if not use_reader_timestamps():
+        return None
+
+    times = {id(tag): t for tag in tag_reads if (t := reader_time(tag)) is not None}
+    if not times:
+        return None
+
+    observe(clock, max(times.values()), received_at)
+    skew = timedelta(seconds=clock.skew_seconds)
+    oldest = received_at - timedelta(seconds=max_backlog_seconds())
+
+    def timestamp_of(tag):
+        t = times.get(id(tag))
+        if t is None:
+            return None
+        t += skew
+        if t < oldest:
+            return None
+        return min(t, received_at)
+
+    return timestamp_of
+
+
+def save(clocks, since):
+    """Persist estimates sampled at or after ``since`` (last writer wins)."""
+    sampled = [c for c in clocks if c.sampled_at is not None and c.sampled_at >= since]
+    if not sampled:
+        return
+    ReaderClock.objects.bulk_create(sampled, ignore_conflicts=True)
+    ReaderClock.objects.bulk_update(sampled, ["skew_seconds", "samples", "sampled_at"])
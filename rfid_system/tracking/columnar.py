@@ -0,0 +1,78 @@
+"""
+Compact columnar encoding for list endpoints (``?format=columnar``).
+
+Rows are transposed into one array per field; repetitive string fields
+(reader model, antenna port, status, ...) are dictionary-encoded as integer
+indexes, and datetimes become epoch milliseconds.
+"""
+import json
+from decimal import Decimal
+
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib encoder
+    orjson = None
+
+
+def wants_columnar(request):
+    return request.GET.get("format") == "columnar"
+
+
+def epoch_ms(dt):
+    return int(dt.timestamp() * 1000) if dt is not None else None
+
+
+class DictionaryEncoder:
+    """Map each distinct value to a small integer index."""
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def encode(self, value):
+        idx = self._index.get(value)
+        if idx is None:
+            idx = self._index[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+
+def to_columns(rows, fields, dictionaries=None, time_fields=()):
+    """
+    Transpose ``rows`` (dicts) into ``{field: [values...]}``.
+
+    ``dictionaries`` maps a field name to the DictionaryEncoder used for it;
+    passing the same encoder for several tables shares one dictionary.
+    """
+    dictionaries = dictionaries or {}
+    columns = {field: [] for field in fields}
+
+    for row in rows:
+        for field in fields:
+            value = row[field]
+            if field in time_fields:
+                value = epoch_ms(value)
+            elif field in dictionaries:
+                value = dictionaries[field].encode(value)
+            elif isinstance(value, Decimal):
+                value = float(value)
+            columns[field].append(value)
+
+    return columns
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def compact_json_response(payload, status=200):
+    """JSON response without whitespace, using orjson when it is installed."""
+    if orjson is not None:
+        body = orjson.dumps(payload, default=_default)
+    else:
+        body = json.dumps(payload, separators=(",", ":"), default=_default)
+    return HttpResponse(body, content_type="application/json", status=status)
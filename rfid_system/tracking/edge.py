@@ -0,0 +1,179 @@
+"""
+Edge aggregator client.
+
+An edge is this same project running with ``rfid_system.settings_edge``
+on a local SQLite database. Local readers post to ``/rfid/connect/`` as
+usual; the registry filter and dedup run locally, and ``edge_forward``
+ships the surviving detections to the central server in gzip-compressed
+batches, tracking a watermark so nothing is lost across outages.
+"""
+import gzip
+import json
+import logging
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+
+from . import ingest, metrics
+from .models import Antennas, Detections, ForwardWatermark, Readers, RfidItemsTemp
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    "CENTRAL_URL": None,
+    "TOKEN": None,
+    "BATCH_SIZE": 5000,
+    "TIMEOUT": 30,
+    "MAX_BACKOFF": 300,
+}
+
+WATERMARK = "central"
+REGISTRY_VERSION = "registry"
+
+
+class PermanentForwardError(Exception):
+    """
+    The central server refused a request outright (bad token, wrong URL,
+    malformed payload); retrying will not help until the setup is fixed.
+    """
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "RFID_EDGE", {}))
+    return config
+
+
+def _call(config, path, payload=None):
+    """GET (or gzip-POST ``payload``) a central ingest API and decode the JSON reply."""
+    url = config["CENTRAL_URL"].rstrip("/") + path
+    headers = {"X-Ingest-Token": config["TOKEN"] or "", "Accept-Encoding": "gzip"}
+    data = None
+
+    if payload is not None:
+        data = gzip.compress(json.dumps(payload, separators=(",", ":")).encode())
+        headers.update({"Content-Type": "application/json", "Content-Encoding": "gzip"})
+
+    req = urllib.request.Request(url, data=data, headers=headers,
+                                 method="POST" if data is not None else "GET")
+    try:
+        with urllib.request.urlopen(req, timeout=config["TIMEOUT"]) as resp:
+            body = resp.read()
+            if resp.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return json.loads(body)
+    except urllib.error.HTTPError as e:
+        if 400 <= e.code < 500 and e.code not in (408, 429):
+            raise PermanentForwardError(f"{e.code} from {url}: {e.read()[:200]!r}") from e
+        raise
+
+
+# ----------------------------------------------------------------------
+# REGISTRY SYNC (central -> edge)
+# ----------------------------------------------------------------------
+
+def sync_registry(config=None):
+    """
+    Mirror readers, antennas and registered EPCs from the central server.
+    EPCs come from the versioned registry filter: only the changes since
+    the last synced version, or the full list on the first sync.
+    """
+    config = config or get_config()
+    registry = _call(config, "/api/ingest/registry/?epcs=0")
+    synced, _ = ForwardWatermark.objects.get_or_create(name=REGISTRY_VERSION)
+    path = "/api/registry/filter/?exact=1"
+    if synced.last_id:
+        path += f"&since={synced.last_id}"
+    update = _call(config, path)
+
+    with transaction.atomic():
+        for r in registry["readers"]:
+            reader, _ = Readers.objects.update_or_create(
+                mac_address=r["mac"],
+                defaults={"model": r.get("model"), "location": r.get("location")},
+            )
+            existing = set(
+                Antennas.objects.filter(reader=reader).values_list("port_number", flat=True)
+            )
+            Antennas.objects.bulk_create([
+                Antennas(reader=reader, port_number=port)
+                for port in r["antennas"] if port not in existing
+            ])
+
+        local = set(RfidItemsTemp.objects.values_list("epc", flat=True))
+        if update["full"]:
+            central = set(update["epcs"])
+            removed, added = local - central, central - local
+        else:
+            removed, added = set(update["removed"]), set(update["added"])
+        RfidItemsTemp.objects.filter(epc__in=removed).delete()
+        # rfid_items_temp.epc is not unique, so only insert EPCs we lack.
+        RfidItemsTemp.objects.bulk_create(
+            [RfidItemsTemp(epc=epc) for epc in added - (local - removed)], batch_size=1000
+        )
+
+        synced.last_id = update["version"]
+        synced.save(update_fields=["last_id", "updated_at"])
+        # bulk_create sends no post_save signals
+        transaction.on_commit(ingest.invalidate_caches)
+
+    return {"readers": len(registry["readers"]), "epcs": RfidItemsTemp.objects.count(),
+            "version": update["version"], "added": len(added), "removed": len(removed)}
+
+
+# ----------------------------------------------------------------------
+# FORWARDER (edge -> central)
+# ----------------------------------------------------------------------
+
+def forward_once(config=None):
+    """
+    Forward the next batch after the watermark; returns the number sent.
+
+    The central server dedups on (epc, time bucket), so re-sending a batch
+    after a lost acknowledgement is harmless. Reads central rejects one by
+    one (unknown reader or antenna) are logged and skipped; if it refuses
+    the whole batch, PermanentForwardError propagates and the watermark
+    stays put, so nothing is lost while the setup is fixed.
+    """
+    config = config or get_config()
+    watermark, _ = ForwardWatermark.objects.get_or_create(name=WATERMARK)
+
+    batch = list(
+        Detections.objects
+        .select_related("reader", "antenna")
+        .filter(detection_id__gt=watermark.last_id)
+        .order_by("detection_id")[:config["BATCH_SIZE"]]
+    )
+    if not batch:
+        return 0
+
+    payload = {
+        "tag_reads": [{
+            "mac": d.reader.mac_address,
+            "epc": d.epc,
+            "antennaPort": d.antenna.port_number if d.antenna else None,
+            "peakRssi": float(d.rssi) if d.rssi is not None else None,
+            "detected_at": d.detected_at.isoformat(),
+        } for d in batch],
+    }
+
+    reply = _call(config, "/api/ingest/batch/", payload)
+    rejected = reply.get("rejected") or []
+    for row in rejected:
+        logger.error("Central rejected detection %d, skipping it: %s",
+                     batch[row["index"]].detection_id, row["error"])
+    metrics.edge_forward_rejected.inc(len(rejected))
+    metrics.edge_forwarded.inc(len(batch) - len(rejected))
+
+    watermark.last_id = batch[-1].detection_id
+    watermark.save(update_fields=["last_id", "updated_at"])
+    return len(batch)
+
+
+def pending_count():
+    watermark = ForwardWatermark.objects.filter(name=WATERMARK).first()
+    last_id = watermark.last_id if watermark else 0
+    return Detections.objects.filter(detection_id__gt=last_id).count()
@@ -0,0 +1,178 @@
+"""
+Compact EPC representation.
+
+EPCs arrive as hex strings (24 characters for SGTIN-96). Internally they
+are packed to ``(bits, hi, lo)``: the bit length plus the value split into
+two signed 64-bit halves, which fits fixed-width BIGINT columns and a
+3-column unique index. ``epc_ids`` maps EPCs to a small surrogate id
+(EpcCode) so hot tables can key on a 4-byte integer; hex strings only
+appear again at the API edge via ``unpack``.
+
+Only plain hex digits pack; case is not significant, so ``"e2..."`` and
+``"E2..."`` share a code. EPCs longer than 128 bits or containing anything
+else (``0x`` prefixes, ``_``, whitespace) cannot be packed (``pack`` raises
+ValueError); ``epc_ids`` gives them a code that keeps the raw string
+instead, so they are deduped and stored like any other registered EPC.
+
+Only the dedup claims key on these ids; the state tables (presence, zones,
+visits, the registry) still key on the EPC string.
+"""
+import re
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import EpcCode
+
+
+MAX_BITS = 128
+_MASK = (1 << 64) - 1
+_HEX = re.compile(r"[0-9A-Fa-f]+")
+
+# Process-local EPC -> surrogate id cache; cleared wholesale when it gets big.
+CACHE_SIZE = 200_000
+
+_ids = {}
+_ids_lock = threading.Lock()
+
+
+def _signed(value):
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def pack(epc):
+    """``"3034F87C..."`` -> ``(bits, hi, lo)``."""
+    bits = len(epc) * 4
+    # int(x, 16) alone would also take "0x12", "1_2" or " 12 ".
+    if not _HEX.fullmatch(epc) or bits > MAX_BITS:
+        raise ValueError(f"Cannot pack EPC {epc!r}")
+    value = int(epc.upper(), 16)
+    return bits, _signed(value >> 64), _signed(value & _MASK)
+
+
+def unpack(bits, hi, lo):
+    """Inverse of ``pack``; returns the EPC as upper-case hex."""
+    value = ((hi & _MASK) << 64) | (lo & _MASK)
+    return format(value, "0%dX" % (bits // 4))
+
+
+# SGTIN-96 partition table: company prefix digits -> (partition, prefix bits, item ref bits).
+SGTIN_PARTITIONS = {
+    12: (0, 40, 4),
+    11: (1, 37, 7),
+    10: (2, 34, 10),
+    9: (3, 30, 14),
+    8: (4, 27, 17),
+    7: (5, 24, 20),
+    6: (6, 20, 24),
+}
+SGTIN96_HEADER = 0x30
+SGTIN96_MAX_SERIAL = (1 << 38) - 1
+
+
+def sgtin96(company_prefix, item_reference, serial, filter_value=1):
+    """
+    Encode an SGTIN-96 EPC as hex.
+
+    ``company_prefix`` and ``item_reference`` are digit strings whose
+    lengths add up to 13 (the item reference includes the indicator digit).
+    """
+    if not (company_prefix.isdigit() and item_reference.isdigit()):
+        raise ValueError("Company prefix and item reference must be digits")
+    digits = len(company_prefix) + len(item_reference)
+    if len(company_prefix) not in SGTIN_PARTITIONS or digits != 13:
+        raise ValueError("Company prefix (6-12 digits) + item reference must be 13 digits")
+    if not 0 <= serial <= SGTIN96_MAX_SERIAL:
+        raise ValueError(f"Serial {serial} does not fit in 38 bits")
+    if not 0 <= filter_value <= 7:
+        raise ValueError("Filter value must be 0-7")
+
+    partition, prefix_bits, item_bits = SGTIN_PARTITIONS[len(company_prefix)]
+    value = SGTIN96_HEADER
+    value = (value << 3) | filter_value
+    value = (value << 3) | partition
+    value = (value << prefix_bits) | int(company_prefix)
+    value = (value << item_bits) | int(item_reference)
+    value = (value << 38) | serial
+    return format(value, "024X")
+
+
+def packable(epc):
+    try:
+        pack(epc)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def epc_ids(epcs, create=True):
+    """
+    ``{epc: epc_id}`` for the given EPCs, creating codes as needed (with
+    ``create=False`` only existing codes are looked up and nothing is written).
+
+    At most one INSERT IGNORE and one SELECT for the EPCs not already in the
+    process cache. EPCs that cannot be packed get a code keyed on the raw
+    string; empty or non-string values are left out of the result. Spellings
+    that differ only in case map to the same id.
+    """
+    result, missing, raw = {}, {}, set()
+    spellings = defaultdict(set)
+    with _ids_lock:
+        for epc in epcs:
+            epc_id = _ids.get(epc)
+            if epc_id is not None:
+                result[epc] = epc_id
+                continue
+            if not isinstance(epc, str) or not epc:
+                continue
+            try:
+                code = pack(epc)
+            except ValueError:
+                raw.add(epc)
+                continue
+            missing[epc.upper()] = code
+            spellings[epc.upper()].add(epc)
+
+    if not missing and not raw:
+        return result
+
+    packed = {code: epc for epc, code in missing.items()}
+    if create:
+        EpcCode.objects.bulk_create(
+            [EpcCode(bits=bits, hi=hi, lo=lo) for bits, hi, lo in packed]
+            + [EpcCode(bits=0, raw=epc) for epc in raw],
+            ignore_conflicts=True,
+        )
+    found = {}
+    for code in EpcCode.objects.filter(
+        Q(hi__in={hi for _, hi, _ in packed}, lo__in={lo for _, _, lo in packed})
+        | Q(raw__in=raw)
+    ):
+        if code.raw is not None:
+            found[code.raw] = code.epc_id
+            continue
+        normalized = packed.get((code.bits, code.hi, code.lo))
+        for epc in spellings.get(normalized, ()):
+            found[epc] = code.epc_id
+
+    # Only cache ids once they are committed; a rolled-back code may be reused.
+    transaction.on_commit(lambda: _remember(found))
+    result.update(found)
+    return result
+
+
+def _remember(found):
+    with _ids_lock:
+        if len(_ids) + len(found) > CACHE_SIZE:
+            _ids.clear()
+        _ids.update(found)
+
+
+def epcs_for(ids):
+    """``{epc_id: epc}`` for surrogate ids (upper-case hex unless stored raw)."""
+    return {
+        code.epc_id: code.raw if code.raw is not None else unpack(code.bits, code.hi, code.lo)
+        for code in EpcCode.objects.filter(epc_id__in=list(ids))
+    }
@@ -0,0 +1,296 @@
+"""
+Streaming per-antenna health statistics and anomaly flags.
+
+Every raw read is folded into a small per-batch accumulator in O(1)
+(``BatchStats.add``: read count plus Welford mean/M2 of RSSI), keyed by
+antenna and fixed time window. ``record`` then merges a whole batch into
+the antennas' AntennaHealth rows in a constant number of queries. When a
+window closes its read count and RSSI are compared with EWMA baselines
+and then folded into them:
+
+    rate_drop   reads in the window < RATE_DROP_RATIO x baseline
+    rssi_shift  window RSSI mean moved more than RSSI_SHIFT_SIGMAS standard
+                deviations (and at least RSSI_SHIFT_MIN_DB) from baseline
+    silence     no reads for long enough that the baseline rate would
+                have produced SILENCE_EXPECTED_READS (checked by ``sweep``)
+
+Newly raised flags are logged and written to the ``logs`` table.
+"""
+import logging
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import metrics
+from .models import AntennaHealth, Logs
+
+
+logger = logging.getLogger(__name__)
+
+
+RATE_DROP, RSSI_SHIFT, SILENCE = "rate_drop", "rssi_shift", "silence"
+
+DEFAULTS = {
+    "WINDOW_SECONDS": 60,
+    # EWMA half-life of the baselines, in windows.
+    "BASELINE_HALF_LIFE": 60,
+    # Closed windows needed before any flag is raised.
+    "WARMUP_WINDOWS": 10,
+    # Rate drops are only flagged for antennas that normally read at least this much per window.
+    "MIN_BASELINE_READS": 30,
+    "RATE_DROP_RATIO": 0.2,
+    "MIN_RSSI_SAMPLES": 20,
+    "RSSI_SHIFT_SIGMAS": 2.0,
+    "RSSI_SHIFT_MIN_DB": 3.0,
+    "SILENCE_MIN_WINDOWS": 5,
+    "SILENCE_EXPECTED_READS": 50,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "RFID_ANTENNA_HEALTH", {}))
+    return config
+
+
+def _merge(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """Combine two Welford (count, mean, M2) summaries."""
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n
+
+
+class BatchStats:
+    """Per-(antenna, window) read counts and RSSI summaries of one ingest batch."""
+
+    def __init__(self, window_seconds=None):
+        self.window = window_seconds or get_config()["WINDOW_SECONDS"]
+        # (antenna_id, window) -> [reader_id, reads, rssi_n, rssi_mean, rssi_m2, last_seen]
+        self.cells = {}
+
+    def add(self, reader_id, antenna_id, rssi, seen_at):
+        key = (antenna_id, int(seen_at.timestamp()) // self.window)
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = [reader_id, 0, 0, 0.0, 0.0, seen_at]
+        cell[1] += 1
+        if rssi is not None:
+            x = float(rssi)
+            cell[2] += 1
+            delta = x - cell[3]
+            cell[3] += delta / cell[2]
+            cell[4] += delta * (x - cell[3])
+        if seen_at > cell[5]:
+            cell[5] = seen_at
+
+    def __bool__(self):
+        return bool(self.cells)
+
+
+def _window_index(health, window):
+    return int(health.window_start.timestamp()) // window
+
+
+def _window_flags(health, config):
+    """
+    ``{flag: message}`` for the window about to close, against the current
+    baselines.
+    """
+    if health.windows < config["WARMUP_WINDOWS"]:
+        return {}
+
+    flags = {}
+    per_minute = 60 / config["WINDOW_SECONDS"]
+    if (health.rate_baseline >= config["MIN_BASELINE_READS"]
+            and health.window_reads < config["RATE_DROP_RATIO"] * health.rate_baseline):
+        flags[RATE_DROP] = (
+            f"read rate dropped to {health.window_reads * per_minute:.0f}/min "
+            f"(baseline {health.rate_baseline * per_minute:.0f}/min)"
+        )
+
+    if (health.rssi_baseline_var is not None
+            and health.window_rssi_count >= config["MIN_RSSI_SAMPLES"]):
+        threshold = max(config["RSSI_SHIFT_MIN_DB"],
+                        config["RSSI_SHIFT_SIGMAS"] * math.sqrt(health.rssi_baseline_var))
+        if abs(health.window_rssi_mean - health.rssi_baseline_mean) > threshold:
+            flags[RSSI_SHIFT] = (
+                f"RSSI shifted to {health.window_rssi_mean:.1f} dBm "
+                f"(baseline {health.rssi_baseline_mean:.1f} dBm)"
+            )
+    return flags
+
+
+def _close_window(health, next_index, config):
+    """Evaluate the open window, fold it (and any empty windows after it) into the baselines."""
+    flags = _window_flags(health, config)
+    # Plain running mean until the EWMA has enough history to take over.
+    alpha = max(1 - 0.5 ** (1 / config["BASELINE_HALF_LIFE"]), 1 / (health.windows + 1))
+
+    health.rate_baseline += alpha * (health.window_reads - health.rate_baseline)
+
+    n = health.window_rssi_count
+    if n:
+        mean, var = health.window_rssi_mean, health.window_rssi_m2 / n
+        if health.rssi_baseline_mean is None:
+            health.rssi_baseline_mean, health.rssi_baseline_var = mean, var
+        else:
+            health.rssi_baseline_mean += alpha * (mean - health.rssi_baseline_mean)
+            health.rssi_baseline_var += alpha * (var - health.rssi_baseline_var)
+
+    empty = max(next_index - _window_index(health, config["WINDOW_SECONDS"]) - 1, 0)
+    health.rate_baseline *= (1 - alpha) ** empty
+    health.windows += 1 + empty
+    health.last_window_reads = health.window_reads
+    return flags
+
+
+def _open_window(health, index, window):
+    health.window_start = datetime.fromtimestamp(index * window, tz=dt_timezone.utc)
+    health.window_reads = 0
+    health.window_rssi_count = 0
+    health.window_rssi_mean = 0.0
+    health.window_rssi_m2 = 0.0
+
+
+def silent(health, now, config):
+    """True if the antenna has been quiet for far longer than its baseline allows."""
+    if health.last_read_at is None or health.windows < config["WARMUP_WINDOWS"]:
+        return False
+    quiet = (now - health.last_read_at).total_seconds() / config["WINDOW_SECONDS"]
+    return (quiet >= config["SILENCE_MIN_WINDOWS"]
+            and quiet * health.rate_baseline >= config["SILENCE_EXPECTED_READS"])
+
+
+def _set_flags(health, flags, now, logs):
+    """
+    Store ``flags`` (``{flag: message}``); log and queue a ``logs`` row for
+    each newly raised one.
+    """
+    old = set(health.flags)
+    if set(flags) == old:
+        return
+
+    for flag in sorted(set(flags) - old):
+        message = flags[flag]
+        logger.warning("Antenna %s (reader %s): %s", health.antenna_id, health.reader_id, message)
+        metrics.antenna_anomalies.inc(flag=flag)
+        logs.append(Logs(action="antenna", reader_id=health.reader_id, created_at=now,
+                         note=f"Antenna {health.antenna_id}: {message}"[:255]))
+    for flag in sorted(old - set(flags)):
+        logger.info("Antenna %s (reader %s): %s cleared", health.antenna_id, health.reader_id, flag)
+
+    health.flags = sorted(flags)
+    health.flagged_at = now if flags else None
+
+
+def record(stats, now=None):
+    """Fold one batch's ``BatchStats`` into the antennas' AntennaHealth rows."""
+    if not stats:
+        return
+
+    config = get_config()
+    window = stats.window
+    now = now or timezone.now()
+    by_antenna = {}
+    for (antenna_id, index), cell in sorted(stats.cells.items()):
+        by_antenna.setdefault(antenna_id, []).append((index, cell))
+    antenna_ids = sorted(by_antenna)
+
+    logs, updated = [], []
+    with transaction.atomic():
+        AntennaHealth.objects.bulk_create(
+            [AntennaHealth(antenna_id=a, reader_id=by_antenna[a][0][1][0]) for a in antenna_ids],
+            ignore_conflicts=True,
+        )
+        rows = AntennaHealth.objects.select_for_update().filter(
+            antenna_id__in=antenna_ids
+        ).order_by("antenna_id")
+
+        for health in rows:
+            flags = {flag: None for flag in health.flags if flag != SILENCE}
+            for index, cell in by_antenna[health.antenna_id]:
+                _, reads, rssi_n, rssi_mean, rssi_m2, last_seen = cell
+                health.total_reads += reads
+                if health.last_read_at is None or last_seen > health.last_read_at:
+                    health.last_read_at = last_seen
+
+                if health.window_start is None:
+                    _open_window(health, index, window)
+                current = _window_index(health, window)
+                if index < current:
+                    continue  # late reads for a window that is already closed
+                if index > current:
+                    flags = _close_window(health, index, config)
+                    _open_window(health, index, window)
+
+                health.window_reads += reads
+                (health.window_rssi_count, health.window_rssi_mean,
+                 health.window_rssi_m2) = _merge(
+                    health.window_rssi_count, health.window_rssi_mean, health.window_rssi_m2,
+                    rssi_n, rssi_mean, rssi_m2,
+                )
+
+            _set_flags(health, flags, now, logs)
+            updated.append(health)
+
+        AntennaHealth.objects.bulk_update(updated, [
+            f.name for f in AntennaHealth._meta.concrete_fields if not f.primary_key
+        ])
+        Logs.objects.bulk_create(logs)
+
+
+def sweep(now=None):
+    """Raise the silence flag on antennas that stopped reading; returns how many were flagged."""
+    config = get_config()
+    now = now or timezone.now()
+    per_minute = 60 / config["WINDOW_SECONDS"]
+    cutoff = now - timedelta(seconds=config["SILENCE_MIN_WINDOWS"] * config["WINDOW_SECONDS"])
+
+    logs, flagged = [], []
+    with transaction.atomic():
+        rows = AntennaHealth.objects.select_for_update().filter(
+            last_read_at__lt=cutoff
+        ).order_by("antenna_id")
+        for health in rows:
+            if SILENCE in health.flags or not silent(health, now, config):
+                continue
+            flags = {flag: None for flag in health.flags}
+            flags[SILENCE] = (
+                f"silent since {health.last_read_at:%Y-%m-%d %H:%M:%S} "
+                f"(baseline {health.rate_baseline * per_minute:.0f}/min)"
+            )
+            _set_flags(health, flags, now, logs)
+            flagged.append(health)
+
+        AntennaHealth.objects.bulk_update(flagged, ["flags", "flagged_at"])
+        Logs.objects.bulk_create(logs)
+    return len(flagged)
+
+
+def snapshot(now):
+    """``{antenna_id: dict}`` of health figures for the reader-status API."""
+    config = get_config()
+    per_minute = 60 / config["WINDOW_SECONDS"]
+    result = {}
+    for health in AntennaHealth.objects.all():
+        flags = set(health.flags)
+        if silent(health, now, config):
+            flags.add(SILENCE)
+        variance = (health.window_rssi_m2 / health.window_rssi_count
+                    if health.window_rssi_count else None)
+        result[health.antenna_id] = {
+            "readsPerMinute": round(health.last_window_reads * per_minute, 1),
+            "baselineReadsPerMinute": round(health.rate_baseline * per_minute, 1),
+            "rssiMean": round(health.window_rssi_mean, 2) if health.window_rssi_count else None,
+            "rssiStdDev": round(math.sqrt(variance), 2) if variance is not None else None,
+            "baselineRssi": (round(health.rssi_baseline_mean, 2)
+                             if health.rssi_baseline_mean is not None else None),
+            "lastReadAt": health.last_read_at.isoformat() if health.last_read_at else None,
+            "anomalies": sorted(flags),
+        }
+    return result
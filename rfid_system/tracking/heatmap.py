@@ -0,0 +1,105 @@
+"""
+Reader/antenna activity heatmaps.
+
+Detections in a date range are pulled as compact (reader, antenna, time)
+columns in chunks and counted per (antenna, time bucket) with one NumPy
+``bincount`` per chunk. Buckets are the local hour of day, the local day
+of week, or fixed-width intervals from the start of the range.
+"""
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+import numpy as np
+
+from .models import Antennas, Detections, Readers
+
+
+HOUR, WEEKDAY, INTERVAL = "hour", "weekday", "interval"
+MODES = (HOUR, WEEKDAY, INTERVAL)
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+CHUNK_SIZE = 100_000
+MAX_INTERVAL_BUCKETS = 10_000
+
+
+def _key(reader_id, antenna_id):
+    """``reader_id << 32 | antenna_id`` as one int64 (antenna -1 = whole reader)."""
+    return (reader_id << 32) | ((antenna_id if antenna_id is not None else -1) & 0xFFFFFFFF)
+
+
+def antenna_pairs():
+    """Every ``(reader_id, antenna_id)`` a read can be attributed to, sorted by key."""
+    pairs = set(Antennas.objects.values_list("reader_id", "antenna_id"))
+    readers = Readers.objects.values_list("reader_id", flat=True)
+    pairs |= {(reader_id, None) for reader_id in readers}
+    return sorted(pairs, key=lambda p: _key(*p))
+
+
+def _utc_offsets(epoch_seconds, tz):
+    """Local UTC offset (seconds) for each timestamp, resolved once per distinct hour."""
+    hours, inverse = np.unique(epoch_seconds // 3600, return_inverse=True)
+    offsets = np.array([
+        tz.utcoffset(datetime.fromtimestamp(int(h) * 3600, tz=timezone.utc)).total_seconds()
+        for h in hours
+    ])
+    return offsets[inverse]
+
+
+def bucket_labels(mode, start, end, interval):
+    if mode == HOUR:
+        return [f"{h:02d}:00" for h in range(24)]
+    if mode == WEEKDAY:
+        return list(WEEKDAYS)
+    count = int(np.ceil((end - start).total_seconds() / interval))
+    return [(start + timedelta(seconds=interval * i)).isoformat() for i in range(count)]
+
+
+def compute(start, end, mode, tz, interval=3600, epcs=None, chunk_size=CHUNK_SIZE):
+    """
+    ``(pairs, labels, counts)``: antenna pairs ``(reader_id, antenna_id)``,
+    bucket labels, and an int64 matrix of reads per pair x bucket.
+    """
+    pairs = antenna_pairs()
+    keys = np.array([_key(r, a) for r, a in pairs], dtype=np.int64)
+    labels = bucket_labels(mode, start, end, interval)
+    n_buckets = len(labels)
+    counts = np.zeros(len(pairs) * n_buckets, dtype=np.int64)
+    if not pairs or not n_buckets:
+        return pairs, labels, counts.reshape(len(pairs), n_buckets)
+
+    qs = Detections.objects.filter(detected_at__gte=start, detected_at__lt=end)
+    if epcs is not None:
+        qs = qs.filter(epc__in=list(epcs))
+    rows = qs.values_list("reader_id", "antenna_id", "detected_at").iterator(chunk_size=chunk_size)
+
+    start_ts = start.timestamp()
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        reader_col, antenna_col, time_col = zip(*chunk)
+        row_keys = (np.fromiter(reader_col, dtype=np.int64, count=len(chunk)) << 32) | (
+            np.fromiter((a if a is not None else -1 for a in antenna_col),
+                        dtype=np.int64, count=len(chunk)) & 0xFFFFFFFF
+        )
+        ts = np.fromiter((t.timestamp() for t in time_col), dtype=np.float64, count=len(chunk))
+
+        if mode == INTERVAL:
+            bucket = ((ts - start_ts) // interval).astype(np.int64)
+        else:
+            local = ts + _utc_offsets(ts.astype(np.int64), tz)
+            if mode == HOUR:
+                bucket = ((local // 3600) % 24).astype(np.int64)
+            else:  # 1970-01-01 was a Thursday (index 3 with Monday = 0)
+                bucket = ((local // 86400 + 3) % 7).astype(np.int64)
+
+        idx = np.searchsorted(keys, row_keys)
+        idx = np.minimum(idx, len(keys) - 1)
+        valid = (keys[idx] == row_keys) & (bucket >= 0) & (bucket < n_buckets)
+
+        counts += np.bincount(
+            idx[valid] * n_buckets + bucket[valid], minlength=len(counts)
+        )
+
+    return pairs, labels, counts.reshape(len(pairs), n_buckets)
@@ -0,0 +1,419 @@
+"""
+Ingest pipeline for tag reads posted by readers.
+
+Deduplication is done with a claim table (DetectionDedup) keyed on
+(EPC surrogate id, time bucket): each batch inserts its claims with
+insert-ignore semantics and keeps only the ones carrying its own claim
+token, so two workers can never both store the same EPC for the same
+bucket. Claims are pruned after CLAIM_RETENTION, so reads for older
+windows (backfills from buffered readers) are checked against the stored
+detections instead.
+
+The registered EPC set and the antenna layout are cached per process for
+CACHE_SECONDS; edits made through Django drop the caches right away
+(``invalidate_caches``), edits made directly in the database show up
+within CACHE_SECONDS.
+"""
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import clock, epc as epc_codes, health, metrics, presence, visits, zones
+from .models import (
+    Antennas, Detections, DetectionDedup, DetectionFanIn, Readers, RfidItemsTemp,
+)
+
+
+CLAIM_RETENTION = timedelta(hours=1)
+CACHE_SECONDS = 30
+
+_cache = {"epcs_at": None, "epcs": frozenset(), "antennas_at": None, "antennas": {}}
+_cache_lock = threading.Lock()
+
+
+def dedup_window_seconds():
+    return getattr(settings, "RFID_DEDUP_WINDOW_SECONDS", 5)
+
+
+def dedup_bucket(detected_at, window=None):
+    """Index of the fixed dedup window that ``detected_at`` falls in."""
+    window = window or dedup_window_seconds()
+    return int(detected_at.timestamp()) // window
+
+
+def claim_dedup_keys(keys, now):
+    """
+    Atomically claim ``(epc, bucket)`` keys and return the claims we won.
+
+    Uses one INSERT IGNORE for the whole batch plus one SELECT on our
+    claim token, which is correct across threads and processes. Returns
+    ``{key: DetectionDedup}``.
+    """
+    if not keys:
+        return {}
+
+    ids = epc_codes.epc_ids({epc for epc, _ in keys})
+    epc_of = {epc_id: epc for epc, epc_id in ids.items()}
+
+    token = uuid.uuid4().hex
+    DetectionDedup.objects.bulk_create(
+        [
+            DetectionDedup(epc_id=ids[epc], bucket=bucket, claim_token=token, created_at=now)
+            for epc, bucket in keys if epc in ids
+        ],
+        ignore_conflicts=True,
+    )
+    return {
+        (epc_of[claim.epc_id], claim.bucket): claim
+        for claim in DetectionDedup.objects.filter(claim_token=token)
+    }
+
+
+def already_stored(keys):
+    """
+    The ``(epc, bucket)`` keys whose window already has a stored detection,
+    in one range query. Used for windows older than CLAIM_RETENTION.
+    """
+    if not keys:
+        return set()
+
+    window = dedup_window_seconds()
+    buckets = [bucket for _, bucket in keys]
+    stored = (
+        Detections.objects
+        .filter(
+            epc__in={epc for epc, _ in keys},
+            detected_at__gte=datetime.fromtimestamp(min(buckets) * window, tz=dt_timezone.utc),
+            detected_at__lt=datetime.fromtimestamp((max(buckets) + 1) * window, tz=dt_timezone.utc),
+        )
+        .values_list("epc", "detected_at")
+    )
+    return {(epc, dedup_bucket(t, window)) for epc, t in stored} & set(keys)
+
+
+def _expired(at):
+    return at is None or time.monotonic() - at >= CACHE_SECONDS
+
+
+def registered_epcs():
+    """The registered EPCs, reloaded at most every CACHE_SECONDS."""
+    with _cache_lock:
+        if _expired(_cache["epcs_at"]):
+            _cache["epcs"] = frozenset(RfidItemsTemp.objects.values_list("epc", flat=True))
+            _cache["epcs_at"] = time.monotonic()
+        return _cache["epcs"]
+
+
+def antenna_map(readers):
+    """``{(reader_id, port_number): Antenna}`` for the given readers."""
+    with _cache_lock:
+        if _expired(_cache["antennas_at"]):
+            _cache["antennas"] = {
+                (a.reader_id, a.port_number): a for a in Antennas.objects.all()
+            }
+            _cache["antennas_at"] = time.monotonic()
+        antennas = _cache["antennas"]
+    reader_ids = {r.reader_id for r in readers}
+    return {key: a for key, a in antennas.items() if key[0] in reader_ids}
+
+
+@receiver(post_save, sender=RfidItemsTemp)
+@receiver(post_delete, sender=RfidItemsTemp)
+@receiver(post_save, sender=Antennas)
+@receiver(post_delete, sender=Antennas)
+def invalidate_caches(**kwargs):
+    """Reload the registry and antenna caches on next use (call after bulk edits)."""
+    with _cache_lock:
+        _cache["epcs_at"] = _cache["antennas_at"] = None
+
+
+def fanin_policy():
+    """Which read represents a tag heard by several antennas in one window."""
+    return getattr(settings, "RFID_FANIN_POLICY", "strongest")
+
+
+def _prefer(policy, current_rssi, current_at, rssi, seen_at):
+    """True if a read (``rssi``, ``seen_at``) should replace the current one."""
+    if policy == "strongest":
+        if rssi is None:
+            return False
+        return current_rssi is None or float(rssi) > float(current_rssi)
+    if policy == "latest":
+        return seen_at > current_at
+    return False  # "first"
+
+
+class Candidate:
+    """Best read of one EPC in one dedup window, plus who else heard it."""
+
+    __slots__ = ("detection", "antennas", "reads")
+
+    def __init__(self, detection):
+        self.detection = detection
+        self.antennas = {detection.antenna_id}
+        self.reads = 1
+
+    def merge(self, reader, antenna, rssi, seen_at, policy):
+        self.antennas.add(antenna.antenna_id)
+        self.reads += 1
+        det = self.detection
+        if _prefer(policy, det.rssi, det.detected_at, rssi, seen_at):
+            det.reader, det.antenna, det.rssi, det.detected_at = reader, antenna, rssi, seen_at
+
+
+def collect_reads(reader, tag_reads, detected_at, valid_epcs, antennas, candidates, ignored,
+                  timestamp_of=None, health_stats=None):
+    """
+    Filter one reader batch into ``candidates`` (keyed by dedup key).
+
+    Unregistered EPCs are appended to ``ignored``. Reads of the same EPC in
+    the same window, from any reader or antenna, collapse into one
+    Candidate chosen by ``fanin_policy()``. Each read is stamped
+    ``detected_at`` unless ``timestamp_of(tag)`` returns its own time.
+    Every registered read is also counted into ``health_stats`` if given.
+    """
+    metrics.tags_received.inc(len(tag_reads))
+    policy = fanin_policy()
+
+    for tag in tag_reads:
+        epc = tag.get("epc")
+
+        if epc not in valid_epcs:
+            ignored.append(epc)
+            metrics.tags_ignored.inc()
+            continue
+
+        antenna_port = tag.get("antennaPort")
+        antenna = antennas.get((reader.reader_id, antenna_port))
+        if antenna is None:
+            raise Antennas.DoesNotExist(
+                f"No antenna {antenna_port} on reader {reader.reader_id}"
+            )
+
+        seen_at = (timestamp_of(tag) if timestamp_of else None) or detected_at
+        rssi = tag.get("peakRssi")
+        key = (epc, dedup_bucket(seen_at))
+        if health_stats is not None:
+            health_stats.add(reader.reader_id, antenna.antenna_id, rssi, seen_at)
+
+        if key in candidates:
+            candidates[key].merge(reader, antenna, rssi, seen_at, policy)
+            metrics.tags_duplicate.inc()
+            continue
+
+        candidates[key] = Candidate(Detections(
+            epc=epc,
+            reader=reader,
+            antenna=antenna,
+            rssi=rssi,
+            detected_at=seen_at,
+            project_id=None,
+        ))
+
+
+def _ensure_pks(rows):
+    """Fill detection ids when the backend cannot return them from bulk_create."""
+    missing = [d for d in rows if d.pk is None]
+    if not missing:
+        return
+
+    ids = {
+        (epc, reader_id, detected_at): pk
+        for pk, epc, reader_id, detected_at in Detections.objects
+        .filter(epc__in={d.epc for d in missing},
+                detected_at__in={d.detected_at for d in missing})
+        .values_list("pk", "epc", "reader_id", "detected_at")
+    }
+    for det in missing:
+        det.pk = ids.get((det.epc, det.reader_id, det.detected_at))
+
+
+def _merge_into_stored(lost, policy):
+    """
+    Fold candidates that lost their claim into the detection already stored
+    for that window (possibly by another worker). Returns ``(detection,
+    replaced_at)`` pairs for the detections whose representative read
+    changed, ``replaced_at`` being the time of the read it replaced.
+    """
+    ids = epc_codes.epc_ids({k[0] for k in lost})
+    epc_of = {epc_id: epc for epc, epc_id in ids.items()}
+    claims = {
+        (epc_of[c.epc_id], c.bucket): c
+        for c in DetectionDedup.objects
+        .select_for_update()
+        .filter(epc_id__in=list(epc_of), bucket__in={k[1] for k in lost},
+                detection_id__isnull=False)
+        .order_by("epc_id", "bucket")
+    }
+    if not claims:
+        return []
+
+    stored = Detections.objects.in_bulk([c.detection_id for c in claims.values()])
+    fanin = DetectionFanIn.objects.in_bulk(list(stored))
+
+    changed_claims, changed_dets, replaced = [], [], []
+    for key, claim in claims.items():
+        cand = lost.get(key)
+        det = stored.get(claim.detection_id)
+        if cand is None or det is None:
+            continue
+
+        claim.antenna_ids = sorted(set(claim.antenna_ids) | cand.antennas)
+        new = cand.detection
+        if _prefer(policy, det.rssi, det.detected_at, new.rssi, new.detected_at):
+            replaced.append((det, det.detected_at))
+            det.reader, det.antenna = new.reader, new.antenna
+            det.rssi, det.detected_at = new.rssi, new.detected_at
+            changed_dets.append(det)
+        changed_claims.append(claim)
+
+        counts = fanin.get(det.pk)
+        if counts is not None:
+            counts.antenna_count = len(claim.antenna_ids)
+            counts.read_count += cand.reads
+
+    DetectionDedup.objects.bulk_update(changed_claims, ["antenna_ids"])
+    Detections.objects.bulk_update(changed_dets, ["reader", "antenna", "rssi", "detected_at"])
+    DetectionFanIn.objects.bulk_update(list(fanin.values()), ["antenna_count", "read_count"])
+    return replaced
+
+
+def store_candidates(candidates, now):
+    """
+    Claim dedup keys, bulk-insert the detections we won, fold the rest into
+    the detections already stored for their window, and advance presence,
+    zones and visits.
+    """
+    policy = fanin_policy()
+    received = len(candidates)
+
+    with transaction.atomic():
+        horizon = dedup_bucket(now - CLAIM_RETENTION)
+        stale = already_stored([key for key in candidates if key[1] < horizon])
+        if stale:
+            candidates = {k: c for k, c in candidates.items() if k not in stale}
+
+        won = claim_dedup_keys(list(candidates), now)
+        rows = [cand.detection for key, cand in candidates.items() if key in won]
+        Detections.objects.bulk_create(rows)
+        _ensure_pks(rows)
+
+        claims, fanin = [], []
+        for key, claim in won.items():
+            cand = candidates[key]
+            claim.detection_id = cand.detection.pk
+            claim.antenna_ids = sorted(cand.antennas)
+            claims.append(claim)
+            fanin.append(DetectionFanIn(
+                detection_id=cand.detection.pk,
+                antenna_count=len(cand.antennas),
+                read_count=cand.reads,
+            ))
+        DetectionDedup.objects.bulk_update(claims, ["detection_id", "antenna_ids"])
+        DetectionFanIn.objects.bulk_create(fanin, ignore_conflicts=True)
+
+        lost = {key: cand for key, cand in candidates.items() if key not in won}
+        changed = _merge_into_stored(lost, policy) if lost else []
+
+        # A changed detection is the same sighting with a better read, not a
+        # new one: it corrects state without logging transitions.
+        presence.apply_detections(rows, now, corrected=changed)
+        zones.apply_detections(rows, corrected=changed)
+        visits.apply_detections(rows, corrected=changed)
+
+    metrics.tags_saved.inc(len(rows))
+    metrics.tags_duplicate.inc(received - len(rows))
+    return rows
+
+
+def ingest_tag_reads(reader, tag_reads, now=None):
+    """
+    Store registered, non-duplicate tag reads for ``reader``.
+
+    Reads are stamped with the reader's own first-seen time, corrected for
+    its clock skew (see tracking/clock.py), falling back to ``now``.
+    Returns ``(saved, ignored)`` lists of EPCs.
+    """
+    now = now or timezone.now()
+    candidates, ignored = {}, []
+    stats = health.BatchStats()
+
+    clocks = clock.load([reader.reader_id])
+    collect_reads(
+        reader, tag_reads, now,
+        registered_epcs(), antenna_map([reader]),
+        candidates, ignored,
+        timestamp_of=clock.correct(clocks[reader.reader_id], tag_reads, now),
+        health_stats=stats,
+    )
+    rows = store_candidates(candidates, now)
+    clock.save(clocks.values(), now)
+    health.record(stats, now)
+
+    return [det.epc for det in rows], ignored
+
+
+def _forwarded_time(tag):
+    return parse_datetime(tag.get("detected_at") or "")
+
+
+def ingest_forwarded_batch(tag_reads, now=None):
+    """
+    Store detections forwarded by an edge aggregator.
+
+    Each read carries its reader ``mac`` and original ``detected_at``, so the
+    dedup keys are the same on every retry and a re-sent batch stores
+    nothing twice. Reads from an unknown reader or antenna are rejected one
+    by one; the rest of the batch is stored. Returns ``(saved_rows,
+    ignored_epcs, unknown_macs, rejected)``, ``rejected`` being
+    ``{"index", "error"}`` dicts pointing into ``tag_reads``.
+    """
+    now = now or timezone.now()
+
+    macs = {tag.get("mac") for tag in tag_reads}
+    readers = {r.mac_address: r for r in Readers.objects.filter(mac_address__in=macs)}
+    valid_epcs = registered_epcs()
+    antennas = antenna_map(list(readers.values()))
+
+    by_reader = defaultdict(list)
+    unknown, rejected = [], []
+    for index, tag in enumerate(tag_reads):
+        mac = tag.get("mac")
+        reader = readers.get(mac)
+        if reader is None:
+            if mac not in unknown:
+                unknown.append(mac)
+            rejected.append({"index": index, "error": f"Unknown reader {mac}"})
+        elif (reader.reader_id, tag.get("antennaPort")) not in antennas:
+            rejected.append({
+                "index": index,
+                "error": f"No antenna {tag.get('antennaPort')} on reader {reader.reader_id}",
+            })
+        else:
+            by_reader[reader].append(tag)
+
+    candidates, ignored = {}, []
+    stats = health.BatchStats()
+    for reader, tags in by_reader.items():
+        collect_reads(reader, tags, now, valid_epcs, antennas, candidates, ignored,
+                      timestamp_of=_forwarded_time, health_stats=stats)
+
+    rows = store_candidates(candidates, now)
+    health.record(stats, now)
+    return rows, ignored, unknown, rejected
+
+
+def prune_dedup_keys(older_than=None):
+    """Delete dedup claims that can no longer collide with new reads."""
+    cutoff = timezone.now() - (older_than or CLAIM_RETENTION)
+    deleted, _ = DetectionDedup.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,101 @@
+"""
+Set-based inventory exceptions: registered items that are missing (not
+seen within presence.IDLE_FOR) or overdue (past ``checkby_date``).
+
+The sweep runs one annotated query over ``rfid_items_temp`` and stores the
+grouped result in SweepReport, where the API serves it until the next run.
+"""
+from collections import defaultdict
+
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import RfidItemsTemp, SweepReport, TagPresence
+from .presence import IDLE_FOR
+
+
+REPORT_NAME = "inventory_exceptions"
+
+GROUP_FIELDS = {
+    "storageLocation": "storage_location",
+    "project": "project_name",
+    "responsiblePerson": "responsible_person",
+}
+
+
+def compute_exceptions(now=None):
+    """Every missing or overdue registered item, grouped for reporting."""
+    now = now or timezone.now()
+    cutoff = now - IDLE_FOR
+    today = timezone.localdate(now)
+
+    last_seen = TagPresence.objects.filter(epc=OuterRef("epc")).values("last_seen")[:1]
+    rows = (
+        RfidItemsTemp.objects
+        .exclude(epc__isnull=True).exclude(epc="")
+        .annotate(last_seen=Subquery(last_seen))
+        .filter(
+            Q(last_seen__isnull=True)
+            | Q(last_seen__lt=cutoff)
+            | Q(checkby_date__lt=today)
+        )
+        .order_by("id")
+        .values(
+            "id", "epc", "barcode", "item_name", "storage_location",
+            "project_name", "responsible_person", "checkby_date", "last_seen",
+        )
+    )
+
+    items = []
+    groups = {name: defaultdict(lambda: {"missing": 0, "overdue": 0, "items": []})
+              for name in GROUP_FIELDS}
+
+    for row in rows.iterator(chunk_size=5000):
+        missing = row["last_seen"] is None or row["last_seen"] < cutoff
+        overdue = row["checkby_date"] is not None and row["checkby_date"] < today
+
+        idx = len(items)
+        items.append({
+            "id": row["id"],
+            "epc": row["epc"],
+            "barcode": row["barcode"] or "",
+            "objectName": row["item_name"] or "",
+            "storageLocation": row["storage_location"] or "",
+            "project": row["project_name"] or "",
+            "responsiblePerson": row["responsible_person"] or "",
+            "checkbyDate": row["checkby_date"].isoformat() if row["checkby_date"] else None,
+            "lastSeen": row["last_seen"].isoformat() if row["last_seen"] else None,
+            "missing": missing,
+            "overdue": overdue,
+        })
+
+        for name, field in GROUP_FIELDS.items():
+            group = groups[name][row[field] or ""]
+            group["missing"] += missing
+            group["overdue"] += overdue
+            group["items"].append(idx)
+
+    return {
+        "generatedAt": now.isoformat(),
+        "missingCount": sum(i["missing"] for i in items),
+        "overdueCount": sum(i["overdue"] for i in items),
+        "items": items,
+        "groups": {name: dict(values) for name, values in groups.items()},
+    }
+
+
+def sweep(now=None):
+    """Recompute the exceptions report and store it for the API."""
+    now = now or timezone.now()
+    payload = compute_exceptions(now)
+    SweepReport.objects.update_or_create(
+        name=REPORT_NAME,
+        defaults={"payload": payload, "computed_at": now},
+    )
+    return payload
+
+
+def latest_report():
+    """Stored report, or None if no sweep has run yet."""
+    report = SweepReport.objects.filter(name=REPORT_NAME).first()
+    return report.payload if report else None
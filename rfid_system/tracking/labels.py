@@ -0,0 +1,154 @@
+"""
+Bulk EPC allocation and label batches for the tag printer.
+
+Serials come from one locked counter row per (company prefix, item
+reference), so a block of N serials costs a single UPDATE and the codes
+need no per-row uniqueness check. Labels (and optionally registered
+items) for the whole block are inserted with bulk_create in the same
+transaction.
+"""
+import csv
+import io
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import ingest, registry
+from .epc import SGTIN96_MAX_SERIAL, sgtin96
+from .models import EpcSerialCounter, Labels, RfidItemsTemp
+
+
+MAX_BATCH = 10_000
+TAG_TYPE = "SGTIN-96"
+
+ITEM_FIELDS = ("item_name", "project_name", "responsible_person", "organization",
+               "storage_location", "checkby_date")
+
+
+@dataclass(frozen=True)
+class LabelBatch:
+    company_prefix: str
+    item_reference: str
+    first_serial: int
+    epcs: list
+    item_name: str
+
+
+def allocate_serials(company_prefix, item_reference, count):
+    """Reserve ``count`` consecutive serials; returns the first one."""
+    name = f"{company_prefix}.{item_reference}"
+    with transaction.atomic():
+        EpcSerialCounter.objects.get_or_create(name=name)
+        counter = EpcSerialCounter.objects.select_for_update().get(name=name)
+        first = counter.next_serial
+        if first + count - 1 > SGTIN96_MAX_SERIAL:
+            raise ValueError("Serial range exhausted for this item reference")
+        counter.next_serial = first + count
+        counter.save(update_fields=["next_serial", "updated_at"])
+    return first
+
+
+def create_batch(company_prefix, item_reference, count, filter_value=1, item=None):
+    """
+    Allocate ``count`` SGTIN-96 EPCs and create their Labels rows. With
+    ``item`` (a dict of RfidItemsTemp fields) each EPC is also registered
+    as an item. Everything happens in one transaction.
+    """
+    if isinstance(count, bool) or not isinstance(count, int) or not 0 < count <= MAX_BATCH:
+        raise ValueError(f"count must be an integer between 1 and {MAX_BATCH}")
+    # Validate the encoding and item fields before touching the counter.
+    sgtin96(company_prefix, item_reference, 0, filter_value)
+    if item is not None:
+        fields = {k: item.get(k) for k in ITEM_FIELDS if item.get(k) is not None}
+        if "checkby_date" in fields:
+            fields["checkby_date"] = _date(fields["checkby_date"])
+
+    now = timezone.now()
+    with transaction.atomic():
+        first = allocate_serials(company_prefix, item_reference, count)
+        epcs = [
+            sgtin96(company_prefix, item_reference, serial, filter_value)
+            for serial in range(first, first + count)
+        ]
+
+        Labels.objects.bulk_create(
+            [
+                Labels(code=epc, tag_type=TAG_TYPE, printed_at=now, created_at=now, updated_at=now)
+                for epc in epcs
+            ],
+            batch_size=1000,
+        )
+
+        if item is not None:
+            RfidItemsTemp.objects.bulk_create(
+                [RfidItemsTemp(epc=epc, **fields) for epc in epcs],
+                batch_size=1000,
+            )
+            # bulk_create sends no post_save signals
+            transaction.on_commit(registry.refresh, robust=True)
+            transaction.on_commit(ingest.invalidate_caches)
+
+    return LabelBatch(company_prefix, item_reference, first, epcs,
+                      str((item or {}).get("item_name") or ""))
+
+
+def _date(value):
+    """``"YYYY-MM-DD"`` -> date; ValueError for anything else."""
+    try:
+        parsed = parse_date(value) if isinstance(value, str) else None
+    except ValueError:  # well formed but not a real date, e.g. 2026-02-30
+        parsed = None
+    if parsed is None:
+        raise ValueError("checkby_date must be a date in YYYY-MM-DD format")
+    return parsed
+
+
+def csv_lines(batch):
+    """Yield a CSV label file (one row per tag) line by line."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def flush():
+        data = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return data
+
+    writer.writerow(["epc", "serial", "urn", "item_name"])
+    yield flush()
+    for offset, epc in enumerate(batch.epcs):
+        serial = batch.first_serial + offset
+        writer.writerow([
+            epc,
+            serial,
+            f"urn:epc:id:sgtin:{batch.company_prefix}.{batch.item_reference}.{serial}",
+            batch.item_name,
+        ])
+        yield flush()
+
+
+def zpl_text(text):
+    """
+    ``text`` as ^FH field data: ``^``, ``~``, the ``_`` escape character,
+    control and non-ASCII characters become ``_XX`` UTF-8 hex escapes, so
+    free text cannot end the field or inject commands.
+    """
+    return "".join(
+        chr(b) if 0x20 <= b < 0x7F and chr(b) not in "^~_" else f"_{b:02X}"
+        for b in text.encode("utf-8")
+    )
+
+
+def zpl_lines(batch):
+    """Yield ZPL II label formats that encode each EPC and print it as text."""
+    name = zpl_text(batch.item_name)
+    for epc in batch.epcs:
+        yield (
+            "^XA^CI28\n"
+            f"^RFW,H^FD{epc}^FS\n"
+            f"^FO30,30^A0N,28,28^FH^FD{name}^FS\n"
+            f"^FO30,70^A0N,22,22^FD{epc}^FS\n"
+            "^XZ\n"
+        )
@@ -0,0 +1,131 @@
+"""
+RSSI-based location estimation over a sliding window of detections.
+
+All reads in the window are scored at once with NumPy: each read contributes
+its linear signal power, decayed by age (exponential half-life), to a
+(tag x antenna) score matrix built with a single ``bincount``. The antenna
+with the highest smoothed score is the tag's most likely location and its
+share of the tag's total score is the confidence.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Detections
+
+
+DEFAULTS = {
+    "WINDOW_SECONDS": 30,
+    "HALF_LIFE_SECONDS": 5,
+    "CACHE_SECONDS": 1,
+    # Used for reads that carry no RSSI.
+    "DEFAULT_RSSI": -70.0,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "RFID_LOCATION", {}))
+    return config
+
+
+@dataclass(frozen=True)
+class Location:
+    reader_id: int
+    antenna_id: int | None
+    confidence: float
+    reads: int
+
+
+def score_reads(epcs, antenna_keys, rssi, age_seconds, half_life):
+    """
+    Vectorized scoring of raw reads.
+
+    ``epcs`` and ``antenna_keys`` are equal-length sequences of hashable
+    labels; ``rssi`` (dBm) and ``age_seconds`` are float arrays. Returns
+    ``{epc: (antenna_key, confidence, reads)}``.
+    """
+    if len(epcs) == 0:
+        return {}
+
+    tag_labels, tag_idx = np.unique(np.asarray(epcs), return_inverse=True)
+    ant_labels, ant_idx = np.unique(np.asarray(antenna_keys), return_inverse=True)
+    n_tags, n_ant = len(tag_labels), len(ant_labels)
+
+    power = np.power(10.0, np.asarray(rssi, dtype=np.float64) / 10.0)
+    decay = np.exp2(-np.asarray(age_seconds, dtype=np.float64) / half_life)
+    cell = tag_idx * n_ant + ant_idx
+
+    scores = np.bincount(cell, weights=power * decay, minlength=n_tags * n_ant)
+    scores = scores.reshape(n_tags, n_ant)
+    reads = np.bincount(tag_idx, minlength=n_tags)
+
+    best = scores.argmax(axis=1)
+    totals = scores.sum(axis=1)
+    best_scores = scores[np.arange(n_tags), best]
+    confidence = np.divide(best_scores, totals, out=np.zeros(n_tags), where=totals > 0)
+
+    return {
+        tag_labels[i].item(): (ant_labels[best[i]].item(), float(confidence[i]), int(reads[i]))
+        for i in range(n_tags)
+    }
+
+
+def estimate_locations(now=None, epcs=None, config=None):
+    """Most likely reader/antenna for every tag heard in the sliding window."""
+    config = config or get_config()
+    now = now or timezone.now()
+
+    qs = Detections.objects.filter(
+        detected_at__gte=now - timedelta(seconds=config["WINDOW_SECONDS"]),
+        detected_at__lte=now,
+    )
+    if epcs is not None:
+        qs = qs.filter(epc__in=list(epcs))
+
+    rows = list(qs.values_list("epc", "reader_id", "antenna_id", "rssi", "detected_at"))
+    if not rows:
+        return {}
+
+    epc_col, reader_col, antenna_col, rssi_col, time_col = zip(*rows)
+    # Reads without an antenna are attributed to the reader as a whole (-1).
+    antenna_keys = [
+        (reader_id << 32) | ((antenna_id if antenna_id is not None else -1) & 0xFFFFFFFF)
+        for reader_id, antenna_id in zip(reader_col, antenna_col)
+    ]
+    default_rssi = config["DEFAULT_RSSI"]
+    rssi = [float(v) if v is not None else default_rssi for v in rssi_col]
+    now_ts = now.timestamp()
+    ages = [now_ts - t.timestamp() for t in time_col]
+
+    scored = score_reads(epc_col, antenna_keys, rssi, ages, config["HALF_LIFE_SECONDS"])
+
+    locations = {}
+    for epc, (key, confidence, reads) in scored.items():
+        antenna_id = key & 0xFFFFFFFF
+        locations[epc] = Location(
+            reader_id=key >> 32,
+            antenna_id=None if antenna_id == 0xFFFFFFFF else antenna_id,
+            confidence=round(confidence, 3),
+            reads=reads,
+        )
+    return locations
+
+
+_cache = {"at": 0.0, "locations": {}}
+_cache_lock = threading.Lock()
+
+
+def current_locations():
+    """Locations for all active tags, recomputed at most once per CACHE_SECONDS."""
+    config = get_config()
+    with _cache_lock:
+        if time.monotonic() - _cache["at"] >= config["CACHE_SECONDS"]:
+            _cache["locations"] = estimate_locations(config=config)
+            _cache["at"] = time.monotonic()
+        return _cache["locations"]
@@ -0,0 +1,58 @@
+import time
+import urllib.error
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracking import edge, metrics
+
+
+class Command(BaseCommand):
+    help = "Forward locally deduplicated detections to the central server (edge mode)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--follow", action="store_true",
+            help="Keep running; retry with exponential backoff while central is unreachable.",
+        )
+        parser.add_argument("--interval", type=float, default=2.0,
+                            help="Seconds between polls when caught up.")
+        parser.add_argument("--sync-every", type=float, default=300.0,
+                            help="Seconds between registry syncs from central.")
+
+    def handle(self, *args, **options):
+        config = edge.get_config()
+        if not config["CENTRAL_URL"]:
+            raise CommandError("RFID_EDGE['CENTRAL_URL'] is not configured")
+
+        backoff = options["interval"]
+        next_sync = 0.0
+
+        while True:
+            try:
+                if time.monotonic() >= next_sync:
+                    synced = edge.sync_registry(config)
+                    self.stdout.write(f"Registry synced: {synced['readers']} readers, {synced['epcs']} EPCs")
+                    next_sync = time.monotonic() + options["sync_every"]
+
+                sent = edge.forward_once(config)
+                while sent == config["BATCH_SIZE"]:
+                    self.stdout.write(f"Forwarded {sent} detections")
+                    sent = edge.forward_once(config)
+                if sent:
+                    self.stdout.write(f"Forwarded {sent} detections")
+                backoff = options["interval"]
+
+            except edge.PermanentForwardError as e:
+                # Central refused a sync or batch (bad token, wrong URL): a config
+                # problem, so stop here and keep the detections for later.
+                raise CommandError(str(e))
+            except (urllib.error.URLError, OSError) as e:
+                metrics.edge_forward_failures.inc()
+                if not options["follow"]:
+                    raise CommandError(f"Central unreachable: {e}")
+                self.stderr.write(f"Central unreachable ({e}); retrying in {backoff:.0f}s")
+                backoff = min(backoff * 2, config["MAX_BACKOFF"])
+
+            if not options["follow"]:
+                return
+            time.sleep(backoff)
@@ -0,0 +1,36 @@
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the edge aggregator's local database: run migrations and create "
+        "the tables that are managed outside Django on the central MariaDB."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true",
+                            help="Allow running against a non-SQLite database.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite" and not options["force"]:
+            raise CommandError(
+                f"Refusing to create unmanaged tables on a {connection.vendor} database; "
+                "use --force if this really is an edge database."
+            )
+
+        call_command("migrate", interactive=False, verbosity=options["verbosity"])
+
+        existing = set(connection.introspection.table_names())
+        created = []
+        with connection.schema_editor() as editor:
+            for model in apps.get_app_config("tracking").get_models():
+                if not model._meta.managed and model._meta.db_table not in existing:
+                    editor.create_model(model)
+                    created.append(model._meta.db_table)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(created)} tables: {', '.join(created) or '-'}"
+        ))
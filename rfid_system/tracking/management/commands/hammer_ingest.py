@@ -0,0 +1,84 @@
+import json
+import time
+import urllib.request
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracking.ingest import dedup_bucket
+from tracking.models import Detections
+
+
+def _post(url, body):
+    req = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return resp.status
+
+
+def _worker(url, body, threads, requests):
+    """Fire ``requests`` POSTs from ``threads`` threads; return status counts."""
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(lambda _: _post(url, body), range(requests)))
+    return Counter(statuses)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a running ingest endpoint with the same tag reads from many "
+        "threads and processes, then verify no EPC was stored twice per dedup bucket."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/rfid/read/")
+        parser.add_argument("--mac", required=True, help="MAC address of a registered reader.")
+        parser.add_argument("--epc", action="append", required=True,
+                            help="Registered EPC to send (repeatable).")
+        parser.add_argument("--antenna", type=int, default=1)
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=50,
+                            help="Requests per process.")
+
+    def handle(self, *args, **options):
+        body = json.dumps({
+            "mac_address": options["mac"],
+            "tag_reads": [
+                {"epc": epc, "antennaPort": options["antenna"], "peakRssi": -60}
+                for epc in options["epc"]
+            ],
+        }).encode()
+
+        started = timezone.now()
+        t0 = time.perf_counter()
+
+        statuses = Counter()
+        with ProcessPoolExecutor(max_workers=options["processes"]) as pool:
+            futures = [
+                pool.submit(_worker, options["url"], body, options["threads"], options["requests"])
+                for _ in range(options["processes"])
+            ]
+            for future in futures:
+                statuses.update(future.result())
+
+        elapsed = time.perf_counter() - t0
+        total = sum(statuses.values())
+        self.stdout.write(
+            f"{total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s), statuses: {dict(statuses)}"
+        )
+
+        stored = Counter(
+            (epc, dedup_bucket(detected_at))
+            for epc, detected_at in Detections.objects
+            .filter(epc__in=options["epc"], detected_at__gte=started)
+            .values_list("epc", "detected_at")
+        )
+        duplicates = {key: n for key, n in stored.items() if n > 1}
+
+        self.stdout.write(f"{sum(stored.values())} detections stored across {len(stored)} buckets")
+        if duplicates:
+            raise CommandError(f"Duplicate detections in {len(duplicates)} buckets: {duplicates}")
+        self.stdout.write(self.style.SUCCESS("No duplicate detections"))
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from tracking.ingest import prune_dedup_keys
+
+
+class Command(BaseCommand):
+    help = "Delete expired deduplication claims (run periodically, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-minutes", type=int, default=60,
+            help="Delete claims created more than this many minutes ago.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_dedup_keys(timedelta(minutes=options["older_than_minutes"]))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} dedup claims"))
@@ -0,0 +1,99 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from tracking import rebuild, rollups
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones must not reuse the
+    # parent's database connections.
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild presence, zones and visits from raw detections in parallel. "
+        "Antenna health and fan-in counts are kept as they are (they need the "
+        "raw reads dedup discarded). Pause ingest while it runs; --dry-run only "
+        "reports the differences."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--partitions", type=int, default=None,
+                            help="Number of EPC-hash partitions (default: the resumed "
+                                 "run's count, else 4 per worker).")
+        parser.add_argument("--run", default="default",
+                            help="Checkpoint name; running the same name again resumes it.")
+        parser.add_argument("--restart", action="store_true",
+                            help="Forget the run's checkpoints and start over.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Derive everything but write nothing.")
+
+    def handle(self, *args, **options):
+        workers = max(options["workers"], 1)
+        run, dry_run = options["run"], options["dry_run"]
+
+        if options["restart"]:
+            rebuild.reset_run(run)
+        try:
+            partitions = options["partitions"]
+            if partitions is None and not dry_run:
+                partitions = rebuild.run_partitions(run)  # resume with the run's own count
+            partitions = partitions or workers * 4
+            done = set() if dry_run else rebuild.finished_partitions(run, partitions)
+        except ValueError as e:
+            raise CommandError(f"{e}; pass the same --partitions or use --restart")
+
+        parts = rebuild.partition_epcs(partitions)
+        todo = {k: v for k, v in parts.items() if k not in done}
+        self.stdout.write(
+            f"{sum(len(v) for v in parts.values())} EPCs in {len(parts)} partitions, "
+            f"{len(parts) - len(todo)} already done; {workers} workers"
+        )
+
+        now = timezone.now()
+        totals, finished = {}, 0
+        started = time.monotonic()
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [
+                pool.submit(rebuild.rebuild_partition, run, k, partitions, epcs, now, dry_run)
+                for k, epcs in sorted(todo.items())
+            ]
+            for future in as_completed(futures):
+                stats = future.result()
+                finished += 1
+                for key, value in stats.items():
+                    if key != "partition":
+                        totals[key] = totals.get(key, 0) + value
+
+                elapsed = time.monotonic() - started
+                eta = elapsed / finished * (len(todo) - finished)
+                self.stdout.write(
+                    f"  [{finished}/{len(todo)}] partition {stats['partition']}: "
+                    f"{stats['epcs']} EPCs, {stats['detections']} detections "
+                    f"({elapsed:.1f}s elapsed, ~{eta:.0f}s left)"
+                )
+
+        if dry_run:
+            self.stdout.write("Dry run, nothing written:")
+            for key, value in sorted(totals.items()):
+                self.stdout.write(f"  {key:<17} {value}")
+            return
+
+        count = rollups.rebuild()
+        self.stdout.write(
+            f"Rebuilt {totals.get('epcs', 0)} EPCs from {totals.get('detections', 0)} "
+            f"detections and {count} rollups in {time.monotonic() - started:.1f}s"
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tracking import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute project/group inventory counters (run after bulk membership changes)."
+
+    def handle(self, *args, **options):
+        count = rollups.rebuild()
+        self.stdout.write(f"Rebuilt {count} project/group rollups")
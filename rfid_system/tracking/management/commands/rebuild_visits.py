@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tracking import visits
+
+
+class Command(BaseCommand):
+    help = "Recompute visits (dwell sessions) from all stored detections."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = visits.rebuild(chunk_size=options["chunk_size"])
+        self.stdout.write(f"Rebuilt {count} visits")
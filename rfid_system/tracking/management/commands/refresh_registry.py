@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracking import registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish registered-EPC changes made outside Django as a new filter "
+        "version (run every REFRESH_SECONDS, e.g. from cron or with --follow)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--follow", action="store_true",
+            help="Keep running, refreshing every --interval seconds.",
+        )
+        parser.add_argument("--interval", type=float, default=None,
+                            help="Seconds between refreshes (default: REFRESH_SECONDS).")
+
+    def handle(self, *args, **options):
+        interval = options["interval"] or registry.get_config()["REFRESH_SECONDS"]
+        while True:
+            version = registry.refresh()
+            self.stdout.write(f"Registry at version {version}")
+
+            if not options["follow"]:
+                return
+            time.sleep(interval)
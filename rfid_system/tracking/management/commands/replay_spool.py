@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from tracking import spool
+
+
+class Command(BaseCommand):
+    help = "Replay spooled tag reads into the database (optionally forever)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--follow", action="store_true",
+            help="Keep running and replay new spool records as they arrive.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=1.0,
+            help="Seconds between polls in --follow mode.",
+        )
+
+    def handle(self, *args, **options):
+        backoff = options["interval"]
+
+        while True:
+            try:
+                replayed = spool.replay()
+                backoff = options["interval"]
+                if replayed or not options["follow"]:
+                    stats = spool.spool_stats()
+                    self.stdout.write(
+                        f"Replayed {replayed} batches; {stats['pending_bytes']} bytes pending, "
+                        f"lag {stats['lag_seconds']:.1f}s"
+                    )
+            except DatabaseError as e:
+                if not options["follow"]:
+                    raise
+                self.stderr.write(f"Database unavailable ({e}); retrying in {backoff:.0f}s")
+                close_old_connections()
+                backoff = min(backoff * 2, 60)
+
+            if not options["follow"]:
+                return
+            time.sleep(backoff)
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracking import inventory
+
+
+class Command(BaseCommand):
+    help = "Recompute missing/overdue inventory exceptions (e.g. nightly)."
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        payload = inventory.sweep()
+        self.stdout.write(self.style.SUCCESS(
+            f"{payload['missingCount']} missing, {payload['overdueCount']} overdue "
+            f"({time.perf_counter() - start:.2f}s)"
+        ))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracking import presence
+
+
+class Command(BaseCommand):
+    help = "Move quiet tags to idle/missing and log the transitions (run every minute)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--follow", action="store_true",
+            help="Keep running, sweeping every --interval seconds.",
+        )
+        parser.add_argument("--interval", type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        while True:
+            transitions = presence.sweep()
+            self.stdout.write(f"Swept presence: {len(transitions)} transitions")
+
+            if not options["follow"]:
+                return
+            time.sleep(options["interval"])
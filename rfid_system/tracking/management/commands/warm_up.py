@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tracking import warmup
+
+
+class Command(BaseCommand):
+    help = "Preload hot lookups and report how long each warm-up step takes."
+
+    def handle(self, *args, **options):
+        result = warmup.warm_up()
+        for name, seconds in result["steps"].items():
+            self.stdout.write(f"  {name:<16} {seconds:.3f}s")
+        if result["status"] != "ready":
+            raise CommandError(f"Warm-up failed: {result['error']}")
+        self.stdout.write(f"Warm-up finished in {result['seconds']:.3f}s")
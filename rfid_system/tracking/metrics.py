@@ -0,0 +1,266 @@
+"""
+In-process metrics registry rendered in Prometheus text format.
+
+Every worker process keeps its own counters; scrape each worker (or put them
+behind a per-worker port) if you run several.
+"""
+import threading
+from bisect import bisect_left
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_lock = threading.Lock()
+
+
+def _label_str(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        return self._values.get(key, 0)
+
+    def samples(self):
+        with _lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _label_str(self.labels, key), value
+
+
+class Gauge(Counter):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=(), func=None):
+        super().__init__(name, help_text, labels)
+        self._func = func
+
+    def set(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with _lock:
+            self._values[key] = value
+
+    def samples(self):
+        if self._func is not None:
+            yield self.name, "", self._func()
+            return
+        yield from super().samples()
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        idx = bisect_left(self.buckets, value)
+        with _lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[idx] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with _lock:
+            items = sorted((k, (list(c), s)) for k, (c, s) in self._values.items())
+        label_names = self.labels + ("le",)
+        for key, (counts, total) in items:
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                yield f"{self.name}_bucket", _label_str(label_names, key + (_fmt(bound),)), running
+            yield f"{self.name}_sum", _label_str(self.labels, key), total
+            yield f"{self.name}_count", _label_str(self.labels, key), running
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render_prometheus():
+    """Serialize every registered metric in Prometheus exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {_fmt(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# HTTP / DATABASE
+# ----------------------------------------------------------------------
+
+http_requests = register(Counter(
+    "rfid_http_requests_total",
+    "HTTP requests handled, by URL name, method and status code.",
+    labels=("view", "method", "status"),
+))
+http_latency = register(Histogram(
+    "rfid_http_request_duration_seconds",
+    "Wall-clock time spent handling a request, by URL name.",
+    labels=("view",),
+))
+db_queries = register(Histogram(
+    "rfid_db_queries_per_request",
+    "Number of SQL queries issued per request, by URL name.",
+    labels=("view",),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+db_time = register(Counter(
+    "rfid_db_query_seconds_total",
+    "Total time spent waiting on SQL queries, by URL name.",
+    labels=("view",),
+))
+
+
+# ----------------------------------------------------------------------
+# INGEST
+# ----------------------------------------------------------------------
+
+tags_received = register(Counter(
+    "rfid_ingest_tags_received_total",
+    "Tag reads received from readers.",
+))
+tags_saved = register(Counter(
+    "rfid_ingest_tags_saved_total",
+    "Tag reads stored as detections.",
+))
+tags_ignored = register(Counter(
+    "rfid_ingest_tags_ignored_total",
+    "Tag reads ignored because the EPC is not registered.",
+))
+tags_duplicate = register(Counter(
+    "rfid_ingest_tags_duplicate_total",
+    "Tag reads dropped by the deduplication window.",
+))
+
+
+# ----------------------------------------------------------------------
+# SPOOL
+# ----------------------------------------------------------------------
+
+def _spool_stat(key):
+    def read():
+        from .spool import spool_stats
+        return spool_stats()[key]
+    return read
+
+
+spool_records_written = register(Counter(
+    "rfid_spool_records_written_total",
+    "Reader batches appended to the local spool.",
+))
+spool_records_replayed = register(Counter(
+    "rfid_spool_records_replayed_total",
+    "Spooled reader batches replayed into the database.",
+))
+spool_records_rejected = register(Counter(
+    "rfid_spool_records_rejected_total",
+    "Spooled reader batches that could not be replayed (corrupt or unknown reader).",
+))
+spool_pending_bytes = register(Gauge(
+    "rfid_spool_pending_bytes",
+    "Spool bytes not yet replayed into the database.",
+    func=_spool_stat("pending_bytes"),
+))
+spool_lag_seconds = register(Gauge(
+    "rfid_spool_lag_seconds",
+    "Age of the oldest spooled record not yet replayed.",
+    func=_spool_stat("lag_seconds"),
+))
+
+
+# ----------------------------------------------------------------------
+# EDGE FORWARDER
+# ----------------------------------------------------------------------
+
+edge_forwarded = register(Counter(
+    "rfid_edge_forwarded_total",
+    "Detections forwarded from this edge to the central server.",
+))
+edge_forward_rejected = register(Counter(
+    "rfid_edge_forward_rejected_total",
+    "Detections the central server permanently rejected.",
+))
+edge_forward_failures = register(Counter(
+    "rfid_edge_forward_failures_total",
+    "Forward attempts that failed and will be retried.",
+))
+
+
+# ----------------------------------------------------------------------
+# ADMISSION CONTROL
+# ----------------------------------------------------------------------
+
+admission_in_flight = register(Gauge(
+    "rfid_admission_in_flight",
+    "Requests currently admitted, by endpoint class.",
+    labels=("cls",),
+))
+admission_waiting = register(Gauge(
+    "rfid_admission_waiting",
+    "Requests queued for a free slot, by endpoint class.",
+    labels=("cls",),
+))
+admission_shed = register(Counter(
+    "rfid_admission_shed_total",
+    "Requests rejected with 503 because their class was at capacity.",
+    labels=("cls",),
+))
+
+
+# ----------------------------------------------------------------------
+# ANTENNA HEALTH
+# ----------------------------------------------------------------------
+
+antenna_anomalies = register(Counter(
+    "rfid_antenna_anomalies_total",
+    "Antenna anomaly flags raised, by kind.",
+    labels=("flag",),
+))
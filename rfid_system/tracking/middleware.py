@@ -0,0 +1,156 @@
+import time
+
+from django.db import connections
+from django.http import JsonResponse
+
+from . import admission, metrics, profiling, routers
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.url_name or "unnamed"
+
+
+class _QueryTimer:
+    """Database execute wrapper that counts queries and their wall time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """Record latency, SQL query count and SQL time per URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = _QueryTimer()
+        start = time.perf_counter()
+
+        wrappers = [conn.execute_wrapper(timer) for conn in connections.all()]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+
+        elapsed = time.perf_counter() - start
+        view = _view_name(request)
+
+        metrics.http_requests.inc(view=view, method=request.method, status=response.status_code)
+        metrics.http_latency.observe(elapsed, view=view)
+        metrics.db_queries.observe(timer.count, view=view)
+        metrics.db_time.inc(timer.seconds, view=view)
+
+        return response
+
+
+class AdmissionControlMiddleware:
+    """
+    Enforce per-class concurrency budgets (see tracking/admission.py).
+
+    Runs in process_view, before any view work or database access; the
+    slot is released once the response has been produced.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            budget = getattr(request, "_admission_budget", None)
+            if budget is not None:
+                budget.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        config = admission.get_config()
+        if not config["ENABLED"]:
+            return None
+
+        cls = admission.classify(_view_name(request), config)
+        if cls is None:
+            return None
+
+        budget = admission.budget_for(cls, config)
+        if not budget.acquire(config["QUEUE_SECONDS"].get(cls, 0.0)):
+            metrics.admission_shed.inc(cls=cls)
+            response = JsonResponse({"error": "Server busy, retry later"}, status=503)
+            response["Retry-After"] = str(config["RETRY_AFTER"])
+            return response
+
+        request._admission_budget = budget
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Send reads of read-only views to the replica (see tracking/routers.py)
+    and pin a client to the primary for a few seconds after it writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = routers.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.end(token)
+
+        if wrote:
+            config = routers.get_config()
+            response.set_cookie(
+                config["STICKY_COOKIE"], "1",
+                max_age=config["STICKY_SECONDS"], httponly=True, samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        config = routers.get_config()
+        routers.route_reads(routers.read_alias_for(request, _view_name(request), config))
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    Profile a sampled fraction of requests to selected views.
+
+    Must be the last entry in MIDDLEWARE so the other middlewares'
+    process_view hooks have run before we call the view ourselves.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        config = profiling.get_config()
+        view = _view_name(request)
+
+        if not profiling.should_profile(request, view, config):
+            return None
+
+        return profiling.profile_call(
+            lambda: view_func(request, *view_args, **view_kwargs),
+            view,
+            config,
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0003_alter_itemgroups_options_alter_itemprojects_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RfidItemsTemp',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('epc', models.CharField(blank=True, max_length=255, null=True)),
+                ('barcode', models.CharField(blank=True, max_length=255, null=True)),
+                ('item_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('project_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('responsible_person', models.CharField(blank=True, max_length=255, null=True)),
+                ('organization', models.CharField(blank=True, max_length=255, null=True)),
+                ('storage_location', models.CharField(blank=True, max_length=255, null=True)),
+                ('checkby_date', models.DateField(blank=True, null=True)),
+                ('image', models.CharField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'verbose_name': 'RFID Imported Item',
+                'verbose_name_plural': 'RFID Imported Items',
+                'db_table': 'rfid_items_temp',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DetectionDedup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('epc', models.CharField(max_length=120)),
+                ('bucket', models.BigIntegerField()),
+                ('claim_token', models.CharField(max_length=32)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'detection_dedup',
+                'indexes': [models.Index(fields=['claim_token'], name='detection_dedup_token_idx'), models.Index(fields=['created_at'], name='detection_dedup_created_idx')],
+                'unique_together': {('epc', 'bucket')},
+            },
+        ),
+    ]
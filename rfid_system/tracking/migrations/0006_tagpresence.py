@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0005_spoolcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagPresence',
+            fields=[
+                ('epc', models.CharField(max_length=120, primary_key=True, serialize=False)),
+                ('state', models.CharField(blank=True, default='', max_length=8)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField(blank=True, null=True)),
+                ('antenna', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='tracking.antennas')),
+                ('reader', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='tracking.readers')),
+            ],
+            options={
+                'db_table': 'tag_presence',
+                'indexes': [models.Index(fields=['state', 'last_seen'], name='tag_presence_state_seen_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0006_tagpresence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SweepReport',
+            fields=[
+                ('name', models.CharField(max_length=60, primary_key=True, serialize=False)),
+                ('payload', models.JSONField()),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'sweep_reports',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0007_sweepreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForwardWatermark',
+            fields=[
+                ('name', models.CharField(max_length=60, primary_key=True, serialize=False)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'forward_watermarks',
+            },
+        ),
+    ]
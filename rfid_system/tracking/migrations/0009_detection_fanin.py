@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0008_forwardwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetectionFanIn',
+            fields=[
+                ('detection_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('antenna_count', models.PositiveSmallIntegerField(default=1)),
+                ('read_count', models.PositiveIntegerField(default=1)),
+            ],
+            options={
+                'db_table': 'detection_fanin',
+            },
+        ),
+        migrations.AddField(
+            model_name='detectiondedup',
+            name='antenna_ids',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='detectiondedup',
+            name='detection_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
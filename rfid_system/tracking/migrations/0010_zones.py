@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0009_detection_fanin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Zone',
+            fields=[
+                ('zone_id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('description', models.CharField(blank=True, max_length=255, null=True)),
+                ('storage_location', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='tracking.storagelocations')),
+            ],
+            options={
+                'db_table': 'zones',
+            },
+        ),
+        migrations.CreateModel(
+            name='ItemZone',
+            fields=[
+                ('epc', models.CharField(max_length=120, primary_key=True, serialize=False)),
+                ('since', models.DateTimeField(blank=True, null=True)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('zone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='tracking.zone')),
+            ],
+            options={
+                'db_table': 'item_zones',
+            },
+        ),
+        migrations.CreateModel(
+            name='ZoneAntenna',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('antenna', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='tracking.antennas')),
+                ('reader', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='tracking.readers')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='antennas', to='tracking.zone')),
+            ],
+            options={
+                'db_table': 'zone_antennas',
+                'unique_together': {('reader', 'antenna')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ZoneTransition',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('epc', models.CharField(max_length=120)),
+                ('at', models.DateTimeField()),
+                ('from_zone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracking.zone')),
+                ('to_zone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracking.zone')),
+            ],
+            options={
+                'db_table': 'zone_transitions',
+                'indexes': [models.Index(fields=['epc', 'at'], name='zone_transitions_epc_at_idx'), models.Index(fields=['to_zone', 'at'], name='zone_transitions_to_at_idx')],
+            },
+        ),
+    ]
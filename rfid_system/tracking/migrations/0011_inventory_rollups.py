@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0010_zones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryRollup',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('scope', models.CharField(max_length=8)),
+                ('scope_id', models.IntegerField()),
+                ('total', models.IntegerField(default=0)),
+                ('present', models.IntegerField(default=0)),
+                ('idle', models.IntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'inventory_rollups',
+                'unique_together': {('scope', 'scope_id')},
+            },
+        ),
+    ]
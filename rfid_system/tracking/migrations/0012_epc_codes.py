@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:20
+
+from django.db import migrations, models
+
+
+def clear_claims(apps, schema_editor):
+    # Claims only live for a few dedup windows; dropping them is safe.
+    apps.get_model('tracking', 'DetectionDedup').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0011_inventory_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EpcCode',
+            fields=[
+                ('epc_id', models.AutoField(primary_key=True, serialize=False)),
+                ('bits', models.SmallIntegerField()),
+                ('hi', models.BigIntegerField()),
+                ('lo', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'epc_codes',
+                'unique_together': {('bits', 'hi', 'lo')},
+            },
+        ),
+        migrations.RunPython(clear_claims, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='detectiondedup',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='detectiondedup',
+            name='epc',
+        ),
+        migrations.AddField(
+            model_name='detectiondedup',
+            name='epc_id',
+            field=models.IntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AlterUniqueTogether(
+            name='detectiondedup',
+            unique_together={('epc_id', 'bucket')},
+        ),
+    ]
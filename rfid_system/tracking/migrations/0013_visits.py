@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0012_epc_codes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Visit',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('epc', models.CharField(max_length=120)),
+                ('arrived_at', models.DateTimeField()),
+                ('departed_at', models.DateTimeField()),
+                ('dwell_seconds', models.FloatField(default=0)),
+                ('read_count', models.PositiveIntegerField(default=1)),
+                ('is_open', models.BooleanField(default=True)),
+                ('antenna', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='tracking.antennas')),
+                ('reader', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='tracking.readers')),
+            ],
+            options={
+                'db_table': 'visits',
+                'indexes': [models.Index(fields=['epc', 'is_open'], name='visits_epc_open_idx'), models.Index(fields=['epc', 'arrived_at'], name='visits_epc_arrived_idx'), models.Index(fields=['reader', 'antenna', 'arrived_at'], name='visits_location_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0013_visits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EpcSerialCounter',
+            fields=[
+                ('name', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('next_serial', models.BigIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'epc_serial_counters',
+            },
+        ),
+    ]
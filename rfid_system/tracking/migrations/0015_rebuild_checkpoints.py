@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0014_epc_serial_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RebuildCheckpoint',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('run', models.CharField(max_length=60)),
+                ('partition', models.IntegerField()),
+                ('detections', models.BigIntegerField(default=0)),
+                ('finished_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'rebuild_checkpoints',
+                'unique_together': {('run', 'partition')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0015_rebuild_checkpoints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReaderClock',
+            fields=[
+                ('reader_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('skew_seconds', models.FloatField(default=0.0)),
+                ('samples', models.PositiveIntegerField(default=0)),
+                ('sampled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'reader_clocks',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0016_reader_clocks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AntennaHealth',
+            fields=[
+                ('antenna_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('reader_id', models.IntegerField()),
+                ('window_start', models.DateTimeField(blank=True, null=True)),
+                ('window_reads', models.PositiveIntegerField(default=0)),
+                ('window_rssi_count', models.PositiveIntegerField(default=0)),
+                ('window_rssi_mean', models.FloatField(default=0.0)),
+                ('window_rssi_m2', models.FloatField(default=0.0)),
+                ('last_window_reads', models.PositiveIntegerField(default=0)),
+                ('windows', models.BigIntegerField(default=0)),
+                ('rate_baseline', models.FloatField(default=0.0)),
+                ('rssi_baseline_mean', models.FloatField(blank=True, null=True)),
+                ('rssi_baseline_var', models.FloatField(blank=True, null=True)),
+                ('total_reads', models.BigIntegerField(default=0)),
+                ('last_read_at', models.DateTimeField(blank=True, null=True)),
+                ('flags', models.JSONField(default=list)),
+                ('flagged_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'antenna_health',
+                'indexes': [models.Index(fields=['reader_id'], name='antenna_health_reader_idx')],
+            },
+        ),
+    ]
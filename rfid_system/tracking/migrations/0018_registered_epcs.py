@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0017_antenna_health'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegisteredEpc',
+            fields=[
+                ('epc', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('added_version', models.BigIntegerField()),
+                ('removed_version', models.BigIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'registered_epcs',
+                'indexes': [models.Index(fields=['added_version'], name='registered_epcs_added_idx'), models.Index(fields=['removed_version'], name='registered_epcs_removed_idx')],
+            },
+        ),
+    ]
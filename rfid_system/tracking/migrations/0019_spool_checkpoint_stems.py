@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def key_on_stem(apps, schema_editor):
+    # Checkpoints used to be keyed on the file name, which changes from
+    # ".open" to ".log" when a segment is sealed.
+    SpoolCheckpoint = apps.get_model("tracking", "SpoolCheckpoint")
+    offsets = {}
+    for checkpoint in SpoolCheckpoint.objects.all():
+        stem = checkpoint.segment.rsplit(".", 1)[0]
+        offsets[stem] = max(offsets.get(stem, 0), checkpoint.offset)
+    SpoolCheckpoint.objects.all().delete()
+    SpoolCheckpoint.objects.bulk_create(
+        [SpoolCheckpoint(segment=stem, offset=offset) for stem, offset in offsets.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0018_registered_epcs'),
+    ]
+
+    operations = [
+        migrations.RunPython(key_on_stem, migrations.RunPython.noop),
+    ]
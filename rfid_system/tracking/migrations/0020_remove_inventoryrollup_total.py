@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0019_spool_checkpoint_stems'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='inventoryrollup',
+            name='total',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0020_remove_inventoryrollup_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='epccode',
+            name='raw',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='epccode',
+            name='hi',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='epccode',
+            name='lo',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
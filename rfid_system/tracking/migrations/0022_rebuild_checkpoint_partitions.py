@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0021_epc_code_raw'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rebuildcheckpoint',
+            name='partitions',
+            field=models.IntegerField(default=0),
+        ),
+    ]
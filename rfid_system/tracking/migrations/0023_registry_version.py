@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:08
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_version(apps, schema_editor):
+    # Continue from the highest version already stamped on registered_epcs.
+    RegisteredEpc = apps.get_model("tracking", "RegisteredEpc")
+    RegistryVersion = apps.get_model("tracking", "RegistryVersion")
+    latest = RegisteredEpc.objects.aggregate(a=Max("added_version"), r=Max("removed_version"))
+    RegistryVersion.objects.create(
+        name="registered_epcs", version=max(latest["a"] or 0, latest["r"] or 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0022_rebuild_checkpoint_partitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistryVersion',
+            fields=[
+                ('name', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'registry_versions',
+            },
+        ),
+        migrations.RunPython(seed_version, migrations.RunPython.noop),
+    ]
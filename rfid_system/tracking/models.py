@@ -254,3 +254,295 @@ class RfidItemsTemp(models.Model):
         db_table = 'rfid_items_temp'
         verbose_name = "RFID Imported Item"
         verbose_name_plural = "RFID Imported Items"
+
+
+class EpcCode(models.Model):
+    """
+    Surrogate id for an EPC, stored as a fixed-width packed integer.
+
+    ``bits`` is the EPC length (96 for SGTIN-96) and ``hi``/``lo`` the upper
+    and lower 64 bits as signed BIGINTs; see tracking.epc for the encoding.
+    Codes that are not hex or longer than 128 bits keep the string in
+    ``raw`` instead (``bits`` 0, ``hi``/``lo`` NULL).
+    """
+    epc_id = models.AutoField(primary_key=True)
+    bits = models.SmallIntegerField()
+    hi = models.BigIntegerField(blank=True, null=True)
+    lo = models.BigIntegerField(blank=True, null=True)
+    raw = models.CharField(unique=True, max_length=255, blank=True, null=True)
+
+    class Meta:
+        db_table = 'epc_codes'
+        unique_together = (('bits', 'hi', 'lo'),)
+
+
+class DetectionDedup(models.Model):
+    """
+    Dedup claim for one EPC in one fixed time bucket.
+
+    The unique key makes the claim atomic across worker processes: ingest
+    inserts with insert-ignore semantics and only stores detections for the
+    claims it actually won.
+    """
+    id = models.BigAutoField(primary_key=True)
+    epc_id = models.IntegerField()  # EpcCode surrogate
+    bucket = models.BigIntegerField()
+    claim_token = models.CharField(max_length=32)
+    created_at = models.DateTimeField()
+    detection_id = models.BigIntegerField(blank=True, null=True)
+    antenna_ids = models.JSONField(default=list)
+
+    class Meta:
+        db_table = 'detection_dedup'
+        unique_together = (('epc_id', 'bucket'),)
+        indexes = [
+            models.Index(fields=['claim_token'], name='detection_dedup_token_idx'),
+            models.Index(fields=['created_at'], name='detection_dedup_created_idx'),
+        ]
+
+
+class SpoolCheckpoint(models.Model):
+    """Byte offset up to which a local spool segment has been replayed."""
+    segment = models.CharField(primary_key=True, max_length=120)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'spool_checkpoints'
+
+
+class TagPresence(models.Model):
+    """Current presence state of one EPC, maintained at ingest and by the sweeper."""
+    epc = models.CharField(primary_key=True, max_length=120)
+    state = models.CharField(max_length=8, blank=True, default='')
+    reader = models.ForeignKey('Readers', models.DO_NOTHING, blank=True, null=True, db_constraint=False)
+    antenna = models.ForeignKey(Antennas, models.DO_NOTHING, blank=True, null=True, db_constraint=False)
+    last_seen = models.DateTimeField(blank=True, null=True)
+    changed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'tag_presence'
+        indexes = [
+            models.Index(fields=['state', 'last_seen'], name='tag_presence_state_seen_idx'),
+        ]
+
+
+class SweepReport(models.Model):
+    """Latest result of a scheduled sweep, served as-is until the next run."""
+    name = models.CharField(primary_key=True, max_length=60)
+    payload = models.JSONField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'sweep_reports'
+
+
+class ForwardWatermark(models.Model):
+    """Last local detection an edge aggregator has forwarded to the central server."""
+    name = models.CharField(primary_key=True, max_length=60)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'forward_watermarks'
+
+
+class DetectionFanIn(models.Model):
+    """How many reads and distinct antennas were collapsed into one detection."""
+    detection_id = models.BigIntegerField(primary_key=True)
+    antenna_count = models.PositiveSmallIntegerField(default=1)
+    read_count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = 'detection_fanin'
+
+
+class Zone(models.Model):
+    """A physical area covered by one or more antennas, e.g. a room or shelf."""
+    zone_id = models.AutoField(primary_key=True)
+    name = models.CharField(unique=True, max_length=120)
+    storage_location = models.ForeignKey(
+        StorageLocations, models.DO_NOTHING, blank=True, null=True, db_constraint=False
+    )
+    description = models.CharField(max_length=255, blank=True, null=True)
+
+    class Meta:
+        db_table = 'zones'
+
+    def __str__(self):
+        return self.name
+
+
+class ZoneAntenna(models.Model):
+    """Maps a reader antenna (or a whole reader when antenna is empty) to a zone."""
+    id = models.AutoField(primary_key=True)
+    zone = models.ForeignKey(Zone, models.CASCADE, related_name='antennas')
+    reader = models.ForeignKey(Readers, models.DO_NOTHING, db_constraint=False)
+    antenna = models.ForeignKey(Antennas, models.DO_NOTHING, blank=True, null=True, db_constraint=False)
+
+    class Meta:
+        db_table = 'zone_antennas'
+        unique_together = (('reader', 'antenna'),)
+
+
+class ItemZone(models.Model):
+    """Zone each EPC is currently in; indexed by zone for "what's in room X"."""
+    epc = models.CharField(primary_key=True, max_length=120)
+    zone = models.ForeignKey(Zone, models.CASCADE, blank=True, null=True, related_name='items')
+    since = models.DateTimeField(blank=True, null=True)
+    last_seen = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'item_zones'
+
+
+class ZoneTransition(models.Model):
+    """An EPC moving between zones (from_zone empty = entered, to_zone empty = left)."""
+    id = models.BigAutoField(primary_key=True)
+    epc = models.CharField(max_length=120)
+    from_zone = models.ForeignKey(Zone, models.CASCADE, blank=True, null=True, related_name='+')
+    to_zone = models.ForeignKey(Zone, models.CASCADE, blank=True, null=True, related_name='+')
+    at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'zone_transitions'
+        indexes = [
+            models.Index(fields=['epc', 'at'], name='zone_transitions_epc_at_idx'),
+            models.Index(fields=['to_zone', 'at'], name='zone_transitions_to_at_idx'),
+        ]
+
+
+class InventoryRollup(models.Model):
+    """
+    Live item counts for one project or group.
+
+    ``present``/``idle`` follow TagPresence and are adjusted at ingest and by
+    the presence sweeper. Totals are counted from membership on read
+    (``rollups.totals``); missing is ``total - present - idle``.
+    """
+    id = models.AutoField(primary_key=True)
+    scope = models.CharField(max_length=8)  # "project" or "group"
+    scope_id = models.IntegerField()
+    present = models.IntegerField(default=0)
+    idle = models.IntegerField(default=0)
+    last_activity = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'inventory_rollups'
+        unique_together = (('scope', 'scope_id'),)
+
+
+class Visit(models.Model):
+    """
+    Consecutive detections of one EPC at one reader/antenna.
+
+    A visit stays open while reads keep arriving at the same place within
+    the visit gap; a read elsewhere or after the gap starts a new one.
+    """
+    id = models.BigAutoField(primary_key=True)
+    epc = models.CharField(max_length=120)
+    reader = models.ForeignKey(Readers, models.DO_NOTHING, db_constraint=False)
+    antenna = models.ForeignKey(Antennas, models.DO_NOTHING, blank=True, null=True, db_constraint=False)
+    arrived_at = models.DateTimeField()
+    departed_at = models.DateTimeField()
+    dwell_seconds = models.FloatField(default=0)
+    read_count = models.PositiveIntegerField(default=1)
+    is_open = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = 'visits'
+        indexes = [
+            models.Index(fields=['epc', 'is_open'], name='visits_epc_open_idx'),
+            models.Index(fields=['epc', 'arrived_at'], name='visits_epc_arrived_idx'),
+            models.Index(fields=['reader', 'antenna', 'arrived_at'], name='visits_location_idx'),
+        ]
+
+
+class EpcSerialCounter(models.Model):
+    """Next free SGTIN-96 serial for one company prefix + item reference."""
+    name = models.CharField(primary_key=True, max_length=40)
+    next_serial = models.BigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'epc_serial_counters'
+
+
+class RebuildCheckpoint(models.Model):
+    """
+    A partition of a derived-state rebuild that has been written.
+    ``partitions`` is the run's partition count; a run can only be resumed
+    with the same count.
+    """
+    id = models.AutoField(primary_key=True)
+    run = models.CharField(max_length=60)
+    partition = models.IntegerField()
+    partitions = models.IntegerField(default=0)
+    detections = models.BigIntegerField(default=0)
+    finished_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'rebuild_checkpoints'
+        unique_together = (('run', 'partition'),)
+
+
+class ReaderClock(models.Model):
+    """Estimated offset between a reader's clock and ours (server = reader + skew)."""
+    reader_id = models.IntegerField(primary_key=True)
+    skew_seconds = models.FloatField(default=0.0)
+    samples = models.PositiveIntegerField(default=0)
+    sampled_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'reader_clocks'
+
+
+class AntennaHealth(models.Model):
+    """Streaming read-rate / RSSI statistics and anomaly flags of one antenna."""
+    antenna_id = models.IntegerField(primary_key=True)
+    reader_id = models.IntegerField()
+    window_start = models.DateTimeField(blank=True, null=True)
+    window_reads = models.PositiveIntegerField(default=0)
+    window_rssi_count = models.PositiveIntegerField(default=0)
+    window_rssi_mean = models.FloatField(default=0.0)
+    window_rssi_m2 = models.FloatField(default=0.0)
+    last_window_reads = models.PositiveIntegerField(default=0)
+    windows = models.BigIntegerField(default=0)
+    rate_baseline = models.FloatField(default=0.0)
+    rssi_baseline_mean = models.FloatField(blank=True, null=True)
+    rssi_baseline_var = models.FloatField(blank=True, null=True)
+    total_reads = models.BigIntegerField(default=0)
+    last_read_at = models.DateTimeField(blank=True, null=True)
+    flags = models.JSONField(default=list)
+    flagged_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'antenna_health'
+        indexes = [
+            models.Index(fields=['reader_id'], name='antenna_health_reader_idx'),
+        ]
+
+
+class RegistryVersion(models.Model):
+    """Latest registered-EPC filter version; locked while a refresh stamps changes."""
+    name = models.CharField(primary_key=True, max_length=40)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'registry_versions'
+
+
+class RegisteredEpc(models.Model):
+    """Published registered-EPC set with the registry version each change appeared in."""
+    epc = models.CharField(primary_key=True, max_length=255)
+    added_version = models.BigIntegerField()
+    removed_version = models.BigIntegerField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'registered_epcs'
+        indexes = [
+            models.Index(fields=['added_version'], name='registered_epcs_added_idx'),
+            models.Index(fields=['removed_version'], name='registered_epcs_removed_idx'),
+        ]
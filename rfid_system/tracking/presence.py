@@ -0,0 +1,235 @@
+"""
+Per-EPC presence state machine.
+
+States follow the thresholds the dashboard has always used:
+
+    active   seen within ACTIVE_FOR
+    idle     seen within IDLE_FOR
+    missing  not seen for longer
+
+Ingest feeds detections through ``observe`` and the sweeper ages states
+through ``age``; both return transition events, which are bulk-inserted
+into the ``logs`` table:
+
+    arrived  first sighting, or seen again after going missing
+    moved    seen at a different reader/antenna than last time
+    idle     active -> idle
+    missing  active/idle -> missing
+
+A sighting that is already old when it is ingested (a buffered batch)
+moves last_seen and the location but only sets the state its age implies,
+without arrived/moved events. Stored states lag until the next sweep, so
+readers go through ``current_state``/``stored_states``, which age them.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import health, rollups, visits, zones
+from .models import Items, Logs, TagPresence
+
+
+ACTIVE_FOR = timedelta(minutes=15)
+IDLE_FOR = timedelta(hours=2)
+
+ACTIVE, IDLE, MISSING = "active", "idle", "missing"
+
+
+@dataclass(frozen=True)
+class Transition:
+    epc: str
+    action: str
+    reader_id: int | None
+    at: datetime
+
+
+def state_for(last_seen, now):
+    """Presence state implied by the age of ``last_seen``."""
+    diff = now - last_seen
+    if diff <= ACTIVE_FOR:
+        return ACTIVE
+    if diff <= IDLE_FOR:
+        return IDLE
+    return MISSING
+
+
+def current_state(state, last_seen, now):
+    """A stored ``state`` aged to ``now``, as the sweeper would leave it."""
+    if last_seen is None or not state:
+        return state
+    return state_for(last_seen, now)
+
+
+def observe(presence, reader_id, antenna_id, seen_at, now, replaces=None):
+    """
+    Apply one sighting to ``presence`` (a TagPresence, modified in place).
+
+    Returns a Transition or None. Sightings older than ``last_seen`` are
+    ignored so out-of-order reads cannot move a tag backwards, unless the
+    sighting replaces the read at ``replaces`` and that read is the latest
+    one. Sightings that are no longer active by ``now`` raise no transition.
+    """
+    if (presence.last_seen is not None and seen_at < presence.last_seen
+            and presence.last_seen != replaces):
+        return None
+
+    previous = presence.state
+    moved = (presence.reader_id, presence.antenna_id) != (reader_id, antenna_id)
+
+    presence.reader_id = reader_id
+    presence.antenna_id = antenna_id
+    presence.last_seen = seen_at
+    presence.state = state_for(seen_at, now)
+
+    if presence.state != ACTIVE:
+        action = None
+    elif previous in ("", MISSING):
+        action = "arrived"
+    elif moved:
+        action = "moved"
+    else:
+        action = None
+
+    if action or previous != presence.state:
+        presence.changed_at = seen_at if presence.state == ACTIVE else now
+    return Transition(presence.epc, action, reader_id, seen_at) if action else None
+
+
+def age(presence, now):
+    """Move ``presence`` to idle/missing if it has not been seen; return a Transition or None."""
+    if presence.last_seen is None:
+        return None
+
+    new_state = state_for(presence.last_seen, now)
+    if new_state == presence.state or new_state == ACTIVE:
+        return None
+
+    presence.state = new_state
+    presence.changed_at = now
+    return Transition(presence.epc, new_state, presence.reader_id, now)
+
+
+def write_transitions(transitions):
+    """Bulk-insert transitions into ``logs``."""
+    if not transitions:
+        return
+
+    item_ids = dict(
+        Items.objects
+        .filter(epc__in={t.epc for t in transitions})
+        .values_list("epc", "item_id")
+    )
+    Logs.objects.bulk_create([
+        Logs(
+            item_id=item_ids.get(t.epc),
+            action=t.action,
+            reader_id=t.reader_id,
+            note=f"EPC {t.epc}",
+            created_at=t.at,
+        )
+        for t in transitions
+    ])
+
+
+def apply_detections(detections, now=None, corrected=()):
+    """
+    Advance the presence state of every EPC in ``detections``.
+
+    ``corrected`` are ``(detection, replaced_at)`` pairs for stored
+    detections whose representative read was replaced within its dedup
+    window; they update the state like any other sighting, even when the
+    better read is older than the one it replaced, but log no transitions.
+
+    Runs in a constant number of queries per batch; rows are locked in
+    EPC order so concurrent workers serialize per tag without deadlocks.
+    """
+    if not detections and not corrected:
+        return []
+
+    now = now or timezone.now()
+    replaces = {id(d): replaced_at for d, replaced_at in corrected}
+    detections = list(detections) + [d for d, _ in corrected]
+    epcs = sorted({d.epc for d in detections})
+    transitions = []
+
+    with transaction.atomic():
+        TagPresence.objects.bulk_create(
+            [TagPresence(epc=epc) for epc in epcs],
+            ignore_conflicts=True,
+        )
+        states = {
+            p.epc: p
+            for p in TagPresence.objects.select_for_update().filter(epc__in=epcs).order_by("epc")
+        }
+        before = {epc: p.state for epc, p in states.items()}
+
+        for det in sorted(detections, key=lambda d: d.detected_at):
+            transition = observe(
+                states[det.epc], det.reader_id, det.antenna_id, det.detected_at, now,
+                replaces=replaces.get(id(det)),
+            )
+            if transition and id(det) not in replaces:
+                transitions.append(transition)
+
+        TagPresence.objects.bulk_update(
+            states.values(), ["state", "reader", "antenna", "last_seen", "changed_at"]
+        )
+        write_transitions(transitions)
+        rollups.record(
+            [(epc, before[epc], p.state) for epc, p in states.items()],
+            seen={epc: p.last_seen for epc, p in states.items()},
+        )
+
+    return transitions
+
+
+def sweep(now=None):
+    """
+    Age every active/idle EPC that has gone quiet; returns the transitions.
+
+    EPCs that go missing are also taken out of their zone, the
+    project/group counters are adjusted, quiet visits are closed and
+    antennas that stopped reading are flagged as silent.
+    """
+    now = now or timezone.now()
+    transitions = []
+
+    with transaction.atomic():
+        stale = list(
+            TagPresence.objects
+            .select_for_update()
+            .filter(state__in=(ACTIVE, IDLE), last_seen__lt=now - ACTIVE_FOR)
+            .order_by("epc")
+        )
+        changed, counted = [], []
+        for presence in stale:
+            previous = presence.state
+            transition = age(presence, now)
+            if transition:
+                transitions.append(transition)
+                changed.append(presence)
+                counted.append((presence.epc, previous, presence.state))
+
+        TagPresence.objects.bulk_update(changed, ["state", "changed_at"])
+        write_transitions(transitions)
+        zones.leave([t.epc for t in transitions if t.action == MISSING], now)
+        rollups.record(counted)
+        visits.close_stale(now)
+        health.sweep(now)
+
+    return transitions
+
+
+def stored_states(epcs, now=None):
+    """``{epc: state}`` for the given EPCs as recorded by ingest, aged to ``now``."""
+    now = now or timezone.now()
+    return {
+        epc: current_state(state, last_seen, now)
+        for epc, state, last_seen in
+        TagPresence.objects
+        .filter(epc__in=list(epcs))
+        .exclude(state="")
+        .values_list("epc", "state", "last_seen")
+    }
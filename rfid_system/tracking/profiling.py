@@ -0,0 +1,121 @@
+"""
+Sampling profiler for selected views.
+
+Configured through ``settings.RFID_PROFILING``; a request can also force a
+profile by sending the configured header with the configured token, which
+lets us profile production traffic without deploying a patched build.
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+
+DEFAULTS = {
+    "ENABLED": False,
+    "VIEWS": ["rfid-read", "rfid-connect", "api_activity_logs"],
+    "SAMPLE_RATE": 0.01,
+    "HEADER": "X-Rfid-Profile",
+    "TOKEN": None,
+    "DIR": None,
+    "KEEP": 100,
+    "TOP": 40,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "RFID_PROFILING", {}))
+    if not config["DIR"]:
+        config["DIR"] = Path(settings.BASE_DIR) / "profiles"
+    return config
+
+
+def should_profile(request, view_name, config):
+    """Decide whether this request is profiled (forced by header or sampled)."""
+    token = config["TOKEN"]
+    header = request.headers.get(config["HEADER"])
+    if token and header == token:
+        return True
+
+    if not config["ENABLED"] or view_name not in config["VIEWS"]:
+        return False
+    return random.random() < config["SAMPLE_RATE"]
+
+
+class _SqlRecorder:
+    """Execute wrapper that keeps every statement and its duration."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append((time.perf_counter() - start, sql))
+
+
+def profile_call(func, view_name, config):
+    """Run ``func()`` under cProfile, write the profile and return its result."""
+    profiler = cProfile.Profile()
+    recorder = _SqlRecorder()
+
+    wrappers = [conn.execute_wrapper(recorder) for conn in connections.all()]
+    for wrapper in wrappers:
+        wrapper.__enter__()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+        _write_profile(profiler, recorder.statements, view_name, elapsed, config)
+
+
+def _write_profile(profiler, statements, view_name, elapsed, config):
+    out_dir = Path(config["DIR"])
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{view_name}-{os.getpid()}"
+    profiler.dump_stats(out_dir / f"{stem}.prof")
+
+    buf = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buf)
+    stats.sort_stats("cumulative").print_stats(config["TOP"])
+
+    sql_time = sum(seconds for seconds, _ in statements)
+    lines = [
+        f"view: {view_name}",
+        f"wall time: {elapsed * 1000:.1f} ms",
+        f"sql: {len(statements)} queries, {sql_time * 1000:.1f} ms",
+        "",
+        "=== TOP FUNCTIONS (cumulative) ===",
+        buf.getvalue(),
+        "=== SQL ===",
+    ]
+    lines.extend(f"{seconds * 1000:8.2f} ms  {sql}" for seconds, sql in statements)
+    (out_dir / f"{stem}.txt").write_text("\n".join(lines) + "\n")
+
+    _rotate(out_dir, config["KEEP"])
+
+
+def _rotate(out_dir, keep):
+    """Keep only the ``keep`` most recent profiles (``.prof`` + ``.txt`` pairs)."""
+    profiles = sorted(out_dir.glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in profiles[keep:]:
+        for path in (old, old.with_suffix(".txt")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
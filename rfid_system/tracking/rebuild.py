@@ -0,0 +1,193 @@
+"""
+Rebuild per-EPC derived state from raw detections.
+
+EPCs are split into partitions by a stable hash, so every EPC's history is
+handled by exactly one worker process. Each partition streams its
+detections in time order through the same reducers ingest uses
+(``presence.observe``/``age``, ``zones.resolve``/``observe`` and
+``visits.sessionize``) and then replaces that partition's TagPresence,
+ItemZone and Visit rows in one transaction. Finished partitions are
+checkpointed per run together with the partition count, so an interrupted
+rebuild resumes where it stopped, and only with the same partitioning.
+
+Presence and zone transition history (logs, zone_transitions) is left as
+is; it is an audit trail, not derived state. Antenna health
+(AntennaHealth) and per-detection fan-in counts (DetectionFanIn) are not
+rebuilt either: both are folded from every raw read, including the reads
+dedup discarded, and only the winning read of each window is stored in
+``detections``.
+"""
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import presence, visits, zones
+from .models import Detections, ItemZone, RebuildCheckpoint, TagPresence, Visit
+
+
+EPC_BATCH = 1000
+
+
+def partition_of(epc, partitions):
+    return zlib.crc32(epc.encode()) % partitions
+
+
+def partition_epcs(partitions):
+    """``{partition: [epc, ...]}`` for every EPC that has detections."""
+    parts = defaultdict(list)
+    epcs = Detections.objects.values_list("epc", flat=True).distinct()
+    for epc in epcs.iterator(chunk_size=10000):
+        parts[partition_of(epc, partitions)].append(epc)
+    return parts
+
+
+def derive(epc, rows, now, zone_map, gap):
+    """
+    Derived state of one EPC from its time-ordered ``(reader_id, antenna_id,
+    detected_at)`` rows: ``(TagPresence, ItemZone or None, [Visit, ...])``.
+    """
+    state = TagPresence(epc=epc)
+    item_zone = ItemZone(epc=epc)
+
+    for reader_id, antenna_id, detected_at in rows:
+        presence.observe(state, reader_id, antenna_id, detected_at, now)
+        zone_id = zones.resolve(zone_map, reader_id, antenna_id)
+        if zone_id is not None:
+            zones.observe(item_zone, zone_id, detected_at)
+    presence.age(state, now)
+
+    if item_zone.since is None:
+        item_zone = None
+    elif state.state == presence.MISSING and item_zone.zone_id is not None:
+        item_zone.zone_id = None
+        item_zone.since = state.last_seen + presence.IDLE_FOR
+
+    epc_visits = list(visits.sessionize(
+        ((epc, r, a, t) for r, a, t in rows), gap=gap.total_seconds()
+    ))
+    for visit in epc_visits:
+        if visit.is_open and visit.departed_at < now - gap:
+            visit.is_open = False
+
+    return state, item_zone, epc_visits
+
+
+def _stream(epcs):
+    """Yield ``(epc, rows)`` for ``epcs``, reading detections in EPC batches."""
+    for i in range(0, len(epcs), EPC_BATCH):
+        batch = epcs[i:i + EPC_BATCH]
+        current, rows = None, []
+        for epc, reader_id, antenna_id, detected_at in (
+            Detections.objects.filter(epc__in=batch)
+            .order_by("epc", "detected_at", "detection_id")
+            .values_list("epc", "reader_id", "antenna_id", "detected_at")
+            .iterator(chunk_size=5000)
+        ):
+            if epc != current:
+                if rows:
+                    yield current, rows
+                current, rows = epc, []
+            rows.append((reader_id, antenna_id, detected_at))
+        if rows:
+            yield current, rows
+
+
+def _diff(epcs, derived_presence, derived_zones, derived_visits):
+    """Count how the derived rows differ from what is stored now."""
+    stored_presence = {
+        p.epc: (p.state, p.reader_id, p.antenna_id, p.last_seen)
+        for p in TagPresence.objects.filter(epc__in=epcs)
+    }
+    stored_zones = dict(ItemZone.objects.filter(epc__in=epcs).values_list("epc", "zone_id"))
+    stored_visits = Visit.objects.filter(epc__in=epcs).count()
+
+    presence_changed = sum(
+        1 for p in derived_presence
+        if stored_presence.get(p.epc) != (p.state, p.reader_id, p.antenna_id, p.last_seen)
+    )
+    derived_zone_ids = {z.epc: z.zone_id for z in derived_zones}
+    zones_changed = sum(
+        1 for epc in epcs
+        if stored_zones.get(epc, "absent") != derived_zone_ids.get(epc, "absent")
+    )
+    return {
+        "presence_changed": presence_changed,
+        "zones_changed": zones_changed,
+        "visits_before": stored_visits,
+        "visits_after": len(derived_visits),
+    }
+
+
+def rebuild_partition(run, partition, partitions, epcs, now, dry_run=False):
+    """
+    Derive and write (or, with ``dry_run``, only diff) partition
+    ``partition`` of ``partitions``. Returns a stats dict; runs in a worker
+    process.
+    """
+    zone_map = zones.zone_map()
+    gap = timedelta(seconds=visits.visit_gap_seconds())
+    stats = {"partition": partition, "epcs": len(epcs), "detections": 0}
+
+    for i in range(0, len(epcs), EPC_BATCH):
+        batch = epcs[i:i + EPC_BATCH]
+        new_presence, new_zones, new_visits = [], [], []
+
+        for epc, rows in _stream(batch):
+            stats["detections"] += len(rows)
+            state, item_zone, epc_visits = derive(epc, rows, now, zone_map, gap)
+            new_presence.append(state)
+            if item_zone is not None:
+                new_zones.append(item_zone)
+            new_visits.extend(epc_visits)
+
+        if dry_run:
+            for key, value in _diff(batch, new_presence, new_zones, new_visits).items():
+                stats[key] = stats.get(key, 0) + value
+            continue
+
+        with transaction.atomic():
+            TagPresence.objects.filter(epc__in=batch).delete()
+            ItemZone.objects.filter(epc__in=batch).delete()
+            Visit.objects.filter(epc__in=batch).delete()
+            TagPresence.objects.bulk_create(new_presence, batch_size=1000)
+            ItemZone.objects.bulk_create(new_zones, batch_size=1000)
+            Visit.objects.bulk_create(new_visits, batch_size=1000)
+
+    if not dry_run:
+        RebuildCheckpoint.objects.update_or_create(
+            run=run, partition=partition,
+            defaults={"partitions": partitions, "detections": stats["detections"],
+                      "finished_at": timezone.now()},
+        )
+    return stats
+
+
+def run_partitions(run):
+    """
+    The partition count ``run`` was checkpointed with, or None for a new run.
+    Raises ValueError if its checkpoints disagree (written before counts
+    were recorded).
+    """
+    counts = set(RebuildCheckpoint.objects.filter(run=run).values_list("partitions", flat=True))
+    if not counts:
+        return None
+    if len(counts) > 1 or 0 in counts:
+        raise ValueError(f"Run {run!r} has checkpoints without a usable partition count")
+    return counts.pop()
+
+
+def finished_partitions(run, partitions):
+    """Partitions of ``run`` already written; ValueError if it used another count."""
+    stored = run_partitions(run)
+    if stored is not None and stored != partitions:
+        raise ValueError(
+            f"Run {run!r} was started with {stored} partitions, not {partitions}"
+        )
+    return set(RebuildCheckpoint.objects.filter(run=run).values_list("partition", flat=True))
+
+
+def reset_run(run):
+    RebuildCheckpoint.objects.filter(run=run).delete()
@@ -0,0 +1,242 @@
+"""
+Versioned registered-EPC filter for edges and readers.
+
+The set of registered EPCs (RfidItemsTemp) is published with a version
+number: ``refresh`` diffs the table against RegisteredEpc and stamps every
+addition/removal with the next version, so clients can fetch only what
+changed since the version they hold (``delta``) or a full ``snapshot``.
+The version lives in one RegistryVersion row that ``refresh`` locks for the
+whole diff, so refreshes in different processes issue each number once.
+
+Edits made through Django refresh as soon as they commit; edits made
+directly in the database are picked up by ``manage.py refresh_registry``
+(run it every REFRESH_SECONDS or so). Serving processes only read the
+version row:
+
+    exact   the EPC list itself, for sets of up to EXACT_MAX
+    bloom   a Bloom filter sized for FALSE_POSITIVE_RATE
+
+Bloom layout: ``bits`` bits packed LSB-first into bytes (base64), ``hashes``
+probes per EPC. With ``h1, h2`` the two little-endian 64-bit halves of
+blake2b(epc, digest_size=16), probe i is bit ``((h1 + i * h2) mod 2**64)
+mod bits`` (see ``bloom_contains``). A Bloom consumer can set the bits of
+added EPCs itself but must refetch the snapshot to drop removed ones.
+"""
+import base64
+import hashlib
+import math
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import RegisteredEpc, RegistryVersion, RfidItemsTemp
+
+
+HASH = "blake2b128-double"
+MASK64 = (1 << 64) - 1
+CHUNK = 1000
+VERSION_ROW = "registered_epcs"
+
+DEFAULTS = {
+    # How long a process trusts its cached version before reading it again.
+    "REFRESH_SECONDS": 30,
+    "FALSE_POSITIVE_RATE": 0.01,
+    "EXACT_MAX": 5000,
+}
+
+_state = {"at": None, "version": 0}
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "RFID_REGISTRY_FILTER", {}))
+    return config
+
+
+@receiver(post_save, sender=RfidItemsTemp)
+@receiver(post_delete, sender=RfidItemsTemp)
+def _registry_changed(**kwargs):
+    # A failed refresh must not fail the save; refresh_registry catches up.
+    transaction.on_commit(refresh, robust=True)
+
+
+def _chunks(values):
+    values = list(values)
+    for i in range(0, len(values), CHUNK):
+        yield values[i:i + CHUNK]
+
+
+def _version_row():
+    """The locked RegistryVersion row (created from the stamped versions if missing)."""
+    if not RegistryVersion.objects.filter(name=VERSION_ROW).exists():
+        latest = RegisteredEpc.objects.aggregate(a=Max("added_version"), r=Max("removed_version"))
+        RegistryVersion.objects.bulk_create(
+            [RegistryVersion(name=VERSION_ROW, version=max(latest["a"] or 0, latest["r"] or 0))],
+            ignore_conflicts=True,
+        )
+    return RegistryVersion.objects.select_for_update().get(name=VERSION_ROW)
+
+
+def refresh():
+    """Record registry changes since the last refresh; returns the current version."""
+    with transaction.atomic():
+        row = _version_row()
+        registered = set(
+            RfidItemsTemp.objects
+            .exclude(epc__isnull=True).exclude(epc="")
+            .values_list("epc", flat=True)
+        )
+        known = dict(RegisteredEpc.objects.values_list("epc", "removed_version"))
+        current = {epc for epc, removed in known.items() if removed is None}
+
+        added, removed = registered - current, current - registered
+        if not added and not removed:
+            return row.version
+
+        version = row.version + 1
+        RegisteredEpc.objects.bulk_create(
+            [RegisteredEpc(epc=epc, added_version=version) for epc in added if epc not in known],
+            batch_size=CHUNK, ignore_conflicts=True,
+        )
+        for chunk in _chunks(epc for epc in added if epc in known):
+            RegisteredEpc.objects.filter(epc__in=chunk).update(
+                added_version=version, removed_version=None
+            )
+        for chunk in _chunks(removed):
+            RegisteredEpc.objects.filter(epc__in=chunk).update(removed_version=version)
+        row.version = version
+        row.save(update_fields=["version", "updated_at"])
+
+    transaction.on_commit(invalidate)
+    return version
+
+
+def invalidate(**kwargs):
+    """Make the next ``current_version`` call read the version row again."""
+    with _lock:
+        _state["at"] = None
+
+
+def current_version():
+    """
+    The published registry version, read at most every REFRESH_SECONDS per
+    process. Only the first call against an empty database runs ``refresh``.
+    """
+    config = get_config()
+    with _lock:
+        if _state["at"] is not None and time.monotonic() - _state["at"] < config["REFRESH_SECONDS"]:
+            return _state["version"]
+
+    version = (
+        RegistryVersion.objects.filter(name=VERSION_ROW)
+        .values_list("version", flat=True).first()
+    )
+    if version is None:
+        version = refresh()
+    with _lock:
+        _state.update(version=version, at=time.monotonic())
+    return version
+
+
+# ----------------------------------------------------------------------
+# BLOOM FILTER
+# ----------------------------------------------------------------------
+
+def bloom_parameters(n, fpr):
+    """``(bits, hashes)`` for ``n`` members at false-positive rate ``fpr``."""
+    n = max(n, 1)
+    bits = max(64, math.ceil(-n * math.log(fpr) / math.log(2) ** 2))
+    bits = (bits + 7) // 8 * 8
+    return bits, max(1, round(bits / n * math.log(2)))
+
+
+def _digest_halves(epc):
+    digest = hashlib.blake2b(epc.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+def bloom_bits(epcs, bits, hashes):
+    """Packed filter bytes for ``epcs``."""
+    filled = np.zeros(bits, dtype=bool)
+    if epcs:
+        digests = b"".join(hashlib.blake2b(e.encode(), digest_size=16).digest() for e in epcs)
+        halves = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+        h1, h2 = halves[:, 0], halves[:, 1]
+        for i in range(hashes):
+            filled[(h1 + np.uint64(i) * h2) % np.uint64(bits)] = True
+    return np.packbits(filled, bitorder="little").tobytes()
+
+
+def bloom_contains(data, bits, hashes, epc):
+    """Membership test against packed filter bytes, as a client would run it."""
+    h1, h2 = _digest_halves(epc)
+    for i in range(hashes):
+        index = ((h1 + i * h2) & MASK64) % bits
+        if not data[index >> 3] >> (index & 7) & 1:
+            return False
+    return True
+
+
+# ----------------------------------------------------------------------
+# PUBLISHING
+# ----------------------------------------------------------------------
+
+def snapshot(version, exact=False):
+    """
+    Full filter at ``version``. The EPC list is included for small sets,
+    or always with ``exact``. Built once per version and process.
+    """
+    config = get_config()
+    cached = _snapshots.get(version)
+    if cached is None:
+        epcs = sorted(
+            RegisteredEpc.objects.filter(removed_version__isnull=True)
+            .values_list("epc", flat=True)
+        )
+        fpr = config["FALSE_POSITIVE_RATE"]
+        bits, hashes = bloom_parameters(len(epcs), fpr)
+        cached = {
+            "epcs": epcs,
+            "bloom": {
+                "hash": HASH,
+                "bits": bits,
+                "hashes": hashes,
+                "falsePositiveRate": fpr,
+                "data": base64.b64encode(bloom_bits(epcs, bits, hashes)).decode(),
+            },
+        }
+        _snapshots.clear()
+        _snapshots[version] = cached
+
+    epcs = cached["epcs"]
+    return {
+        "version": version,
+        "full": True,
+        "count": len(epcs),
+        "epcs": epcs if exact or len(epcs) <= config["EXACT_MAX"] else None,
+        "bloom": cached["bloom"],
+    }
+
+
+def delta(since, version):
+    """EPCs added and removed after ``since``, or None if ``since`` is not a version we issued."""
+    if since < 0 or since > version:
+        return None
+
+    added = RegisteredEpc.objects.filter(added_version__gt=since, removed_version__isnull=True)
+    removed = RegisteredEpc.objects.filter(removed_version__gt=since)
+    return {
+        "version": version,
+        "full": False,
+        "since": since,
+        "added": sorted(added.values_list("epc", flat=True)),
+        "removed": sorted(removed.values_list("epc", flat=True)),
+    }
@@ -0,0 +1,184 @@
+"""
+Per-project and per-group inventory counters.
+
+An item belongs to a project through ``items.project_id`` or
+``item_projects``, and to groups through ``item_groups``. Presence changes
+are pushed here as ``(epc, old_state, new_state)`` and turned into counter
+deltas on InventoryRollup, so the overview never joins items against
+detections. Membership is edited outside this app, so totals are counted
+on read (``totals``) rather than stored. The present / idle counters only
+move with presence changes: an item added to or removed from a project or
+group keeps counting where it was until ``rebuild`` (the ``rebuild_rollups``
+command) recomputes the counters, which should run after membership edits.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import InventoryRollup, ItemGroups, ItemProjects, Items, TagPresence
+
+
+PROJECT, GROUP = "project", "group"
+
+# Presence state -> counter column; anything else counts as missing.
+COUNTERS = {"active": "present", "idle": "idle"}
+
+
+def memberships(epcs=None):
+    """``{epc: {(scope, scope_id), ...}}`` for live items (all of them if ``epcs`` is None)."""
+    items = Items.objects.filter(deleted_at__isnull=True).exclude(epc__isnull=True).exclude(epc="")
+    if epcs is not None:
+        items = items.filter(epc__in=list(epcs))
+
+    by_item, scopes = {}, defaultdict(set)
+    for item_id, epc, project_id in items.values_list("item_id", "epc", "project_id"):
+        by_item[item_id] = epc
+        if project_id is not None:
+            scopes[epc].add((PROJECT, project_id))
+    if not by_item:
+        return {}
+
+    projects = ItemProjects.objects.all()
+    groups = ItemGroups.objects.all()
+    if epcs is not None:
+        projects = projects.filter(item_id__in=list(by_item))
+        groups = groups.filter(item_id__in=list(by_item))
+
+    for item_id, project_id in projects.values_list("item_id", "project_id"):
+        if item_id in by_item:
+            scopes[by_item[item_id]].add((PROJECT, project_id))
+
+    for item_id, group_id in groups.values_list("item_id", "group_id"):
+        if item_id in by_item:
+            scopes[by_item[item_id]].add((GROUP, group_id))
+
+    return scopes
+
+
+def totals(scope, scope_ids=None):
+    """
+    ``{scope_id: live item count}`` for every project or group with members
+    (only ``scope_ids`` if given), counted by the database.
+    """
+    live = Q(item__deleted_at__isnull=True) & Q(item__epc__isnull=False) & ~Q(item__epc="")
+    if scope == PROJECT:
+        direct = (
+            Items.objects.filter(deleted_at__isnull=True, project_id__isnull=False)
+            .exclude(epc__isnull=True).exclude(epc="")
+        )
+        # Links that repeat the item's own project are already counted above.
+        sources = [
+            (direct, "project_id"),
+            (ItemProjects.objects.filter(live).exclude(item__project_id=F("project_id")),
+             "project_id"),
+        ]
+    else:
+        sources = [(ItemGroups.objects.filter(live), "group_id")]
+
+    counts = Counter()
+    for rows, column in sources:
+        if scope_ids is not None:
+            rows = rows.filter(**{column + "__in": list(scope_ids)})
+        for scope_id, n in rows.values_list(column).annotate(n=Count("item_id")).order_by():
+            counts[scope_id] += n
+    return counts
+
+
+def scope_epcs(scope, scope_id):
+    """EPCs of the live items in one project or group."""
+    if scope == PROJECT:
+        in_scope = Q(project_id=scope_id) | Q(
+            item_id__in=ItemProjects.objects.filter(project_id=scope_id).values("item_id")
+        )
+    else:
+        in_scope = Q(item_id__in=ItemGroups.objects.filter(group_id=scope_id).values("item_id"))
+
+    return set(
+        Items.objects.filter(in_scope, deleted_at__isnull=True)
+        .exclude(epc__isnull=True).exclude(epc="")
+        .values_list("epc", flat=True)
+    )
+
+
+def record(changes, seen=None):
+    """
+    Apply presence changes to the counters.
+
+    ``changes`` is an iterable of ``(epc, old_state, new_state)``; ``seen``
+    maps EPCs to their latest sighting and advances ``last_activity``.
+    """
+    changes = [c for c in changes if c[1] != c[2]]
+    seen = seen or {}
+    epcs = {c[0] for c in changes} | set(seen)
+    if not epcs:
+        return
+
+    scopes_of = memberships(epcs)
+    deltas = defaultdict(lambda: {"present": 0, "idle": 0, "last_activity": None})
+
+    for epc, old, new in changes:
+        for key in scopes_of.get(epc, ()):
+            if old in COUNTERS:
+                deltas[key][COUNTERS[old]] -= 1
+            if new in COUNTERS:
+                deltas[key][COUNTERS[new]] += 1
+
+    for epc, at in seen.items():
+        for key in scopes_of.get(epc, ()):
+            current = deltas[key]["last_activity"]
+            if current is None or at > current:
+                deltas[key]["last_activity"] = at
+
+    if not deltas:
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        InventoryRollup.objects.bulk_create(
+            [InventoryRollup(scope=scope, scope_id=scope_id) for scope, scope_id in deltas],
+            ignore_conflicts=True,
+        )
+        # One UPDATE per touched project/group, in a fixed order to avoid deadlocks.
+        for (scope, scope_id), delta in sorted(deltas.items()):
+            fields = {
+                "present": F("present") + delta["present"],
+                "idle": F("idle") + delta["idle"],
+                "updated_at": now,
+            }
+            if delta["last_activity"] is not None:
+                at = Value(delta["last_activity"])
+                fields["last_activity"] = Greatest(Coalesce("last_activity", at), at)
+            InventoryRollup.objects.filter(scope=scope, scope_id=scope_id).update(**fields)
+
+
+def rebuild():
+    """Recompute every rollup from membership and stored presence; returns the row count."""
+    scopes_of = memberships()
+    presence = {
+        epc: (state, last_seen)
+        for epc, state, last_seen in TagPresence.objects.values_list("epc", "state", "last_seen")
+    }
+
+    now = timezone.now()
+    rows = {}
+    for epc, scopes in scopes_of.items():
+        state, last_seen = presence.get(epc, ("", None))
+        for scope, scope_id in scopes:
+            row = rows.get((scope, scope_id))
+            if row is None:
+                row = rows[(scope, scope_id)] = InventoryRollup(
+                    scope=scope, scope_id=scope_id, updated_at=now
+                )
+            if state in COUNTERS:
+                setattr(row, COUNTERS[state], getattr(row, COUNTERS[state]) + 1)
+            if last_seen is not None and (row.last_activity is None or last_seen > row.last_activity):
+                row.last_activity = last_seen
+
+    with transaction.atomic():
+        InventoryRollup.objects.all().delete()
+        InventoryRollup.objects.bulk_create(rows.values(), batch_size=1000)
+
+    return len(rows)
@@ -0,0 +1,105 @@
+"""
+Primary/replica database routing.
+
+Writes always go to ``default``. Reads go to the replica alias only for
+views listed in ``RFID_DB_ROUTING["READ_VIEWS"]`` (or mapped to it in
+``VIEWS``), and only while the request has not written anything itself.
+After a write the client gets a short-lived cookie that pins its reads to
+the primary, so it never reads data older than its own writes.
+
+ReplicaRoutingMiddleware picks the alias per request; the router just
+reads it from a context variable.
+"""
+import contextvars
+
+from django.conf import settings
+from django.db import connections
+
+
+PRIMARY = "default"
+
+DEFAULTS = {
+    "REPLICA": "replica",
+    # Read-only views (URL names) served from the replica.
+    "READ_VIEWS": [
+        "api_dashboard_live_tags",
+        "api_item_search",
+        "api_reader_status",
+        "api_activity_logs",
+        "api_presence_transitions",
+        "api_project_inventory",
+        "api_group_inventory",
+        "api_visits",
+        "api_dwell_stats",
+        "api_activity_heatmap",
+        "api_zones",
+        "api_zone_items",
+    ],
+    # Per-view overrides: {url_name: alias}.
+    "VIEWS": {},
+    "STICKY_COOKIE": "rfid_db_primary",
+    "STICKY_SECONDS": 10,
+}
+
+_state = contextvars.ContextVar("rfid_db_routing", default=None)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "RFID_DB_ROUTING", {}))
+    return config
+
+
+def read_alias_for(request, view, config):
+    """Database alias for the reads of one request."""
+    alias = config["VIEWS"].get(view)
+    if alias is None:
+        alias = config["REPLICA"] if view in config["READ_VIEWS"] else PRIMARY
+
+    if alias == PRIMARY or alias not in connections.databases:
+        return PRIMARY
+    if request.method not in ("GET", "HEAD"):
+        return PRIMARY
+    if request.COOKIES.get(config["STICKY_COOKIE"]):
+        return PRIMARY
+    return alias
+
+
+def begin(alias=PRIMARY):
+    """Start routing for one request; returns a token for ``end``."""
+    return _state.set({"read": alias, "wrote": False})
+
+
+def route_reads(alias):
+    """Send the current request's reads to ``alias`` (until it writes)."""
+    state = _state.get()
+    if state is not None:
+        state["read"] = alias
+
+
+def end(token):
+    """Reset routing; returns True if the request wrote to the primary."""
+    wrote = bool(_state.get() and _state.get()["wrote"])
+    _state.reset(token)
+    return wrote
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state["wrote"]:
+            return PRIMARY
+        return state["read"]
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state["wrote"] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -0,0 +1,336 @@
+"""
+Durable local spool for tag reads.
+
+Each worker process appends JSON lines to its own segment file
+(``<ns timestamp>-<pid>.open``), flushing every record and fsyncing in
+batches. Segments are sealed (renamed to ``.log``) when they reach
+MAX_SEGMENT_BYTES or when the writing process is gone.
+
+``replay()`` loads segments into ``Detections`` in bulk. The replayed byte
+offset of each segment is stored in SpoolCheckpoint in the same
+transaction as the detections, keyed on the segment name without its
+suffix so the checkpoint survives sealing; every record is applied once;
+dedup claims make a replay after a lost checkpoint harmless as well.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import clock, health, metrics
+from .ingest import antenna_map, collect_reads, registered_epcs, store_candidates
+from .models import Antennas, Readers, SpoolCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULTS = {
+    # "fallback": spool only when the database is unavailable.
+    # "always": spool every batch and let `replay_spool --follow` load it.
+    "MODE": "fallback",
+    "DIR": None,
+    "FSYNC_EVERY": 100,
+    "FSYNC_INTERVAL": 0.2,
+    "MAX_SEGMENT_BYTES": 64 * 1024 * 1024,
+    "REPLAY_CHUNK_BYTES": 4 * 1024 * 1024,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "RFID_SPOOL", {}))
+    if not config["DIR"]:
+        config["DIR"] = Path(settings.BASE_DIR) / "spool"
+    config["DIR"] = Path(config["DIR"])
+    return config
+
+
+def spool_always():
+    return get_config()["MODE"] == "always"
+
+
+# ----------------------------------------------------------------------
+# WRITER
+# ----------------------------------------------------------------------
+
+class SpoolWriter:
+    """Append-only writer for this process's active segment."""
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._fh = None
+        self._path = None
+        self._size = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._pid = os.getpid()
+
+    def append(self, record):
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked after the parent opened a segment; start our own.
+                self._fh, self._pid = None, os.getpid()
+
+            if self._fh is None or self._size >= self.config["MAX_SEGMENT_BYTES"]:
+                self._rotate()
+
+            self._fh.write(line)
+            self._fh.flush()
+            self._size += len(line)
+            self._pending += 1
+
+            now = time.monotonic()
+            if (self._pending >= self.config["FSYNC_EVERY"]
+                    or now - self._last_sync >= self.config["FSYNC_INTERVAL"]):
+                os.fsync(self._fh.fileno())
+                self._pending = 0
+                self._last_sync = now
+
+        metrics.spool_records_written.inc()
+
+    def close(self):
+        with self._lock:
+            self._seal()
+
+    def _rotate(self):
+        self._seal()
+        directory = self.config["DIR"]
+        directory.mkdir(parents=True, exist_ok=True)
+        self._path = directory / f"{time.time_ns():020d}-{os.getpid()}.open"
+        self._fh = open(self._path, "ab")
+        self._size = 0
+
+    def _seal(self):
+        if self._fh is None:
+            return
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self._path.rename(self._path.with_suffix(".log"))
+        self._fh = self._path = None
+        self._pending = 0
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def append(mac, tag_reads, received_at=None):
+    """Durably queue one reader batch for later replay."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SpoolWriter(get_config())
+
+    received_at = received_at or timezone.now()
+    _writer.append({
+        "mac": mac,
+        "received_at": received_at.isoformat(),
+        "tag_reads": tag_reads,
+    })
+
+
+# ----------------------------------------------------------------------
+# REPLAY
+# ----------------------------------------------------------------------
+
+def _segment_pid(path):
+    return int(path.stem.rsplit("-", 1)[1])
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_sealed(path):
+    if path.suffix == ".log":
+        return True
+    pid = _segment_pid(path)
+    return pid != os.getpid() and not _pid_alive(pid)
+
+
+def segments(directory=None):
+    """Spool segments, oldest first."""
+    directory = Path(directory or get_config()["DIR"])
+    if not directory.exists():
+        return []
+    return sorted(
+        (p for p in directory.iterdir() if p.suffix in (".open", ".log")),
+        key=lambda p: p.stem,
+    )
+
+
+def _quarantine(path, data):
+    """Move the torn last line of a sealed segment aside (``<segment>.torn``)."""
+    logger.error("Quarantining %d-byte torn record at the end of %s", len(data), path.name)
+    metrics.spool_records_rejected.inc()
+    with open(path.with_name(path.stem + ".torn"), "ab") as fh:
+        fh.write(data + b"\n")
+
+
+def _read_records(path, offset, chunk_bytes, sealed=False):
+    """
+    Read complete JSON lines starting at ``offset``; return (records, new_offset).
+
+    Reads past ``chunk_bytes`` when a single line is longer than that. In a
+    sealed segment, a last line without its newline (torn by a crash) is
+    quarantined and skipped so replay can finish the segment.
+    """
+    with open(path, "rb") as fh:
+        fh.seek(offset)
+        data = fh.read(chunk_bytes)
+        end = data.rfind(b"\n")
+        while end < 0:
+            more = fh.read(chunk_bytes)
+            if not more:
+                break
+            data += more
+            end = data.rfind(b"\n")
+
+    if end < 0:
+        if sealed and data:
+            _quarantine(path, data)
+            return [], offset + len(data)
+        return [], offset
+
+    records = []
+    for line in data[:end].split(b"\n"):
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            logger.error("Skipping corrupt spool record in %s", path.name)
+            metrics.spool_records_rejected.inc()
+    return records, offset + end + 1
+
+
+def _apply_records(records, now):
+    """Load spooled batches into Detections with a constant number of queries."""
+    macs = {rec.get("mac") for rec in records}
+    readers = {r.mac_address: r for r in Readers.objects.filter(mac_address__in=macs)}
+    valid_epcs = registered_epcs()
+    antennas = antenna_map(list(readers.values()))
+    clocks = clock.load([r.reader_id for r in readers.values()])
+    since = None
+
+    candidates, ignored = {}, []
+    stats = health.BatchStats()
+    for rec in records:
+        reader = readers.get(rec.get("mac"))
+        detected_at = parse_datetime(rec.get("received_at") or "")
+        if reader is None or detected_at is None:
+            metrics.spool_records_rejected.inc()
+            continue
+        since = min(since or detected_at, detected_at)
+        tag_reads = rec.get("tag_reads") or []
+        timestamp_of = clock.correct(clocks[reader.reader_id], tag_reads, detected_at)
+        try:
+            collect_reads(reader, tag_reads, detected_at, valid_epcs, antennas,
+                          candidates, ignored, timestamp_of=timestamp_of, health_stats=stats)
+        except Antennas.DoesNotExist as e:
+            logger.error("Spool record rejected: %s", e)
+            metrics.spool_records_rejected.inc()
+
+    rows = store_candidates(candidates, now)
+    if since is not None:
+        clock.save(clocks.values(), since)
+    health.record(stats, now)
+    return rows
+
+
+def _lock_checkpoint(name):
+    try:
+        return SpoolCheckpoint.objects.select_for_update().get_or_create(segment=name)[0]
+    except IntegrityError:
+        return SpoolCheckpoint.objects.select_for_update().get(segment=name)
+
+
+def replay_segment(path, config=None):
+    """Replay one segment from its checkpoint; delete it once sealed and done."""
+    config = config or get_config()
+    sealed = _is_sealed(path)  # decide before reading so no append is missed
+    replayed = 0
+
+    while True:
+        with transaction.atomic():
+            checkpoint = _lock_checkpoint(path.stem)
+            records, new_offset = _read_records(
+                path, checkpoint.offset, config["REPLAY_CHUNK_BYTES"], sealed
+            )
+            if not records and new_offset == checkpoint.offset:
+                break
+            if records:
+                _apply_records(records, timezone.now())
+            checkpoint.offset = new_offset
+            checkpoint.save(update_fields=["offset", "updated_at"])
+        replayed += len(records)
+        metrics.spool_records_replayed.inc(len(records))
+
+    if sealed and checkpoint.offset >= path.stat().st_size:
+        path.unlink()
+        SpoolCheckpoint.objects.filter(segment=path.stem).delete()
+
+    return replayed
+
+
+def replay(config=None):
+    """Replay every spool segment; returns the number of records applied."""
+    config = config or get_config()
+    replayed = 0
+    for path in segments(config["DIR"]):
+        try:
+            replayed += replay_segment(path, config)
+        except FileNotFoundError:
+            pass  # sealed and removed by a concurrent replayer
+    return replayed
+
+
+def _first_record_time(path, offset):
+    try:
+        records, _ = _read_records(path, offset, 64 * 1024)
+    except FileNotFoundError:
+        return None
+    return parse_datetime(records[0]["received_at"]) if records else None
+
+
+def spool_stats():
+    """Bytes not yet replayed and the age of the oldest unreplayed record."""
+    paths = segments()
+    try:
+        offsets = dict(
+            SpoolCheckpoint.objects
+            .filter(segment__in=[p.stem for p in paths])
+            .values_list("segment", "offset")
+        )
+    except DatabaseError:
+        offsets = {}
+
+    pending, oldest = 0, None
+    for path in paths:
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            continue
+        offset = offsets.get(path.stem, 0)
+        pending += max(0, size - offset)
+        if oldest is None and size > offset:
+            oldest = _first_record_time(path, offset)
+
+    lag = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+    return {"segments": len(paths), "pending_bytes": pending, "lag_seconds": max(0.0, lag)}
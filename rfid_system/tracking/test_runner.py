@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+
+class ManagedModelTestRunner(DiscoverRunner):
+    """
+    Test runner that also creates the tables of the unmanaged models (the
+    schema owned by the external database), so tests can use them.
+
+    They are marked managed for the duration of the run so that
+    TransactionTestCase flushes them between tests as well.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        self._unmanaged = [
+            m for m in apps.get_app_config("tracking").get_models() if not m._meta.managed
+        ]
+        for model in self._unmanaged:
+            model._meta.managed = True
+        super().setup_test_environment(**kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        for model in self._unmanaged:
+            model._meta.managed = False
+
+    def setup_databases(self, **kwargs):
+        config = super().setup_databases(**kwargs)
+        for alias in connections:
+            connection = connections[alias]
+            existing = set(connection.introspection.table_names())
+            with connection.schema_editor() as editor:
+                for model in self._unmanaged:
+                    if model._meta.db_table not in existing:
+                        editor.create_model(model)
+        return config
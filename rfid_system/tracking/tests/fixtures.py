@@ -0,0 +1,19 @@
+from tracking import ingest
+from tracking.models import Antennas, Readers, RfidItemsTemp
+
+
+def make_reader(mac="AA:BB:CC:00:00:01", ports=(1, 2), **fields):
+    reader = Readers.objects.create(mac_address=mac, model="Speedway R420", **fields)
+    for port in ports:
+        Antennas.objects.create(reader=reader, port_number=port)
+    return reader
+
+
+def register(*epcs):
+    RfidItemsTemp.objects.bulk_create([RfidItemsTemp(epc=epc) for epc in epcs])
+    ingest.invalidate_caches()
+    return list(epcs)
+
+
+def read(epc, port=1, rssi=-60, **extra):
+    return {"epc": epc, "antennaPort": port, "peakRssi": rssi, **extra}
@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from tracking import admission
+
+
+ADMISSION = {
+    "ENABLED": True,
+    "BUDGETS": {"ingest": 16, "live": 4, "history": 1, "admin": 2},
+    "QUEUE_SECONDS": {"ingest": 10.0, "live": 1.0, "history": 0.0, "admin": 2.0},
+    "RETRY_AFTER": 3,
+}
+
+
+class BudgetTests(SimpleTestCase):
+
+    def test_full_budget_refuses_until_released(self):
+        budget = admission.Budget("history", 1)
+
+        self.assertTrue(budget.acquire(0))
+        self.assertFalse(budget.acquire(0))
+        self.assertFalse(budget.acquire(0.01))
+        budget.release()
+        self.assertTrue(budget.acquire(0))
+
+
+@override_settings(RFID_ADMISSION=ADMISSION)
+class AdmissionMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.history = admission.budget_for(admission.HISTORY, admission.get_config())
+        self.assertTrue(self.history.acquire(0))
+        self.addCleanup(self.history.release)
+
+    def test_full_class_is_shed_with_503(self):
+        response = self.client.get(reverse("api_activity_logs"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "3")
+        self.assertEqual(self.history.in_flight, 1)
+
+    def test_other_classes_keep_their_slots(self):
+        response = self.client.get(reverse("api_zones"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(admission.occupancy()["live"]["inFlight"], 0)
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from tracking import clock
+from tracking.ingest import ingest_tag_reads
+from tracking.models import Detections, ReaderClock
+
+from .fixtures import make_reader, read, register
+
+
+def micros(at):
+    return int(at.timestamp() * 1_000_000)
+
+
+class CorrectTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+
+    def test_live_batch_calibrates_skew(self):
+        reader_clock = ReaderClock(reader_id=1)
+        tag = read("E1", firstSeenTimestamp=micros(self.now - timedelta(seconds=7)))
+
+        timestamp_of = clock.correct(reader_clock, [tag], self.now)
+
+        self.assertAlmostEqual(reader_clock.skew_seconds, 7, places=3)
+        self.assertEqual(timestamp_of(tag), self.now)
+
+    def test_uncalibrated_backlog_keeps_reader_time(self):
+        reader_clock = ReaderClock(reader_id=1)
+        buffered = self.now - timedelta(hours=2)
+        tag = read("E1", firstSeenTimestamp=micros(buffered))
+
+        timestamp_of = clock.correct(reader_clock, [tag], self.now)
+
+        self.assertEqual(reader_clock.samples, 0)
+        self.assertLess(abs(timestamp_of(tag) - buffered), timedelta(milliseconds=1))
+
+    def test_unset_reader_clock_is_calibrated_from_first_batch(self):
+        reader_clock = ReaderClock(reader_id=1)
+        year_2000 = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+        tags = [read("E1", firstSeenTimestamp=micros(year_2000)),
+                read("E2", firstSeenTimestamp=micros(year_2000 - timedelta(seconds=30)))]
+
+        timestamp_of = clock.correct(reader_clock, tags, self.now)
+
+        self.assertEqual(reader_clock.samples, 1)
+        self.assertEqual(timestamp_of(tags[0]), self.now)
+        self.assertAlmostEqual(
+            (self.now - timestamp_of(tags[1])).total_seconds(), 30, places=3
+        )
+
+    def test_correction_is_bounded(self):
+        reader_clock = ReaderClock(reader_id=1, skew_seconds=0.0, samples=5,
+                                   sampled_at=self.now - timedelta(minutes=1))
+        ancient = read("E1", firstSeenTimestamp=micros(self.now - timedelta(days=400)))
+        future = read("E2", firstSeenTimestamp=micros(self.now + timedelta(days=1)))
+
+        timestamp_of = clock.correct(reader_clock, [ancient, future], self.now)
+
+        self.assertIsNone(timestamp_of(ancient))
+        self.assertEqual(timestamp_of(future), self.now)
+
+
+class ReaderTimestampIngestTests(TestCase):
+
+    def test_wrong_clock_never_stores_implausible_times(self):
+        reader = make_reader()
+        [epc] = register("E20000000000000000000001")
+        now = timezone.now()
+        stuck = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+        ingest_tag_reads(reader, [read(epc, firstSeenTimestamp=micros(stuck))], now=now)
+
+        [detected_at] = Detections.objects.values_list("detected_at", flat=True)
+        self.assertLess(abs(detected_at - now), timedelta(seconds=1))
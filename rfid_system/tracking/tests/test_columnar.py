@@ -0,0 +1,44 @@
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from tracking.columnar import DictionaryEncoder, compact_json_response, to_columns
+
+
+class ToColumnsTests(SimpleTestCase):
+
+    def test_rows_are_transposed_and_encoded(self):
+        at = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        rows = [
+            {"epc": "A", "reader": "R420", "rssi": Decimal("-60.5"), "seen": at},
+            {"epc": "B", "reader": "R220", "rssi": None, "seen": None},
+            {"epc": "C", "reader": "R420", "rssi": Decimal("-70"), "seen": at},
+        ]
+        readers = DictionaryEncoder()
+
+        columns = to_columns(rows, ["epc", "reader", "rssi", "seen"],
+                             dictionaries={"reader": readers}, time_fields=("seen",))
+
+        self.assertEqual(columns, {
+            "epc": ["A", "B", "C"],
+            "reader": [0, 1, 0],
+            "rssi": [-60.5, None, -70.0],
+            "seen": [1767225600000, None, 1767225600000],
+        })
+        self.assertEqual(readers.values, ["R420", "R220"])
+
+    def test_shared_encoder_spans_tables(self):
+        readers = DictionaryEncoder()
+        to_columns([{"reader": "R420"}], ["reader"], {"reader": readers})
+        child = to_columns([{"reader": "R220"}, {"reader": "R420"}], ["reader"],
+                           {"reader": readers})
+
+        self.assertEqual(child["reader"], [1, 0])
+
+    def test_compact_response_has_no_whitespace(self):
+        response = compact_json_response({"a": [1, 2], "b": Decimal("1.5")})
+
+        self.assertEqual(json.loads(response.content), {"a": [1, 2], "b": 1.5})
+        self.assertNotIn(b" ", response.content)
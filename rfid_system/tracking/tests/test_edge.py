@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from tracking import edge
+from tracking.models import Antennas, Detections, ForwardWatermark, RfidItemsTemp
+
+from .fixtures import make_reader, register
+
+
+CONFIG = {**edge.DEFAULTS, "CENTRAL_URL": "http://central.invalid", "TOKEN": "t"}
+
+
+class ForwardOnceTests(TestCase):
+
+    def setUp(self):
+        reader = make_reader()
+        antenna = Antennas.objects.get(reader=reader, port_number=1)
+        now = timezone.now()
+        Detections.objects.bulk_create([
+            Detections(epc=f"E200000000000000000000{i:02X}", reader=reader, antenna=antenna,
+                       rssi=-60, detected_at=now)
+            for i in range(3)
+        ])
+        self.detections = list(Detections.objects.order_by("detection_id"))
+
+    def _watermark(self):
+        return ForwardWatermark.objects.get(name=edge.WATERMARK).last_id
+
+    def test_refused_batch_keeps_watermark(self):
+        refused = edge.PermanentForwardError("403 from central")
+        with mock.patch.object(edge, "_call", side_effect=refused):
+            with self.assertRaises(edge.PermanentForwardError):
+                edge.forward_once(CONFIG)
+        self.assertEqual(self._watermark(), 0)
+
+    def test_rejected_rows_are_skipped(self):
+        reply = {"status": "ok", "rejected": [{"index": 1, "error": "No antenna 1 on reader 9"}]}
+        with mock.patch.object(edge, "_call", return_value=reply), \
+                self.assertLogs("tracking.edge", "ERROR"):
+            self.assertEqual(edge.forward_once(CONFIG), 3)
+        self.assertEqual(self._watermark(), self.detections[-1].detection_id)
+
+
+class SyncRegistryTests(TestCase):
+
+    def test_resync_does_not_duplicate_registry_rows(self):
+        register("E1", "E2")
+        replies = {
+            "/api/ingest/registry/?epcs=0": {"readers": []},
+            "/api/registry/filter/?exact=1": {"version": 3, "full": True, "epcs": ["E2", "E3"]},
+            "/api/registry/filter/?exact=1&since=3": {
+                "version": 4, "full": False, "added": ["E3", "E4"], "removed": ["E2"],
+            },
+        }
+        with mock.patch.object(edge, "_call", side_effect=lambda config, path: replies[path]):
+            edge.sync_registry(CONFIG)
+            edge.sync_registry(CONFIG)
+
+        self.assertEqual(sorted(RfidItemsTemp.objects.values_list("epc", flat=True)),
+                         ["E3", "E4"])
@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase, TestCase
+
+from tracking import epc
+from tracking.models import EpcCode
+
+
+class PackTests(SimpleTestCase):
+
+    def test_round_trip_is_upper_case(self):
+        self.assertEqual(epc.unpack(*epc.pack("3034f87c0000000000000001")),
+                         "3034F87C0000000000000001")
+
+    def test_only_plain_hex_packs(self):
+        for value in ("0x12", "1_2", " 12", "12\n", "", "G1", "1" * 33):
+            with self.subTest(value=value):
+                self.assertFalse(epc.packable(value))
+
+
+class EpcIdsTests(TestCase):
+
+    def test_spellings_get_ids_by_normalized_value(self):
+        spellings = ["E2000000000000000000000A", "e2000000000000000000000a", "0x12", "0012"]
+
+        ids = epc.epc_ids(spellings)
+
+        self.assertEqual(set(ids), set(spellings))
+        self.assertEqual(ids[spellings[0]], ids[spellings[1]])
+        self.assertNotEqual(ids["0x12"], ids["0012"])
+        self.assertEqual(EpcCode.objects.count(), 3)
+        self.assertEqual(EpcCode.objects.get(epc_id=ids["0x12"]).raw, "0x12")
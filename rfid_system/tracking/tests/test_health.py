@@ -0,0 +1,76 @@
+import statistics
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from tracking import health
+from tracking.models import AntennaHealth, Antennas, Logs
+
+from .fixtures import make_reader
+
+
+T0 = datetime(2026, 1, 1, 8, tzinfo=dt_timezone.utc)
+
+CONFIG = {
+    "WINDOW_SECONDS": 60,
+    "WARMUP_WINDOWS": 3,
+    "MIN_BASELINE_READS": 5,
+    "RATE_DROP_RATIO": 0.2,
+    "SILENCE_MIN_WINDOWS": 5,
+    "SILENCE_EXPECTED_READS": 20,
+}
+
+
+class BatchStatsTests(SimpleTestCase):
+
+    def test_cells_keep_count_and_welford_rssi(self):
+        stats = health.BatchStats(window_seconds=60)
+        values = [-60, -62, -65, -70]
+        for i, rssi in enumerate(values):
+            stats.add(1, 7, rssi, T0 + timedelta(seconds=i))
+        stats.add(1, 7, None, T0 + timedelta(seconds=70))
+
+        first, second = (stats.cells[k] for k in sorted(stats.cells))
+        _, reads, n, mean, m2, last_seen = first
+        self.assertEqual((reads, n, last_seen), (4, 4, T0 + timedelta(seconds=3)))
+        self.assertAlmostEqual(mean, statistics.mean(values))
+        self.assertAlmostEqual(m2 / n, statistics.pvariance(values))
+        self.assertEqual(second[1:3], [1, 0])
+
+
+@override_settings(RFID_ANTENNA_HEALTH=CONFIG)
+class AnomalyTests(TestCase):
+
+    def setUp(self):
+        self.reader = make_reader(ports=(1,))
+        self.antenna_id = Antennas.objects.get(reader=self.reader).antenna_id
+
+    def window(self, index, reads):
+        stats = health.BatchStats()
+        for i in range(reads):
+            stats.add(self.reader.reader_id, self.antenna_id, -60,
+                      T0 + timedelta(minutes=index, seconds=i))
+        health.record(stats, now=T0 + timedelta(minutes=index + 1))
+        return AntennaHealth.objects.get(antenna_id=self.antenna_id)
+
+    def test_rate_drop_is_flagged_after_warmup_and_cleared(self):
+        for index in range(6):
+            self.assertEqual(self.window(index, 10).flags, [])
+        self.window(6, 1)
+
+        with self.assertLogs("tracking.health", "WARNING"):
+            self.assertEqual(self.window(7, 10).flags, [health.RATE_DROP])
+        self.assertEqual(Logs.objects.get(action="antenna").reader_id, self.reader.reader_id)
+        self.assertEqual(self.window(8, 10).flags, [])
+
+    def test_sweep_flags_silent_antennas_once(self):
+        for index in range(6):
+            state = self.window(index, 10)
+        later = state.last_read_at + timedelta(minutes=10)
+
+        self.assertEqual(health.sweep(now=state.last_read_at + timedelta(minutes=2)), 0)
+        with self.assertLogs("tracking.health", "WARNING"):
+            self.assertEqual(health.sweep(now=later), 1)
+        self.assertEqual(health.sweep(now=later), 0)
+        self.assertEqual(AntennaHealth.objects.get(antenna_id=self.antenna_id).flags,
+                         [health.SILENCE])
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.test import TestCase
+
+from tracking import heatmap
+from tracking.models import Antennas, Detections
+
+from .fixtures import make_reader
+
+
+HELSINKI = ZoneInfo("Europe/Helsinki")  # UTC+2 in January
+
+
+def utc(day, hour, minute=0):
+    return datetime(2026, 1, day, hour, minute, tzinfo=dt_timezone.utc)
+
+
+class HeatmapTests(TestCase):
+
+    def setUp(self):
+        self.reader = make_reader(ports=(1,))
+        self.antenna = Antennas.objects.get(reader=self.reader)
+        for antenna, detected_at in [
+            (self.antenna, utc(4, 23, 30)),   # Mon 01:30 local
+            (self.antenna, utc(5, 6, 30)),    # Mon 08:30 local
+            (self.antenna, utc(5, 6, 45)),    # Mon 08:45 local
+            (None, utc(6, 0, 15)),            # Tue 02:15 local, reader-level read
+        ]:
+            Detections.objects.create(epc="E1", reader=self.reader, antenna=antenna,
+                                      detected_at=detected_at)
+
+    def counts(self, mode, start, end, **kwargs):
+        pairs, labels, counts = heatmap.compute(start, end, mode, HELSINKI, **kwargs)
+        return labels, {pair: row.tolist() for pair, row in zip(pairs, counts)}
+
+    def test_local_hour_of_day(self):
+        labels, counts = self.counts(heatmap.HOUR, utc(4, 0), utc(7, 0))
+
+        self.assertEqual(labels[8], "08:00")
+        at_antenna = counts[(self.reader.reader_id, self.antenna.antenna_id)]
+        self.assertEqual((at_antenna[1], at_antenna[8], sum(at_antenna)), (1, 2, 3))
+        self.assertEqual(counts[(self.reader.reader_id, None)][2], 1)
+
+    def test_local_day_of_week(self):
+        labels, counts = self.counts(heatmap.WEEKDAY, utc(4, 0), utc(7, 0))
+
+        self.assertEqual(counts[(self.reader.reader_id, self.antenna.antenna_id)],
+                         [3, 0, 0, 0, 0, 0, 0])
+        self.assertEqual(counts[(self.reader.reader_id, None)], [0, 1, 0, 0, 0, 0, 0])
+
+    def test_fixed_intervals_from_range_start_in_chunks(self):
+        start = utc(4, 23)
+        labels, counts = self.counts(heatmap.INTERVAL, start, start + timedelta(hours=9),
+                                     interval=4 * 3600, chunk_size=1)
+
+        self.assertEqual(labels, [start.isoformat(),
+                                  (start + timedelta(hours=4)).isoformat(),
+                                  (start + timedelta(hours=8)).isoformat()])
+        self.assertEqual(counts[(self.reader.reader_id, self.antenna.antenna_id)], [1, 2, 0])
+        self.assertEqual(counts[(self.reader.reader_id, None)], [0, 0, 0])
@@ -0,0 +1,159 @@
+import threading
+from collections import Counter
+from datetime import timedelta
+from unittest import skipIf
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from tracking import zones
+from tracking.ingest import dedup_bucket, ingest_forwarded_batch, ingest_tag_reads
+from tracking.models import (
+    Antennas, Detections, ItemZone, Logs, RfidItemsTemp, TagPresence, Visit, Zone, ZoneAntenna,
+)
+
+from .fixtures import make_reader, read, register
+
+
+@skipIf(connection.vendor == "sqlite" and connection.is_in_memory_db(),
+        "threads cannot share an in-memory SQLite test database")
+class ConcurrentDedupTests(TransactionTestCase):
+    """
+    Many workers ingesting the same reads must store each (epc, bucket) once.
+
+    Workers here are threads with their own connections, which exercises the
+    same claim race as separate processes; the multi-process check against
+    a running server is ``manage.py hammer_ingest``.
+    """
+
+    THREADS = 8
+    ROUNDS = 5
+
+    def test_one_detection_per_epc_and_bucket(self):
+        reader = make_reader()
+        epcs = register(*[f"E2000000000000000000{i:04X}" for i in range(20)])
+        # Fixed timestamps inside one bucket, so every worker competes for the same keys.
+        now = timezone.now().replace(microsecond=0)
+        now -= timedelta(seconds=now.second % 5)
+        batch = [read(epc) for epc in epcs]
+
+        errors = []
+        barrier = threading.Barrier(self.THREADS)
+
+        def worker():
+            try:
+                barrier.wait()
+                for i in range(self.ROUNDS):
+                    ingest_tag_reads(reader, batch, now=now + timedelta(milliseconds=i))
+            except Exception as e:  # surfaced below
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        stored = Counter(
+            (epc, dedup_bucket(detected_at))
+            for epc, detected_at in Detections.objects.values_list("epc", "detected_at")
+        )
+        self.assertEqual(len(stored), len(epcs))
+        self.assertEqual(set(stored.values()), {1})
+
+
+class ForwardedBatchTests(TestCase):
+
+    def test_unknown_antenna_rejects_only_its_row(self):
+        reader = make_reader(ports=(1,))
+        epcs = register("E20000000000000000000001", "E20000000000000000000002")
+        at = timezone.now().isoformat()
+        batch = [
+            read(epcs[0], mac=reader.mac_address, detected_at=at),
+            read(epcs[1], port=7, mac=reader.mac_address, detected_at=at),
+        ]
+
+        rows, ignored, unknown, rejected = ingest_forwarded_batch(batch)
+
+        self.assertEqual([d.epc for d in rows], [epcs[0]])
+        self.assertEqual([r["index"] for r in rejected], [1])
+        self.assertEqual(unknown, [])
+
+
+class InWindowUpgradeTests(TestCase):
+
+    def test_stronger_read_corrects_state_without_transitions(self):
+        reader = make_reader()
+        [epc] = register("E20000000000000000000001")
+        now = timezone.now().replace(microsecond=0)
+        now -= timedelta(seconds=now.second % 5)
+
+        ingest_tag_reads(reader, [read(epc, port=1, rssi=-70)], now=now)
+        ingest_tag_reads(reader, [read(epc, port=2, rssi=-50)], now=now + timedelta(seconds=1))
+        ingest_tag_reads(reader, [read(epc, port=2, rssi=-40)], now=now + timedelta(seconds=2))
+
+        antenna = Antennas.objects.get(reader=reader, port_number=2)
+        self.assertEqual(list(Logs.objects.values_list("action", flat=True)), ["arrived"])
+        self.assertEqual(TagPresence.objects.get(epc=epc).antenna_id, antenna.antenna_id)
+        self.assertEqual(
+            list(Visit.objects.values_list("antenna_id", "read_count")),
+            [(antenna.antenna_id, 1)],
+        )
+
+    def test_stronger_earlier_read_still_moves_the_tag(self):
+        reader = make_reader()
+        [epc] = register("E20000000000000000000001")
+        weak, strong = (Antennas.objects.get(reader=reader, port_number=p) for p in (1, 2))
+        for antenna in (weak, strong):
+            zone = Zone.objects.create(name=f"Zone {antenna.port_number}")
+            ZoneAntenna.objects.create(zone=zone, reader=reader, antenna=antenna)
+        self.addCleanup(zones._invalidate)  # rollback sends no post_delete
+        now = timezone.now().replace(microsecond=0)
+        now -= timedelta(seconds=now.second % 5)
+
+        def forward(port, rssi, at):
+            ingest_forwarded_batch([
+                read(epc, port=port, rssi=rssi, mac=reader.mac_address, detected_at=at.isoformat())
+            ])
+
+        forward(1, -70, now + timedelta(seconds=2))
+        forward(2, -40, now + timedelta(seconds=1))
+
+        presence = TagPresence.objects.get(epc=epc)
+        self.assertEqual(presence.antenna_id, strong.antenna_id)
+        self.assertEqual(presence.last_seen, now + timedelta(seconds=1))
+        self.assertEqual(ItemZone.objects.get(epc=epc).zone.name, "Zone 2")
+        self.assertEqual(list(Logs.objects.values_list("action", flat=True)), ["arrived"])
+
+
+class UnpackableEpcTests(TestCase):
+
+    def test_registered_non_hex_epc_is_stored_once(self):
+        reader = make_reader()
+        epcs = register("TEST-EPC-1", "E2" * 20)
+        now = timezone.now().replace(microsecond=0)
+        now -= timedelta(seconds=now.second % 5)
+
+        saved, ignored = ingest_tag_reads(reader, [read(epc) for epc in epcs], now=now)
+        ingest_tag_reads(reader, [read(epc) for epc in epcs], now=now + timedelta(seconds=1))
+
+        self.assertEqual(sorted(saved), sorted(epcs))
+        self.assertEqual(ignored, [])
+        self.assertEqual(Detections.objects.count(), 2)
+
+
+class RegistryCacheTests(TestCase):
+
+    def test_registering_through_django_takes_effect_immediately(self):
+        reader = make_reader()
+        [first] = register("E20000000000000000000001")
+        ingest_tag_reads(reader, [read(first)])  # fills the process cache
+
+        RfidItemsTemp.objects.create(epc="E20000000000000000000002")
+        saved, ignored = ingest_tag_reads(reader, [read("E20000000000000000000002")])
+
+        self.assertEqual((saved, ignored), (["E20000000000000000000002"], []))
@@ -0,0 +1,54 @@
+import json
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from tracking import labels
+from tracking.models import Labels, RfidItemsTemp
+
+
+def batch_body(**overrides):
+    body = {"companyPrefix": "0614141", "itemReference": "812345", "count": 2}
+    body.update(overrides)
+    return json.dumps(body)
+
+
+class LabelBatchViewTests(TestCase):
+
+    def post(self, **overrides):
+        return self.client.post(reverse("api_label_batch"), batch_body(**overrides),
+                                content_type="application/json")
+
+    def test_item_batch_is_registered(self):
+        response = self.post(item={"item_name": "Scope", "checkby_date": "2027-03-01"})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["X-Label-Serials"], "1-2")
+        self.assertEqual(Labels.objects.count(), 2)
+        self.assertEqual(
+            {str(d) for d in RfidItemsTemp.objects.values_list("checkby_date", flat=True)},
+            {"2027-03-01"},
+        )
+
+    def test_invalid_input_is_rejected_before_allocating(self):
+        for overrides in (
+            {"count": True},
+            {"count": "2"},
+            {"count": 0},
+            {"item": {"checkby_date": "next week"}},
+            {"item": {"checkby_date": "2027-02-30"}},
+        ):
+            with self.subTest(**overrides):
+                self.assertEqual(self.post(**overrides).status_code, 400)
+        self.assertEqual(Labels.objects.count(), 0)
+
+
+class ZplTests(SimpleTestCase):
+
+    def test_item_name_cannot_inject_commands(self):
+        batch = labels.LabelBatch("0614141", "812345", 0, ["3034"], "A^XZ~JA_ö\n")
+
+        [label] = labels.zpl_lines(batch)
+
+        self.assertIn("^FH^FDA_5EXZ_7EJA_5F_C3_B6_0A^FS", label)
+        self.assertEqual(label.count("^XZ"), 1)
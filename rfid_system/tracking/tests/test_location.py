@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from tracking.location import estimate_locations, score_reads
+from tracking.models import Antennas, Detections
+
+from .fixtures import make_reader
+
+
+class ScoreReadsTests(SimpleTestCase):
+
+    def test_strongest_recent_antenna_wins(self):
+        scored = score_reads(
+            ["A", "A", "A", "B"],
+            [1, 2, 2, 1],
+            [-50.0, -60.0, -60.0, -70.0],
+            [0.0, 0.0, 0.0, 0.0],
+            half_life=5,
+        )
+
+        antenna, confidence, reads = scored["A"]
+        self.assertEqual((antenna, reads), (1, 3))
+        # 10^-5 against 2 x 10^-6
+        self.assertAlmostEqual(confidence, 1 / 1.2, places=6)
+        self.assertEqual(scored["B"], (1, 1.0, 1))
+
+    def test_old_reads_decay(self):
+        scored = score_reads(["A", "A"], [1, 2], [-50.0, -60.0], [50.0, 0.0], half_life=5)
+
+        self.assertEqual(scored["A"][0], 2)
+
+    def test_no_reads(self):
+        self.assertEqual(score_reads([], [], [], [], half_life=5), {})
+
+
+class EstimateLocationsTests(TestCase):
+
+    def test_window_and_antenna_ids(self):
+        reader = make_reader()
+        antenna = Antennas.objects.get(reader=reader, port_number=2)
+        now = timezone.now()
+        Detections.objects.bulk_create([
+            Detections(epc="E1", reader=reader, antenna=antenna, rssi=-55, detected_at=now),
+            Detections(epc="E2", reader=reader, antenna=None, rssi=None, detected_at=now),
+            Detections(epc="E3", reader=reader, antenna=antenna, rssi=-55,
+                       detected_at=now - timedelta(hours=1)),
+        ])
+
+        locations = estimate_locations(now=now)
+
+        self.assertEqual(set(locations), {"E1", "E2"})
+        self.assertEqual((locations["E1"].reader_id, locations["E1"].antenna_id),
+                         (reader.reader_id, antenna.antenna_id))
+        self.assertIsNone(locations["E2"].antenna_id)
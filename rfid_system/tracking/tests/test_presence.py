@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tracking import presence
+from tracking.ingest import ingest_tag_reads
+from tracking.models import Items, Logs, TagPresence
+
+from .fixtures import make_reader, read, register
+
+
+class PresenceTests(TestCase):
+
+    def setUp(self):
+        self.reader = make_reader()
+        [self.epc] = register("E20000000000000000000001")
+
+    def test_observe_derives_state_from_sighting_age(self):
+        now = timezone.now()
+        state = TagPresence(epc=self.epc)
+
+        transition = presence.observe(state, 1, 1, now - timedelta(hours=3), now)
+        self.assertIsNone(transition)
+        self.assertEqual(state.state, presence.MISSING)
+
+        transition = presence.observe(state, 1, 2, now - timedelta(minutes=30), now)
+        self.assertIsNone(transition)
+        self.assertEqual(state.state, presence.IDLE)
+
+        transition = presence.observe(state, 1, 1, now, now)
+        self.assertEqual(transition.action, "moved")
+        self.assertEqual(state.state, presence.ACTIVE)
+
+    def test_buffered_reads_log_no_arrival(self):
+        now = timezone.now()
+        buffered = now - timedelta(hours=3)
+        ingest_tag_reads(
+            self.reader,
+            [read(self.epc, firstSeenTimestamp=int(buffered.timestamp() * 1_000_000))],
+            now=now,
+        )
+
+        self.assertEqual(presence.stored_states([self.epc], now), {self.epc: presence.MISSING})
+        self.assertFalse(Logs.objects.filter(action="arrived").exists())
+
+    def test_stored_states_are_aged_on_read(self):
+        now = timezone.now()
+        ingest_tag_reads(self.reader, [read(self.epc)], now=now)
+
+        self.assertEqual(presence.stored_states([self.epc], now), {self.epc: presence.ACTIVE})
+        later = now + presence.ACTIVE_FOR + timedelta(minutes=1)
+        self.assertEqual(presence.stored_states([self.epc], later), {self.epc: presence.IDLE})
+
+
+class TransitionsViewTests(TestCase):
+
+    def test_epc_filter_matches_exactly(self):
+        reader = make_reader()
+        epcs = register("E20000000000000000000001", "E200000000000000000000011", "E3")
+        Items.objects.create(name="Scope", tag_id="T1", epc=epcs[0])
+        ingest_tag_reads(reader, [read(epc) for epc in epcs], now=timezone.now())
+
+        for epc in (epcs[0], epcs[2]):
+            response = self.client.get(reverse("api_presence_transitions"), {"epc": epc})
+            self.assertEqual([t["epc"] for t in response.json()["transitions"]], [epc])
@@ -0,0 +1,26 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from tracking import rebuild
+from tracking.models import RebuildCheckpoint
+
+
+class RebuildCheckpointTests(TestCase):
+
+    def test_resume_requires_the_same_partition_count(self):
+        rebuild.rebuild_partition("nightly", 0, 4, [], timezone.now())
+
+        self.assertEqual(rebuild.run_partitions("nightly"), 4)
+        self.assertEqual(rebuild.finished_partitions("nightly", 4), {0})
+        with self.assertRaises(ValueError):
+            rebuild.finished_partitions("nightly", 8)
+
+    def test_command_refuses_a_different_count(self):
+        RebuildCheckpoint.objects.create(run="nightly", partition=0, partitions=4,
+                                         finished_at=timezone.now())
+
+        with self.assertRaisesMessage(CommandError, "started with 4 partitions"):
+            call_command("rebuild_derived", run="nightly", partitions=8, stdout=StringIO())
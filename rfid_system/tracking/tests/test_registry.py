@@ -0,0 +1,47 @@
+from django.test import TestCase
+
+from tracking import registry
+from tracking.models import RegisteredEpc, RegistryVersion, RfidItemsTemp
+
+from .fixtures import register
+
+
+class RefreshTests(TestCase):
+
+    def setUp(self):
+        self.addCleanup(registry.invalidate)
+        registry.invalidate()
+
+    def test_changes_are_stamped_from_the_version_row(self):
+        RegistryVersion.objects.update_or_create(name=registry.VERSION_ROW,
+                                                 defaults={"version": 10})
+        register("E1", "E2")
+        self.assertEqual(registry.refresh(), 11)
+        self.assertEqual(registry.refresh(), 11)
+
+        RfidItemsTemp.objects.filter(epc="E1").delete()
+        register("E3")
+
+        self.assertEqual(registry.refresh(), 12)
+        self.assertEqual(RegistryVersion.objects.get(name=registry.VERSION_ROW).version, 12)
+        self.assertEqual(registry.delta(11, 12)["added"], ["E3"])
+        self.assertEqual(registry.delta(11, 12)["removed"], ["E1"])
+
+    def test_missing_row_continues_from_stamped_versions(self):
+        RegistryVersion.objects.all().delete()
+        RegisteredEpc.objects.create(epc="E1", added_version=4, removed_version=7)
+        register("E2")
+
+        self.assertEqual(registry.refresh(), 8)
+
+    def test_saves_publish_on_commit_and_readers_only_read_the_row(self):
+        self.assertEqual(registry.current_version(), registry.refresh())
+        before = registry.current_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RfidItemsTemp.objects.create(epc="E9")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(registry.current_version(), before + 1)
+        with self.assertNumQueries(0):
+            registry.current_version()
@@ -0,0 +1,55 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tracking.ingest import ingest_tag_reads
+from tracking import rollups
+from tracking.models import Groups, ItemGroups, ItemProjects, Items, Organizations, Projects
+
+from .fixtures import make_reader, read, register
+
+
+class ProjectInventoryTests(TestCase):
+
+    def test_totals_follow_membership_without_rebuild(self):
+        org = Organizations.objects.create(name="Lab")
+        project = Projects.objects.create(org=org, code="P1", name="Project 1")
+        Projects.objects.create(org=org, code="P2", name="Empty")
+        epcs = register("E20000000000000000000001", "E20000000000000000000002")
+        for i, epc in enumerate(epcs):
+            Items.objects.create(project=project, name=f"Item {i}", tag_id=f"T{i}", epc=epc)
+
+        ingest_tag_reads(make_reader(), [read(epcs[0])], now=timezone.now())
+
+        rows = self.client.get(reverse("api_project_inventory")).json()["projects"]
+        self.assertEqual(
+            [(r["code"], r["total"], r["present"], r["missing"]) for r in rows],
+            [("P1", 2, 1, 1), ("P2", 0, 0, 0)],
+        )
+
+    def test_totals_count_each_live_member_once(self):
+        org = Organizations.objects.create(name="Lab")
+        p1 = Projects.objects.create(org=org, code="P1", name="Project 1")
+        p2 = Projects.objects.create(org=org, code="P2", name="Project 2")
+        direct = Items.objects.create(project=p1, name="Direct", tag_id="T1", epc="E1")
+        linked = Items.objects.create(name="Linked", tag_id="T2", epc="E2")
+        deleted = Items.objects.create(
+            project=p2, name="Deleted", tag_id="T3", epc="E3", deleted_at=timezone.now()
+        )
+        for item in (direct, linked):
+            ItemProjects.objects.create(item=item, project=p1)
+        ItemProjects.objects.create(item=linked, project=p2)
+        ItemProjects.objects.create(item=deleted, project=p2)
+        group = Groups.objects.create(name="Shelf A")
+        for item in (direct, deleted):
+            ItemGroups.objects.create(item=item, group=group)
+
+        self.assertEqual(rollups.totals(rollups.PROJECT), {p1.pk: 2, p2.pk: 1})
+        self.assertEqual(rollups.totals(rollups.PROJECT, [p2.pk]), {p2.pk: 1})
+        self.assertEqual(rollups.totals(rollups.GROUP), {group.pk: 1})
+
+        with self.assertNumQueries(4):
+            rows = self.client.get(
+                reverse("api_project_inventory"), {"id": p1.pk}
+            ).json()["projects"]
+        self.assertEqual([(r["code"], r["total"]) for r in rows], [("P1", 2)])
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase
+
+from tracking import routers
+from tracking.models import Detections
+
+
+CONFIG = dict(routers.DEFAULTS, READ_VIEWS=["api_visits"], VIEWS={"api_zones": "analytics"})
+
+
+@mock.patch.object(routers, "connections",
+                   SimpleNamespace(databases={"default": {}, "replica": {}, "analytics": {}}))
+class ReadAliasTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_read_views_go_to_the_replica(self):
+        request = self.factory.get("/")
+        self.assertEqual(routers.read_alias_for(request, "api_visits", CONFIG), "replica")
+        self.assertEqual(routers.read_alias_for(request, "api_zones", CONFIG), "analytics")
+        self.assertEqual(routers.read_alias_for(request, "api_item_lookup", CONFIG), "default")
+
+    def test_writes_and_pinned_clients_stay_on_the_primary(self):
+        post = self.factory.post("/")
+        pinned = self.factory.get("/")
+        pinned.COOKIES[CONFIG["STICKY_COOKIE"]] = "1"
+
+        self.assertEqual(routers.read_alias_for(post, "api_visits", CONFIG), "default")
+        self.assertEqual(routers.read_alias_for(pinned, "api_visits", CONFIG), "default")
+
+    def test_unconfigured_replica_falls_back_to_the_primary(self):
+        config = dict(CONFIG, REPLICA="missing")
+        self.assertEqual(
+            routers.read_alias_for(self.factory.get("/"), "api_visits", config), "default"
+        )
+
+
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+
+    def test_reads_follow_the_request_until_it_writes(self):
+        token = routers.begin("replica")
+        try:
+            self.assertEqual(self.router.db_for_read(Detections), "replica")
+            self.assertEqual(self.router.db_for_write(Detections), "default")
+            self.assertEqual(self.router.db_for_read(Detections), "default")
+        finally:
+            self.assertTrue(routers.end(token))
+
+    def test_outside_a_request_everything_uses_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Detections), "default")
+        self.assertEqual(self.router.db_for_write(Detections), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "tracking"))
@@ -0,0 +1,76 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tracking import spool
+from tracking.models import AntennaHealth, SpoolCheckpoint
+
+from .fixtures import make_reader, read, register
+
+
+class SpoolReplayTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(RFID_SPOOL={"DIR": directory.name})
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.config = spool.get_config()
+
+        self.reader = make_reader()
+        self.epcs = register("E20000000000000000000001", "E20000000000000000000002")
+
+    def _append(self, writer):
+        writer.append({
+            "mac": self.reader.mac_address,
+            "received_at": timezone.now().isoformat(),
+            "tag_reads": [read(epc) for epc in self.epcs],
+        })
+
+    def test_sealing_does_not_replay_segment_again(self):
+        writer = spool.SpoolWriter(self.config)
+        self._append(writer)
+        [open_segment] = spool.segments(self.config["DIR"])
+        self.assertEqual(spool.replay_segment(open_segment, self.config), 1)
+
+        self._append(writer)
+        writer.close()
+        [sealed] = spool.segments(self.config["DIR"])
+        self.assertEqual(sealed.suffix, ".log")
+        self.assertEqual(spool.replay_segment(sealed, self.config), 1)
+
+        reads = sum(AntennaHealth.objects.values_list("total_reads", flat=True))
+        self.assertEqual(reads, 2 * len(self.epcs))
+        self.assertFalse(sealed.exists())
+        self.assertFalse(SpoolCheckpoint.objects.exists())
+
+    def test_record_longer_than_a_chunk_is_replayed(self):
+        config = {**self.config, "REPLAY_CHUNK_BYTES": 64}
+        writer = spool.SpoolWriter(config)
+        self._append(writer)
+        self._append(writer)
+        writer.close()
+        [sealed] = spool.segments(config["DIR"])
+
+        self.assertEqual(spool.replay_segment(sealed, config), 2)
+        self.assertFalse(sealed.exists())
+
+    def test_torn_tail_is_quarantined(self):
+        writer = spool.SpoolWriter(self.config)
+        self._append(writer)
+        writer.close()
+        [sealed] = spool.segments(self.config["DIR"])
+        torn = json.dumps({"mac": self.reader.mac_address})[:20].encode()
+        with open(sealed, "ab") as fh:
+            fh.write(torn)
+
+        with self.assertLogs("tracking.spool", "ERROR"):
+            self.assertEqual(spool.replay_segment(sealed, self.config), 1)
+
+        self.assertFalse(sealed.exists())
+        quarantined = Path(self.config["DIR"]) / (sealed.stem + ".torn")
+        self.assertEqual(quarantined.read_bytes(), torn + b"\n")
@@ -0,0 +1,26 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from tracking.models import RfidItemsTemp
+
+
+class ItemLookupTests(TestCase):
+
+    def test_codes_match_regardless_of_case(self):
+        RfidItemsTemp.objects.create(epc="e2000000000000000000000a", barcode="bc-17",
+                                     item_name="Scope")
+
+        response = self.client.post(
+            reverse("api_item_lookup"),
+            json.dumps({"codes": ["E2000000000000000000000A", "BC-17", "nope"]}),
+            content_type="application/json",
+        )
+
+        body = response.json()
+        self.assertEqual(
+            [(r["code"], r["matchedBy"]) for r in body["results"]],
+            [("E2000000000000000000000A", "epc"), ("BC-17", "barcode")],
+        )
+        self.assertEqual(body["unknown"], ["nope"])
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from tracking import visits
+from tracking.ingest import ingest_forwarded_batch
+from tracking.models import Antennas, Visit
+
+from .fixtures import make_reader, read, register
+
+
+T0 = datetime(2026, 1, 1, 8, tzinfo=dt_timezone.utc)
+
+
+def at(seconds):
+    return T0 + timedelta(seconds=seconds)
+
+
+class SessionizeTests(SimpleTestCase):
+
+    def test_gap_and_antenna_change_split_visits(self):
+        rows = [
+            ("A", 1, 1, at(0)),
+            ("B", 1, 2, at(10)),
+            ("A", 1, 1, at(60)),
+            ("A", 1, 1, at(400)),   # after the 300 s gap
+            ("A", 1, 2, at(410)),   # other antenna
+        ]
+
+        result = [
+            (v.epc, v.antenna_id, v.arrived_at, v.departed_at, v.read_count, v.is_open)
+            for v in visits.sessionize(rows, gap=300)
+        ]
+
+        self.assertEqual(result, [
+            ("A", 1, at(0), at(60), 2, False),
+            ("A", 1, at(400), at(400), 1, False),
+            ("A", 2, at(410), at(410), 1, True),
+            ("B", 2, at(10), at(10), 1, True),
+        ])
+
+    def test_late_read_inside_a_visit_is_only_counted(self):
+        visit, _ = visits.extend(None, "A", 1, 1, at(0), timedelta(seconds=300))
+        visits.extend(visit, "A", 1, 1, at(100), timedelta(seconds=300))
+
+        same, closed = visits.extend(visit, "A", 1, 1, at(50), timedelta(seconds=300))
+
+        self.assertIs(same, visit)
+        self.assertIsNone(closed)
+        self.assertEqual((visit.read_count, visit.dwell_seconds), (3, 100))
+
+
+class ApplyDetectionsTests(TestCase):
+
+    def test_buffered_reads_are_resessionized(self):
+        reader = make_reader()
+        [epc] = register("E20000000000000000000001")
+        start = timezone.now().replace(microsecond=0) - timedelta(hours=1)
+
+        def forward(port, seconds):
+            ingest_forwarded_batch([read(epc, port=port, mac=reader.mac_address,
+                                         detected_at=(start + timedelta(seconds=seconds)).isoformat())])
+
+        forward(1, 0)
+        forward(1, 120)
+        forward(2, 60)  # delivered late, splits the antenna 1 visit
+
+        antenna = dict(Antennas.objects.values_list("antenna_id", "port_number"))
+        self.assertEqual(
+            [(antenna[a], n, is_open) for a, n, is_open in
+             Visit.objects.order_by("arrived_at").values_list("antenna_id", "read_count", "is_open")],
+            [(1, 1, False), (2, 1, False), (1, 1, True)],
+        )
@@ -0,0 +1,49 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from tracking import epc, warmup
+from tracking.models import EpcCode
+
+from .fixtures import register
+
+
+class ForkedStateTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.dict(warmup._state)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_state_inherited_from_another_process_is_cold(self):
+        warmup._state.update(status="warming", pid=os.getpid() + 1)
+
+        state = warmup.state()
+
+        self.assertEqual(state["status"], "cold")
+        self.assertEqual(state["pid"], os.getpid())
+
+    def test_child_gets_a_fresh_lock(self):
+        inherited = warmup._lock
+        with inherited:
+            warmup._state.update(status="ready")
+            warmup._reset_after_fork()
+
+            self.assertFalse(warmup._lock.locked())
+            self.assertEqual(warmup.state()["status"], "cold")
+        self.assertIsNot(warmup._lock, inherited)
+
+
+class RegistryStepTests(TestCase):
+
+    def test_registry_step_writes_no_codes(self):
+        register("E20000000000000000000001", "E20000000000000000000002")
+        known = epc.epc_ids(["E20000000000000000000001"])
+
+        self.assertEqual(warmup._registry(), 2)
+        self.assertEqual(EpcCode.objects.count(), 1)
+        self.assertEqual(
+            epc.epc_ids(["E20000000000000000000001", "E20000000000000000000002"], create=False),
+            known,
+        )
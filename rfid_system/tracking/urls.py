@@ -9,12 +9,33 @@ urlpatterns = [
     path('api/dashboard/live-tags/', views.api_dashboard_live_tags,
          name='api_dashboard_live_tags'),
     path('api/items/search/', views.api_item_search, name='api_item_search'),
+    path('api/items/lookup/', views.api_item_lookup, name='api_item_lookup'),
     path('api/readers/status/', views.api_reader_status, name='api_reader_status'),
     path('api/auth/login/', views.api_login, name='api_login'),
     path('api/auth/logout/', views.api_logout, name='api_logout'),
     path('api/auth/me/', views.api_me, name='api_me'),
-    path("api/users/", views.api_users),
-    path("api/activity-logs/", views.api_activity_logs),
+    path("api/users/", views.api_users, name="api_users"),
+    path("api/activity-logs/", views.api_activity_logs, name="api_activity_logs"),
+    path("api/presence/transitions/", views.api_presence_transitions,
+         name="api_presence_transitions"),
+    path("api/inventory/exceptions/", views.api_inventory_exceptions,
+         name="api_inventory_exceptions"),
+    path("api/analytics/heatmap/", views.api_activity_heatmap, name="api_activity_heatmap"),
+    path("api/visits/", views.api_visits, name="api_visits"),
+    path("api/visits/dwell/", views.api_dwell_stats, name="api_dwell_stats"),
+    path("api/projects/inventory/", views.api_inventory_rollups, {"scope": "project"},
+         name="api_project_inventory"),
+    path("api/groups/inventory/", views.api_inventory_rollups, {"scope": "group"},
+         name="api_group_inventory"),
+    path("api/zones/", views.api_zones, name="api_zones"),
+    path("api/zones/<int:zone_id>/items/", views.api_zone_items, name="api_zone_items"),
+    path("api/labels/batch/", views.api_label_batch, name="api_label_batch"),
+    path("api/ingest/batch/", views.api_ingest_batch, name="api_ingest_batch"),
+    path("api/ingest/registry/", views.api_ingest_registry, name="api_ingest_registry"),
+    path("api/registry/filter/", views.api_registry_filter, name="api_registry_filter"),
+    path("metrics/", views.metrics_view, name="metrics"),
+    path("api/admission/", views.api_admission, name="api_admission"),
+    path("ready/", views.readiness, name="readiness"),
 
 
 
@@ -1,17 +1,36 @@
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db import transaction
-from django.db.models import Q
-from datetime import timedelta
+from django.db import InterfaceError, OperationalError
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.db.models.functions import Upper
+from collections import defaultdict
+from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
+import gzip
+import hmac
 import json
+import logging
 
-from .models import Readers, Antennas, Detections, RfidItemsTemp
+from . import (
+    admission, health, heatmap, inventory, labels, metrics, presence, registry, rollups, spool,
+    warmup,
+)
+from .columnar import DictionaryEncoder, compact_json_response, to_columns, wants_columnar
+from .ingest import ingest_forwarded_batch, ingest_tag_reads
+from .location import current_locations
+from .models import (
+    Readers, Antennas, Detections, DetectionFanIn, Groups, InventoryRollup, Items, ItemZone,
+    Logs, Projects, RfidItemsTemp, TagPresence, Visit, Zone, ZoneTransition,
+)
+
+logger = logging.getLogger(__name__)
 
 
 # ----------------------------------------------------------------------
@@ -28,14 +47,20 @@ def home(request):
 
 def _compute_status(last_seen, now=None):
     """Translate last_seen timestamp into tag state."""
-    now = now or timezone.now()
-    diff = now - last_seen
+    return presence.state_for(last_seen, now or timezone.now())
+
 
-    if diff <= timedelta(minutes=15):
-        return "active"
-    if diff <= timedelta(hours=2):
-        return "idle"
-    return "missing"
+def _estimated_location(loc, readers, antenna_ports):
+    """Flatten a location-engine estimate into API fields."""
+    if loc is None:
+        return {"estimatedReader": None, "estimatedAntenna": None, "locationConfidence": None}
+
+    reader = readers.get(loc.reader_id)
+    return {
+        "estimatedReader": (reader.model or "") if reader else "",
+        "estimatedAntenna": antenna_ports.get(loc.antenna_id),
+        "locationConfidence": loc.confidence,
+    }
 
 
 def _user_to_json(user):
@@ -99,48 +124,33 @@ def rfid_read(request):
         if not mac or not tag_reads:
             return JsonResponse({"error": "Invalid data"}, status=400)
 
+        if spool.spool_always():
+            return _spool_batch(mac, tag_reads)
+
         reader = Readers.objects.get(mac_address=mac)
-        valid_epcs = set(RfidItemsTemp.objects.values_list("epc", flat=True))
-
-        saved, ignored = [], []
-
-        for tag in tag_reads:
-            epc = tag.get("epc")
-
-            if epc not in valid_epcs:
-                ignored.append(epc)
-                continue
-
-            antenna_port = tag.get("antennaPort")
-            rssi = tag.get("peakRssi")
-            detected_time = timezone.now()
-
-            antenna = Antennas.objects.get(reader=reader, port_number=antenna_port)
-
-            # 5 second deduplication
-            if not Detections.objects.filter(
-                epc=epc,
-                detected_at__gt=detected_time - timedelta(seconds=5)
-            ).exists():
-                with transaction.atomic():
-                    Detections.objects.create(
-                        epc=epc,
-                        reader=reader,
-                        antenna=antenna,
-                        rssi=rssi,
-                        detected_at=detected_time,
-                        project_id=None
-                    )
-                saved.append(epc)
+        saved, ignored = ingest_tag_reads(reader, tag_reads)
 
         return JsonResponse({"status": "ok", "saved_epcs": saved, "ignored_epcs": ignored}, status=201)
 
     except Readers.DoesNotExist:
         return JsonResponse({"error": "Unknown reader MAC address"}, status=404)
+    except (OperationalError, InterfaceError):
+        logger.warning("Database unavailable, spooling %d tag reads from %s", len(tag_reads), mac)
+        return _spool_batch(mac, tag_reads)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+def _spool_batch(mac, tag_reads):
+    """Queue a batch in the local spool; it is stored later by `replay_spool`."""
+    try:
+        spool.append(mac, tag_reads)
+    except OSError as e:
+        return JsonResponse({"error": f"Spool unavailable: {e}"}, status=503)
+
+    return JsonResponse({"status": "spooled", "saved_epcs": [], "ignored_epcs": []}, status=202)
+
+
 # ----------------------------------------------------------------------
 # COMBINED CONNECT ENDPOINT
 # ----------------------------------------------------------------------
@@ -149,18 +159,16 @@ def rfid_read(request):
 def connect(request):
     """Handle Impinj Speedway Connect: process read + return live summary."""
     read_response = rfid_read(request)
-    live_summary = rfid_live_summary(request)
 
     try:
+        live_summary = rfid_live_summary(request)
         data = {
             "status": json.loads(read_response.content).get("status", "ok"),
             "saved_epcs": json.loads(read_response.content).get("saved_epcs", []),
             "summary": json.loads(live_summary.content).get("summary", []),
         }
 
-        print("\n=== RFID CONNECT RESPONSE DEBUG ===")
-        print(json.dumps(data, indent=4))
-        print("==================================\n")
+        logger.debug("RFID connect response: %s", data)
 
         return JsonResponse(data)
 
@@ -168,6 +176,47 @@ def connect(request):
         return read_response
 
 
+# ----------------------------------------------------------------------
+# METRICS (Prometheus scrape target)
+# ----------------------------------------------------------------------
+
+def metrics_view(request):
+    """Expose request, database and ingest metrics in Prometheus text format."""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def api_admission(request):
+    """Current admission-control occupancy of this worker, per endpoint class."""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+    return JsonResponse({"classes": admission.occupancy()})
+
+
+def readiness(request):
+    """
+    Load-balancer readiness probe: 200 once this worker has warmed up, 503
+    before that. A probe against a cold worker starts the warm-up.
+    """
+    state = warmup.state()
+    if state["status"] == "cold":
+        warmup.warm_up_in_background()
+
+    ready = state["status"] == "ready"
+    return JsonResponse({
+        "ready": ready,
+        "status": state["status"],
+        "warmupSeconds": state["seconds"],
+        "steps": state["steps"],
+        "error": state["error"],
+    }, status=200 if ready else 503)
+
+
 # ----------------------------------------------------------------------
 # CLEAR DETECTIONS
 # ----------------------------------------------------------------------
@@ -185,7 +234,10 @@ def clear_detections(request):
 
 @csrf_exempt
 def api_dashboard_live_tags(request):
-    """Return recent detections grouped by EPC for React Dashboard."""
+    """
+    Return recent detections grouped by EPC for React Dashboard.
+    ``?format=columnar`` returns the compact columnar payload instead.
+    """
     if request.method != "GET":
         return JsonResponse({"error": "Only GET allowed"}, status=405)
 
@@ -207,14 +259,20 @@ def api_dashboard_live_tags(request):
         .order_by("epc", "-detected_at")
     )
 
+    locations = current_locations()
+    states = presence.stored_states(items_by_epc.keys(), now)
+    readers = {r.reader_id: r for r in Readers.objects.all()}
+    antenna_ports = dict(Antennas.objects.values_list("antenna_id", "port_number"))
+
     tags = {}
+    latest_ids = {}
 
     for det in recent:
         epc = det.epc
         item = items_by_epc.get(epc)
-        last_local = det.detected_at.astimezone(tz)
 
         if epc not in tags:
+            latest_ids[epc] = det.detection_id
             tags[epc] = {
                 "id": epc,
                 "epc": epc,
@@ -223,20 +281,78 @@ def api_dashboard_live_tags(request):
                 "antenna": det.antenna.port_number if det.antenna else None,
                 "rssi": float(det.rssi) if det.rssi is not None else None,
                 "mac": det.reader.mac_address or "",
-                "lastSeen": last_local.isoformat(),
-                "status": _compute_status(det.detected_at, now),
+                "lastSeen": det.detected_at,
+                "status": states.get(epc) or _compute_status(det.detected_at, now),
+                **_estimated_location(locations.get(epc), readers, antenna_ports),
                 "activityLog": [],
             }
 
         if len(tags[epc]["activityLog"]) < 20:
             tags[epc]["activityLog"].append({
-                "timestamp": last_local.isoformat(),
+                "timestamp": det.detected_at,
                 "reader": det.reader.model or "",
                 "antenna": det.antenna.port_number if det.antenna else None,
                 "rssi": float(det.rssi) if det.rssi is not None else None,
             })
 
-    return JsonResponse({"tags": list(tags.values())})
+    antenna_counts = dict(
+        DetectionFanIn.objects
+        .filter(detection_id__in=list(latest_ids.values()))
+        .values_list("detection_id", "antenna_count")
+    )
+    for epc, row in tags.items():
+        row["antennaCount"] = antenna_counts.get(latest_ids[epc], 1)
+
+    rows = list(tags.values())
+
+    if wants_columnar(request):
+        return _live_tags_columnar(rows)
+
+    for row in rows:
+        row["lastSeen"] = row["lastSeen"].astimezone(tz).isoformat()
+        for entry in row["activityLog"]:
+            entry["timestamp"] = entry["timestamp"].astimezone(tz).isoformat()
+
+    return JsonResponse({"tags": rows})
+
+
+def _live_tags_columnar(rows):
+    """Columnar variant of the live-tags payload (see tracking/columnar.py)."""
+    dicts = {
+        "reader": DictionaryEncoder(),
+        "antenna": DictionaryEncoder(),
+        "mac": DictionaryEncoder(),
+        "status": DictionaryEncoder(),
+    }
+    tag_dicts = dict(dicts, estimatedReader=dicts["reader"], estimatedAntenna=dicts["antenna"])
+
+    tags = to_columns(
+        rows,
+        ("epc", "objectName", "reader", "antenna", "rssi", "mac", "lastSeen", "status",
+         "estimatedReader", "estimatedAntenna", "locationConfidence", "antennaCount"),
+        dictionaries=tag_dicts,
+        time_fields=("lastSeen",),
+    )
+
+    log_rows = [
+        dict(entry, tag=idx)
+        for idx, row in enumerate(rows)
+        for entry in row["activityLog"]
+    ]
+    activity = to_columns(
+        log_rows,
+        ("tag", "timestamp", "reader", "antenna", "rssi"),
+        dictionaries=dicts,
+        time_fields=("timestamp",),
+    )
+
+    return compact_json_response({
+        "format": "columnar",
+        "count": len(rows),
+        "tags": tags,
+        "activityLog": activity,
+        "dictionaries": {name: enc.values for name, enc in dicts.items()},
+    })
 
 
 # ----------------------------------------------------------------------
@@ -272,10 +388,20 @@ def api_item_search(request):
         .order_by("-detected_at")[:50]
     )
 
+    estimate = current_locations().get(item.epc)
+    confidence = None
+
     if detections:
         latest = detections[0]
-        status = _compute_status(latest.detected_at, now)
-        location = f"{latest.reader.location or 'Unknown'} - {latest.reader.model or ''}".strip(" -")
+        status = (
+            presence.stored_states([item.epc], now).get(item.epc)
+            or _compute_status(latest.detected_at, now)
+        )
+        located = latest.reader
+        if estimate is not None:
+            located = Readers.objects.filter(reader_id=estimate.reader_id).first() or located
+            confidence = estimate.confidence
+        location = f"{located.location or 'Unknown'} - {located.model or ''}".strip(" -")
     else:
         status = "missing"
         location = item.storage_location or "Unknown"
@@ -294,25 +420,117 @@ def api_item_search(request):
             "objectName": item.item_name or "",
             "responsiblePerson": item.responsible_person or "",
             "currentLocation": location,
+            "locationConfidence": confidence,
             "status": status,
             "timeline": timeline,
         },
     })
 
 
+MAX_LOOKUP_CODES = 5000
+
+
+@csrf_exempt
+def api_item_lookup(request):
+    """
+    Resolve a batch of scanned EPCs/barcodes to items, status and last location.
+
+    Body: ``{"codes": [...]}``. Runs a fixed number of queries whatever the
+    batch size; codes matching no registered item are listed in ``unknown``.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+    try:
+        codes = json.loads(request.body).get("codes", [])
+    except (ValueError, AttributeError):
+        return JsonResponse({"error": "Invalid data"}, status=400)
+
+    if not isinstance(codes, list):
+        return JsonResponse({"error": "'codes' must be a list"}, status=400)
+    codes = list(dict.fromkeys(str(c).strip() for c in codes if c is not None and str(c).strip()))
+    if len(codes) > MAX_LOOKUP_CODES:
+        return JsonResponse({"error": f"At most {MAX_LOOKUP_CODES} codes per request"}, status=400)
+
+    now = timezone.now()
+    tz = ZoneInfo("Europe/Helsinki")
+    wanted = {c.upper() for c in codes}
+
+    by_epc, by_barcode = {}, {}
+    # Compare upper-cased on both sides: the column collation may be case-sensitive.
+    items = RfidItemsTemp.objects.annotate(epc_upper=Upper("epc"), barcode_upper=Upper("barcode"))
+    for item in items.filter(Q(epc_upper__in=wanted) | Q(barcode_upper__in=wanted)):
+        if item.epc:
+            by_epc.setdefault(item.epc.upper(), item)
+        if item.barcode:
+            by_barcode.setdefault(item.barcode.upper(), item)
+
+    matches = {}
+    for code in codes:
+        key = code.upper()
+        if key in by_epc:
+            matches[code] = (by_epc[key], "epc")
+        elif key in by_barcode:
+            matches[code] = (by_barcode[key], "barcode")
+
+    epcs = {item.epc for item, _ in matches.values() if item.epc}
+    seen = {
+        p.epc: p
+        for p in TagPresence.objects.select_related("reader", "antenna").filter(epc__in=epcs)
+    }
+    zone_names = dict(
+        ItemZone.objects.filter(epc__in=epcs, zone__isnull=False).values_list("epc", "zone__name")
+    )
+
+    results, unknown = [], []
+    for code in codes:
+        if code not in matches:
+            unknown.append(code)
+            continue
+
+        item, matched_by = matches[code]
+        p = seen.get(item.epc)
+        last_seen = p.last_seen if p else None
+
+        results.append({
+            "code": code,
+            "matchedBy": matched_by,
+            "item": {
+                "id": item.id,
+                "epc": item.epc or "",
+                "barcode": item.barcode or "",
+                "objectName": item.item_name or "",
+                "responsiblePerson": item.responsible_person or "",
+                "storageLocation": item.storage_location or "",
+            },
+            "status": (presence.current_state(p.state, last_seen, now)
+                       if last_seen else "missing"),
+            "lastSeen": last_seen.astimezone(tz).isoformat() if last_seen else None,
+            "lastLocation": {
+                "location": (p.reader.location or "") if p and p.reader else "",
+                "reader": (p.reader.model or "") if p and p.reader else "",
+                "antenna": p.antenna.port_number if p and p.antenna else None,
+                "zone": zone_names.get(item.epc),
+            } if p else None,
+        })
+
+    return JsonResponse({"count": len(results), "results": results, "unknown": unknown})
+
+
 # ----------------------------------------------------------------------
 # READER STATUS
 # ----------------------------------------------------------------------
 
 @csrf_exempt
 def api_reader_status(request):
-    """Return status information for all RFID readers."""
+    """Return status information for all RFID readers, with per-antenna health."""
     if request.method != "GET":
         return JsonResponse({"error": "Only GET allowed"}, status=405)
 
     now = timezone.now()
     online_cutoff = now - timedelta(minutes=5)
     stats_cutoff = now - timedelta(hours=24)
+    antenna_health = health.snapshot(now)
 
     readers_payload = []
 
@@ -337,11 +555,20 @@ def api_reader_status(request):
                 detected_at__gte=stats_cutoff
             ).count()
 
+            figures = antenna_health.get(a.antenna_id)
+            if count == 0:
+                antenna_status = "inactive"
+            elif figures and figures["anomalies"]:
+                antenna_status = "degraded"
+            else:
+                antenna_status = "active"
+
             antennas_payload.append({
                 "number": a.port_number,
-                "status": "active" if count > 0 else "inactive",
+                "status": antenna_status,
                 "tagsDetected": count,
                 "power": 30 if count > 0 else 0,
+                "health": figures,
             })
 
         name = r.location or r.model or f"Reader-{r.reader_id}"
@@ -437,7 +664,10 @@ def api_users(request):
 
 @csrf_exempt
 def api_activity_logs(request):
-    """Return all tag detections with optional date filtering."""
+    """
+    Return all tag detections with optional date filtering.
+    ``?format=columnar`` returns the compact columnar payload instead.
+    """
     if request.method != "GET":
         return JsonResponse({"error": "Only GET allowed"}, status=405)
 
@@ -481,7 +711,7 @@ def api_activity_logs(request):
 
             logs.append({
                 "id": d.detection_id,
-                "timestamp": d.detected_at.isoformat(),
+                "timestamp": d.detected_at,
                 "epc": d.epc,
                 "objectName": getattr(
                     RfidItemsTemp.objects.filter(epc=d.epc).first(),
@@ -494,7 +724,548 @@ def api_activity_logs(request):
                 "event": event,   # 👈 now dynamic
             })
 
+        if wants_columnar(request):
+            dicts = {
+                "reader": DictionaryEncoder(),
+                "antenna": DictionaryEncoder(),
+                "event": DictionaryEncoder(),
+            }
+            columns = to_columns(
+                logs,
+                ("id", "timestamp", "epc", "objectName", "reader", "antenna", "rssi", "event"),
+                dictionaries=dicts,
+                time_fields=("timestamp",),
+            )
+            return compact_json_response({
+                "format": "columnar",
+                "count": len(logs),
+                "logs": columns,
+                "dictionaries": {name: enc.values for name, enc in dicts.items()},
+            })
+
+        for log in logs:
+            log["timestamp"] = log["timestamp"].isoformat()
+
         return JsonResponse({"logs": logs})
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+# ----------------------------------------------------------------------
+# PRESENCE TRANSITIONS (arrived / moved / idle / missing)
+# ----------------------------------------------------------------------
+
+@csrf_exempt
+def api_presence_transitions(request):
+    """Return stored presence transitions, newest first, with optional filters."""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    qs = (
+        Logs.objects
+        .select_related("reader")
+        .filter(action__in=("arrived", "moved", "idle", "missing"))
+        .order_by("-created_at")
+    )
+
+    from_date = request.GET.get("from")
+    to_date = request.GET.get("to")
+    epc = request.GET.get("epc")
+
+    if from_date:
+        qs = qs.filter(created_at__date__gte=from_date)
+    if to_date:
+        qs = qs.filter(created_at__date__lte=to_date)
+    if epc:
+        # Through items.epc (unique) and the logs.item_id index; transitions of
+        # EPCs without an item row carry no item_id and only the note.
+        item_id = Items.objects.filter(epc=epc).values_list("item_id", flat=True).first()
+        if item_id is not None:
+            qs = qs.filter(item_id=item_id)
+        else:
+            qs = qs.filter(item__isnull=True, note=f"EPC {epc}")
+
+    try:
+        limit = min(int(request.GET.get("limit", 500)), 5000)
+    except ValueError:
+        return JsonResponse({"error": "Invalid limit"}, status=400)
+
+    transitions = [{
+        "id": log.log_id,
+        "timestamp": log.created_at.isoformat(),
+        "epc": (log.note or "").removeprefix("EPC "),
+        "event": log.action,
+        "reader": log.reader.model if log.reader else "",
+    } for log in qs[:limit]]
+
+    return JsonResponse({"transitions": transitions})
+
+
+# ----------------------------------------------------------------------
+# INVENTORY EXCEPTIONS (missing / overdue)
+# ----------------------------------------------------------------------
+
+@csrf_exempt
+def api_inventory_exceptions(request):
+    """
+    Return missing and overdue items grouped by storage location, project
+    and responsible person, as of the last inventory sweep.
+    ``?refresh=1`` recomputes the report first.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    payload = None if request.GET.get("refresh") == "1" else inventory.latest_report()
+    if payload is None:
+        payload = inventory.sweep()
+
+    return compact_json_response(payload)
+
+
+# ----------------------------------------------------------------------
+# VISITS (detections sessionized per EPC and reader/antenna)
+# ----------------------------------------------------------------------
+
+def _visit_filters(request, qs):
+    from_date = request.GET.get("from")
+    to_date = request.GET.get("to")
+    reader = request.GET.get("reader")
+
+    if from_date:
+        qs = qs.filter(arrived_at__date__gte=from_date)
+    if to_date:
+        qs = qs.filter(arrived_at__date__lte=to_date)
+    if reader:
+        qs = qs.filter(reader_id=reader)
+    return qs
+
+
+@csrf_exempt
+def api_visits(request):
+    """Return the visit timeline of one EPC (``?epc=``), newest first."""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    epc = (request.GET.get("epc") or "").strip()
+    if not epc:
+        return JsonResponse({"error": "Missing query 'epc'"}, status=400)
+
+    try:
+        limit = min(int(request.GET.get("limit", 100)), 1000)
+    except ValueError:
+        return JsonResponse({"error": "Invalid limit"}, status=400)
+
+    tz = ZoneInfo("Europe/Helsinki")
+    qs = _visit_filters(
+        request,
+        Visit.objects.select_related("reader", "antenna").filter(epc=epc).order_by("-arrived_at"),
+    )
+
+    visits = [{
+        "arrivedAt": v.arrived_at.astimezone(tz).isoformat(),
+        "departedAt": v.departed_at.astimezone(tz).isoformat(),
+        "dwellSeconds": round(v.dwell_seconds, 1),
+        "readCount": v.read_count,
+        "open": v.is_open,
+        "location": v.reader.location or "",
+        "reader": v.reader.model or "",
+        "antenna": v.antenna.port_number if v.antenna else None,
+    } for v in qs[:limit]]
+
+    return JsonResponse({"epc": epc, "visits": visits})
+
+
+@csrf_exempt
+def api_dwell_stats(request):
+    """Return visit count and dwell statistics per reader/antenna."""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    rows = (
+        _visit_filters(request, Visit.objects.all())
+        .values("reader_id", "antenna_id")
+        .annotate(
+            visits=Count("id"),
+            items=Count("epc", distinct=True),
+            reads=Sum("read_count"),
+            total=Sum("dwell_seconds"),
+            avg=Avg("dwell_seconds"),
+            longest=Max("dwell_seconds"),
+        )
+        .order_by("reader_id", "antenna_id")
+    )
+
+    readers = {r.reader_id: r for r in Readers.objects.all()}
+    antenna_ports = dict(Antennas.objects.values_list("antenna_id", "port_number"))
+
+    locations = []
+    for row in rows:
+        reader = readers.get(row["reader_id"])
+        locations.append({
+            "location": (reader.location or "") if reader else "",
+            "reader": (reader.model or "") if reader else "",
+            "antenna": antenna_ports.get(row["antenna_id"]),
+            "visits": row["visits"],
+            "items": row["items"],
+            "reads": row["reads"],
+            "totalDwellSeconds": round(row["total"] or 0, 1),
+            "avgDwellSeconds": round(row["avg"] or 0, 1),
+            "maxDwellSeconds": round(row["longest"] or 0, 1),
+        })
+
+    return JsonResponse({"locations": locations})
+
+
+# ----------------------------------------------------------------------
+# ACTIVITY HEATMAP (reads per reader/antenna x time bucket)
+# ----------------------------------------------------------------------
+
+@csrf_exempt
+def api_activity_heatmap(request):
+    """
+    Return read counts per reader/antenna and time bucket.
+
+    ``bucket`` is ``hour`` (hour of day), ``weekday`` or ``interval`` (with
+    ``interval`` seconds); ``from``/``to`` are dates (default: last 7 days).
+    Optional filters: ``project``, ``group`` (ids) or ``epc`` (comma list).
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    tz = ZoneInfo("Europe/Helsinki")
+    mode = request.GET.get("bucket", heatmap.HOUR)
+    if mode not in heatmap.MODES:
+        return JsonResponse(
+            {"error": f"bucket must be one of {', '.join(heatmap.MODES)}"}, status=400
+        )
+
+    try:
+        to_date = parse_date(request.GET["to"]) if request.GET.get("to") else timezone.localdate()
+        from_date = (parse_date(request.GET["from"]) if request.GET.get("from")
+                     else to_date - timedelta(days=6))
+        interval = int(request.GET.get("interval", 3600))
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "Invalid from/to/interval"}, status=400)
+    if from_date is None or to_date is None or from_date > to_date or interval <= 0:
+        return JsonResponse({"error": "Invalid from/to/interval"}, status=400)
+
+    start = datetime.combine(from_date, time.min, tzinfo=tz)
+    end = datetime.combine(to_date + timedelta(days=1), time.min, tzinfo=tz)
+    n_buckets = (end - start).total_seconds() / interval
+    if mode == heatmap.INTERVAL and n_buckets > heatmap.MAX_INTERVAL_BUCKETS:
+        return JsonResponse({"error": "Too many buckets; use a larger interval"}, status=400)
+
+    epcs = None
+    if request.GET.get("epc"):
+        epcs = {e.strip() for e in request.GET["epc"].split(",") if e.strip()}
+    for scope in (rollups.PROJECT, rollups.GROUP):
+        if request.GET.get(scope):
+            try:
+                members = rollups.scope_epcs(scope, int(request.GET[scope]))
+            except ValueError:
+                return JsonResponse({"error": f"Invalid {scope}"}, status=400)
+            epcs = members if epcs is None else epcs & members
+
+    pairs, bucket_labels, counts = heatmap.compute(start, end, mode, tz, interval=interval, epcs=epcs)
+
+    readers = {r.reader_id: r for r in Readers.objects.all()}
+    antenna_ports = dict(Antennas.objects.values_list("antenna_id", "port_number"))
+
+    rows = []
+    for (reader_id, antenna_id), row in zip(pairs, counts):
+        total = int(row.sum())
+        if not total:
+            continue
+        reader = readers.get(reader_id)
+        rows.append({
+            "location": (reader.location or "") if reader else "",
+            "reader": (reader.model or "") if reader else "",
+            "antenna": antenna_ports.get(antenna_id),
+            "total": total,
+            "counts": row.tolist(),
+        })
+
+    return compact_json_response({
+        "bucket": mode,
+        "from": from_date.isoformat(),
+        "to": to_date.isoformat(),
+        "buckets": bucket_labels,
+        "rows": rows,
+    })
+
+
+# ----------------------------------------------------------------------
+# PROJECT / GROUP INVENTORY (incrementally maintained counters)
+# ----------------------------------------------------------------------
+
+@csrf_exempt
+def api_inventory_rollups(request, scope):
+    """
+    Return total / present / idle / missing counts per project or group.
+
+    ``total`` is counted live; present / idle come from the rollup counters,
+    which follow membership edits only after ``manage.py rebuild_rollups``.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    if scope == rollups.PROJECT:
+        projects = Projects.objects.filter(deleted_at__isnull=True)
+        names = {p.project_id: (p.code, p.name) for p in projects}
+    else:
+        names = {g.group_id: ("", g.name) for g in Groups.objects.all()}
+
+    only = request.GET.get("id")
+    if only:
+        names = {k: v for k, v in names.items() if str(k) == only}
+
+    counters = {
+        r.scope_id: r
+        for r in InventoryRollup.objects.filter(scope=scope, scope_id__in=list(names))
+    }
+    totals = rollups.totals(scope, names)
+
+    rows = []
+    for scope_id in sorted(names):
+        code, name = names[scope_id]
+        r = counters.get(scope_id) or InventoryRollup(scope=scope, scope_id=scope_id)
+        total = totals.get(scope_id, 0)
+        rows.append({
+            "id": scope_id,
+            "code": code,
+            "name": name,
+            "total": total,
+            "present": r.present,
+            "idle": r.idle,
+            "missing": max(total - r.present - r.idle, 0),
+            "lastActivity": r.last_activity.isoformat() if r.last_activity else None,
+        })
+
+    return JsonResponse({scope + "s": rows})
+
+
+# ----------------------------------------------------------------------
+# ZONES (antenna groups mapped to rooms / shelves)
+# ----------------------------------------------------------------------
+
+@csrf_exempt
+def api_zones(request):
+    """Return every zone with the number of items currently in it."""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    zones = [{
+        "id": z.zone_id,
+        "name": z.name,
+        "storageLocation": z.storage_location.name if z.storage_location else "",
+        "itemCount": z.item_count,
+    } for z in (
+        Zone.objects
+        .select_related("storage_location")
+        .annotate(item_count=Count("items"))
+        .order_by("name")
+    )]
+
+    return JsonResponse({"zones": zones})
+
+
+@csrf_exempt
+def api_zone_items(request, zone_id):
+    """Return the items currently in one zone, and optionally its recent transitions."""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    zone = Zone.objects.filter(zone_id=zone_id).first()
+    if zone is None:
+        return JsonResponse({"error": "Zone not found"}, status=404)
+
+    current = list(
+        ItemZone.objects.filter(zone_id=zone_id)
+        .order_by("-since")
+        .values_list("epc", "since", "last_seen")
+    )
+    names = dict(
+        RfidItemsTemp.objects
+        .filter(epc__in=[epc for epc, _, _ in current])
+        .values_list("epc", "item_name")
+    )
+
+    data = {
+        "zone": zone.name,
+        "items": [{
+            "epc": epc,
+            "name": names.get(epc) or "",
+            "since": since.isoformat(),
+            "lastSeen": last_seen.isoformat() if last_seen else None,
+        } for epc, since, last_seen in current],
+    }
+
+    if request.GET.get("transitions") == "1":
+        data["transitions"] = [{
+            "epc": t.epc,
+            "from": t.from_zone_id,
+            "to": t.to_zone_id,
+            "timestamp": t.at.isoformat(),
+        } for t in (
+            ZoneTransition.objects
+            .filter(Q(to_zone_id=zone_id) | Q(from_zone_id=zone_id))
+            .order_by("-at")[:500]
+        )]
+
+    return JsonResponse(data)
+
+
+# ----------------------------------------------------------------------
+# LABEL BATCHES (tag printer)
+# ----------------------------------------------------------------------
+
+@csrf_exempt
+def api_label_batch(request):
+    """
+    Allocate a block of SGTIN-96 EPCs, create their labels (and optionally
+    register them as items) and stream the printable batch file.
+
+    Body: ``{"companyPrefix", "itemReference", "count", "filter"?,
+    "format": "csv"|"zpl", "item"?: {item_name, project_name, ...}}``.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+    try:
+        data = json.loads(request.body)
+        company_prefix = str(data["companyPrefix"])
+        item_reference = str(data["itemReference"])
+        count = data["count"]
+        filter_value = int(data.get("filter", 1))
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Invalid data"}, status=400)
+
+    fmt = data.get("format", "csv")
+    if fmt not in ("csv", "zpl"):
+        return JsonResponse({"error": "format must be csv or zpl"}, status=400)
+
+    item = data.get("item")
+    if item is not None and not isinstance(item, dict):
+        return JsonResponse({"error": "'item' must be an object"}, status=400)
+
+    try:
+        batch = labels.create_batch(company_prefix, item_reference, count, filter_value, item)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if fmt == "zpl":
+        response = StreamingHttpResponse(labels.zpl_lines(batch), content_type="text/plain")
+    else:
+        response = StreamingHttpResponse(labels.csv_lines(batch), content_type="text/csv")
+
+    first, last = batch.first_serial, batch.first_serial + count - 1
+    filename = f"labels-{company_prefix}.{item_reference}-{first}-{last}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["X-Label-Serials"] = f"{first}-{last}"
+    response.status_code = 201
+    return response
+
+
+# ----------------------------------------------------------------------
+# EDGE INGEST (batches forwarded by edge aggregators)
+# ----------------------------------------------------------------------
+
+def _ingest_token_ok(request):
+    token = request.headers.get("X-Ingest-Token") or ""
+    return any(
+        hmac.compare_digest(token, allowed)
+        for allowed in getattr(settings, "RFID_INGEST_TOKENS", [])
+    )
+
+
+@csrf_exempt
+def api_ingest_batch(request):
+    """Receive a (gzip) batch of deduplicated detections from an edge."""
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST allowed"}, status=405)
+    if not _ingest_token_ok(request):
+        return JsonResponse({"error": "Invalid ingest token"}, status=403)
+
+    try:
+        body = request.body
+        if request.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        tag_reads = json.loads(body).get("tag_reads", [])
+    except (OSError, ValueError):
+        return JsonResponse({"error": "Invalid data"}, status=400)
+
+    rows, ignored, unknown, rejected = ingest_forwarded_batch(tag_reads)
+
+    return JsonResponse({
+        "status": "ok",
+        "received": len(tag_reads),
+        "saved": len(rows),
+        "ignored": len(ignored),
+        "unknownReaders": unknown,
+        "rejected": rejected,
+    }, status=201)
+
+
+@csrf_exempt
+def api_ingest_registry(request):
+    """Registered EPCs plus reader/antenna layout, for edge aggregators to mirror."""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+    if not _ingest_token_ok(request):
+        return JsonResponse({"error": "Invalid ingest token"}, status=403)
+
+    ports = defaultdict(list)
+    for reader_id, port in Antennas.objects.values_list("reader_id", "port_number"):
+        ports[reader_id].append(port)
+
+    readers = [{
+        "mac": r.mac_address,
+        "model": r.model,
+        "location": r.location,
+        "antennas": sorted(ports[r.reader_id]),
+    } for r in Readers.objects.exclude(mac_address__isnull=True).exclude(mac_address="")]
+
+    payload = {"readers": readers}
+    if request.GET.get("epcs") != "0":
+        payload["epcs"] = list(
+            RfidItemsTemp.objects
+            .exclude(epc__isnull=True).exclude(epc="")
+            .values_list("epc", flat=True)
+        )
+
+    return compact_json_response(payload)
+
+
+@csrf_exempt
+def api_registry_filter(request):
+    """
+    Versioned filter of registered EPCs (Bloom filter, plus the list for
+    small sets or with ?exact=1) for edges and reader-side filtering.
+    ?since=<version> returns only the EPCs added/removed after it.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+    if not _ingest_token_ok(request):
+        return JsonResponse({"error": "Invalid ingest token"}, status=403)
+
+    since = request.GET.get("since")
+    try:
+        since = int(since) if since not in (None, "") else None
+    except ValueError:
+        return JsonResponse({"error": "since must be a version number"}, status=400)
+
+    version = registry.current_version()
+    etag = f'"registry-{version}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    payload = registry.delta(since, version) if since is not None else None
+    if payload is None:
+        payload = registry.snapshot(version, exact=request.GET.get("exact") == "1")
+
+    response = compact_json_response(payload)
+    response["ETag"] = etag
+    return response
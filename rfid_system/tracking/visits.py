@@ -0,0 +1,191 @@
+"""
+Sessionization of detections into visits.
+
+A visit is a run of detections of one EPC at the same reader/antenna with
+no gap longer than ``visit_gap_seconds()``. Ingest extends or opens visits
+batch by batch through ``extend``; ``sessionize`` does the same in a single
+streaming pass over time-ordered detections, for backfills and rebuilds.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Detections, Visit
+
+
+def visit_gap_seconds():
+    return getattr(settings, "RFID_VISIT_GAP_SECONDS", 300)
+
+
+def extend(visit, epc, reader_id, antenna_id, seen_at, gap):
+    """
+    Fold one detection into ``visit`` (the EPC's open visit, or None).
+
+    Returns ``(open_visit, closed_visit)``: the visit the detection now
+    belongs to, and the previous visit if this detection ended it.
+    Detections older than the open visit's departure are counted only if
+    they fall inside it.
+    """
+    if visit is not None:
+        same_place = (visit.reader_id, visit.antenna_id) == (reader_id, antenna_id)
+
+        if seen_at <= visit.departed_at:
+            if same_place and seen_at >= visit.arrived_at:
+                visit.read_count += 1
+            return visit, None
+
+        if same_place and seen_at - visit.departed_at <= gap:
+            visit.departed_at = seen_at
+            visit.dwell_seconds = (seen_at - visit.arrived_at).total_seconds()
+            visit.read_count += 1
+            return visit, None
+
+        visit.is_open = False
+
+    new = Visit(
+        epc=epc, reader_id=reader_id, antenna_id=antenna_id,
+        arrived_at=seen_at, departed_at=seen_at,
+        dwell_seconds=0, read_count=1, is_open=True,
+    )
+    return new, visit
+
+
+def sessionize(rows, gap=None):
+    """
+    Stream ``(epc, reader_id, antenna_id, detected_at)`` rows, ordered by
+    time, into visits. Yields each visit once it is closed; visits still
+    open at the end of the input are yielded last with ``is_open=True``.
+    """
+    gap = timedelta(seconds=gap if gap is not None else visit_gap_seconds())
+    open_visits = {}
+
+    for epc, reader_id, antenna_id, detected_at in rows:
+        visit, closed = extend(open_visits.get(epc), epc, reader_id, antenna_id, detected_at, gap)
+        open_visits[epc] = visit
+        if closed is not None:
+            yield closed
+
+    yield from open_visits.values()
+
+
+def apply_detections(detections, corrected=()):
+    """
+    Extend or open visits for a batch of newly stored detections.
+
+    EPCs whose batch reaches back before their latest visit ended (reads
+    buffered by a reader and delivered late), or that have ``corrected``
+    ``(detection, replaced_at)`` pairs (an already counted read replaced
+    within its dedup window), are re-sessionized from the stored detections
+    instead, starting at the first visit those reads can touch.
+    """
+    if not detections and not corrected:
+        return
+
+    corrected = [d for d, _ in corrected]
+    gap = timedelta(seconds=visit_gap_seconds())
+    epcs = sorted({d.epc for d in [*detections, *corrected]})
+    first_seen = {}
+    for det in [*detections, *corrected]:
+        if det.epc not in first_seen or det.detected_at < first_seen[det.epc]:
+            first_seen[det.epc] = det.detected_at
+
+    # Ingest calls this after presence.apply_detections in the same
+    # transaction, so the EPCs' TagPresence rows are already locked and
+    # concurrent batches cannot both open a visit for the same EPC.
+    with transaction.atomic():
+        recent = list(
+            Visit.objects.select_for_update()
+            .filter(epc__in=epcs)
+            .filter(Q(is_open=True) | Q(departed_at__gte=min(first_seen.values()) - gap))
+            .order_by("epc", "arrived_at")
+        )
+        latest = {}
+        for v in recent:
+            if v.epc not in latest or v.departed_at > latest[v.epc]:
+                latest[v.epc] = v.departed_at
+        late = {epc for epc, at in latest.items() if first_seen[epc] < at}
+        late |= {d.epc for d in corrected}
+
+        if late:
+            _resessionize(late, first_seen, [v for v in recent if v.epc in late], gap)
+
+        current = {v.epc: v for v in recent if v.is_open and v.epc not in late}
+        touched = {}
+
+        for det in sorted(detections, key=lambda d: d.detected_at):
+            if det.epc in late:
+                continue
+            visit, closed = extend(
+                current.get(det.epc), det.epc, det.reader_id, det.antenna_id, det.detected_at, gap
+            )
+            current[det.epc] = visit
+            touched[id(visit)] = visit
+            if closed is not None:
+                touched[id(closed)] = closed
+
+        visits = list(touched.values())
+        Visit.objects.bulk_update(
+            [v for v in visits if v.pk is not None],
+            ["departed_at", "dwell_seconds", "read_count", "is_open"],
+        )
+        Visit.objects.bulk_create([v for v in visits if v.pk is None])
+
+
+def _resessionize(epcs, first_seen, stored, gap):
+    """
+    Replace the visits of ``epcs`` from their first late read onwards.
+
+    ``stored`` holds every visit of these EPCs that ended within ``gap`` of
+    (or after) the late reads; those are dropped and rebuilt from the
+    detections since the earliest of them, in one query for all EPCs.
+    """
+    start = dict(first_seen)
+    doomed = []
+    for v in stored:
+        if v.departed_at >= first_seen[v.epc] - gap:
+            doomed.append(v.pk)
+            start[v.epc] = min(start[v.epc], v.arrived_at)
+
+    rows = (
+        (epc, reader_id, antenna_id, detected_at)
+        for epc, reader_id, antenna_id, detected_at in Detections.objects
+        .filter(epc__in=list(epcs), detected_at__gte=min(start[e] for e in epcs))
+        .order_by("detected_at", "detection_id")
+        .values_list("epc", "reader_id", "antenna_id", "detected_at")
+        .iterator(chunk_size=5000)
+        if detected_at >= start[epc]
+    )
+    Visit.objects.filter(pk__in=doomed).delete()
+    Visit.objects.bulk_create(list(sessionize(rows, gap=gap.total_seconds())))
+
+
+def rebuild(chunk_size=5000):
+    """Recompute all visits from the stored detections; returns the visit count."""
+    rows = (
+        Detections.objects
+        .order_by("detected_at", "detection_id")
+        .values_list("epc", "reader_id", "antenna_id", "detected_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    count, batch = 0, []
+
+    with transaction.atomic():
+        Visit.objects.all().delete()
+        for visit in sessionize(rows):
+            batch.append(visit)
+            if len(batch) >= chunk_size:
+                Visit.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        Visit.objects.bulk_create(batch)
+        count += len(batch)
+
+    return count
+
+
+def close_stale(now):
+    """Close open visits that have had no reads for longer than the gap."""
+    cutoff = now - timedelta(seconds=visit_gap_seconds())
+    return Visit.objects.filter(is_open=True, departed_at__lt=cutoff).update(is_open=False)
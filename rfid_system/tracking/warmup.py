@@ -0,0 +1,130 @@
+"""
+Warm-up of per-process hot state.
+
+After a deploy or worker recycle the first requests would otherwise pay
+for loading the EPC registry and surrogate ids, the reader/antenna and
+zone maps, the time zone database and the 24h detection range the
+dashboard scans. ``warm_up`` loads all of them once
+and records how long each step took; ``/ready/`` only reports ready after
+it has finished, so the load balancer keeps traffic away from cold workers.
+
+The state belongs to one process. A preloading master that warmed up (or
+was still warming) before forking would hand its workers a state they
+never reached and possibly a held lock, so a forked child starts cold.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from . import epc, ingest, zones
+from .models import Detections, Readers
+
+logger = logging.getLogger(__name__)
+
+
+def _cold():
+    return {"status": "cold", "seconds": None, "steps": {}, "error": None, "pid": os.getpid()}
+
+
+_state = _cold()
+_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.Lock()
+    _state.clear()
+    _state.update(_cold())
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _own_state():
+    """``_state``, reset to cold if it was inherited from another process (hold ``_lock``)."""
+    if _state["pid"] != os.getpid():
+        _state.clear()
+        _state.update(_cold())
+    return _state
+
+
+def _zoneinfo():
+    ZoneInfo("Europe/Helsinki")
+    ZoneInfo(settings.TIME_ZONE)
+
+
+def _registry():
+    registered = ingest.registered_epcs()
+    # Read-only: codes for new EPCs are created by the first ingest that needs them.
+    epc.epc_ids(registered, create=False)
+    return len(registered)
+
+
+def _readers():
+    ingest.antenna_map(list(Readers.objects.all()))
+    return len(zones.zone_map())
+
+
+def _recent_detections():
+    since = timezone.now() - timedelta(hours=24)
+    return sum(1 for _ in Detections.objects.filter(detected_at__gte=since)
+               .values_list("epc", "reader_id", "antenna_id", "detected_at")
+               .iterator(chunk_size=5000))
+
+
+STEPS = [
+    ("zoneinfo", _zoneinfo),
+    ("registry", _registry),
+    ("readers", _readers),
+    ("detections_24h", _recent_detections),
+]
+
+
+def warm_up():
+    """Run every warm-up step; returns the state dict (see ``state``)."""
+    with _lock:
+        if _own_state()["status"] in ("warming", "ready"):
+            return dict(_state)
+        _state.update(status="warming", error=None, steps={})
+
+    started = time.perf_counter()
+    steps = {}
+    try:
+        for name, step in STEPS:
+            t0 = time.perf_counter()
+            step()
+            steps[name] = round(time.perf_counter() - t0, 4)
+    except Exception as e:
+        logger.exception("Warm-up failed at step %s", name)
+        with _lock:
+            _state.update(status="cold", steps=steps, error=f"{name}: {e}")
+        return dict(_state)
+    finally:
+        close_old_connections()
+
+    seconds = round(time.perf_counter() - started, 4)
+    logger.info("Warm-up finished in %.3fs: %s", seconds, steps)
+    with _lock:
+        _state.update(status="ready", seconds=seconds, steps=steps)
+    return dict(_state)
+
+
+def warm_up_in_background():
+    """Start ``warm_up`` in a daemon thread unless it already ran or is running."""
+    with _lock:
+        if _own_state()["status"] != "cold":
+            return
+    threading.Thread(target=warm_up, name="rfid-warmup", daemon=True).start()
+
+
+def state():
+    """``{"status": cold|warming|ready, "seconds", "steps", "error", "pid"}``."""
+    with _lock:
+        return dict(_own_state())
@@ -0,0 +1,134 @@
+"""
+Antenna-to-zone resolution and per-item current zone.
+
+Ingest resolves every detection's zone from an in-memory
+``{(reader_id, antenna_id): zone_id}`` map (a ``(reader_id, None)`` entry
+covers every antenna of that reader) and keeps ``item_zones`` and
+``zone_transitions`` up to date, so "what is in zone X" is one indexed
+lookup on item_zones.zone_id.
+"""
+import threading
+import time
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ItemZone, Zone, ZoneAntenna, ZoneTransition
+
+
+CACHE_SECONDS = 30
+
+_cache = {"at": None, "map": {}}
+_cache_lock = threading.Lock()
+
+
+def zone_map():
+    """``{(reader_id, antenna_id or None): zone_id}``, reloaded every CACHE_SECONDS."""
+    with _cache_lock:
+        if _cache["at"] is None or time.monotonic() - _cache["at"] >= CACHE_SECONDS:
+            _cache["map"] = {
+                (reader_id, antenna_id): zone_id
+                for reader_id, antenna_id, zone_id in
+                ZoneAntenna.objects.values_list("reader_id", "antenna_id", "zone_id")
+            }
+            _cache["at"] = time.monotonic()
+        return _cache["map"]
+
+
+@receiver(post_save, sender=ZoneAntenna)
+@receiver(post_delete, sender=ZoneAntenna)
+@receiver(post_delete, sender=Zone)
+def _invalidate(**kwargs):
+    with _cache_lock:
+        _cache["at"] = None
+
+
+def resolve(mapping, reader_id, antenna_id):
+    """Zone for one read: exact antenna first, then the reader-wide mapping."""
+    zone_id = mapping.get((reader_id, antenna_id))
+    if zone_id is None:
+        zone_id = mapping.get((reader_id, None))
+    return zone_id
+
+
+def observe(item_zone, zone_id, seen_at, replaces=None):
+    """
+    Apply one sighting in ``zone_id`` to ``item_zone`` (modified in place).
+
+    Returns a ZoneTransition, or None when the item stayed put or the
+    sighting is older than what we already know (unless it replaces the
+    read at ``replaces`` and that read is the latest one).
+    """
+    if (item_zone.last_seen is not None and seen_at < item_zone.last_seen
+            and item_zone.last_seen != replaces):
+        return None
+
+    item_zone.last_seen = seen_at
+    if item_zone.since is not None and item_zone.zone_id == zone_id:
+        return None
+
+    transition = ZoneTransition(
+        epc=item_zone.epc, from_zone_id=item_zone.zone_id, to_zone_id=zone_id, at=seen_at
+    )
+    item_zone.zone_id = zone_id
+    item_zone.since = seen_at
+    return transition
+
+
+def apply_detections(detections, corrected=()):
+    """
+    Update item_zones / zone_transitions for a batch of stored detections.
+
+    ``corrected`` ``(detection, replaced_at)`` pairs (read replaced within
+    its dedup window) move the item without recording a transition. Same locking scheme as
+    presence: insert-ignore the rows, then lock them in EPC order.
+    """
+    mapping = zone_map()
+    replaces = {id(d): replaced_at for d, replaced_at in corrected}
+    located = [
+        (d, zone_id) for d in [*detections, *(d for d, _ in corrected)]
+        if (zone_id := resolve(mapping, d.reader_id, d.antenna_id)) is not None
+    ]
+    if not located:
+        return []
+
+    epcs = sorted({d.epc for d, _ in located})
+    transitions = []
+
+    with transaction.atomic():
+        ItemZone.objects.bulk_create([ItemZone(epc=epc) for epc in epcs], ignore_conflicts=True)
+        current = {
+            z.epc: z
+            for z in ItemZone.objects.select_for_update().filter(epc__in=epcs).order_by("epc")
+        }
+
+        for det, zone_id in sorted(located, key=lambda pair: pair[0].detected_at):
+            transition = observe(current[det.epc], zone_id, det.detected_at,
+                                 replaces=replaces.get(id(det)))
+            if transition and id(det) not in replaces:
+                transitions.append(transition)
+
+        ItemZone.objects.bulk_update(current.values(), ["zone", "since", "last_seen"])
+        ZoneTransition.objects.bulk_create(transitions)
+
+    return transitions
+
+
+def leave(epcs, at):
+    """Take items out of their zone (e.g. once they go missing)."""
+    if not epcs:
+        return 0
+
+    with transaction.atomic():
+        gone = list(
+            ItemZone.objects.select_for_update()
+            .filter(epc__in=list(epcs), zone__isnull=False)
+            .order_by("epc")
+        )
+        ZoneTransition.objects.bulk_create([
+            ZoneTransition(epc=z.epc, from_zone_id=z.zone_id, to_zone_id=None, at=at)
+            for z in gone
+        ])
+        ItemZone.objects.filter(epc__in=[z.epc for z in gone]).update(zone=None, since=at)
+    return len(gone)